@@ -24,8 +24,14 @@
 # pylint:disable=import-error
 # pylint:disable=bare-except
 
+import sys
+
 
 def initialize_cli_for_databricks_notebooks():
+    # Notebooks run within an IPython kernel, so IPython is imported already. Outside of them,
+    # importing it just to find that out slows down the start of every command.
+    if 'IPython' not in sys.modules:
+        return
     import IPython
     from databricksCli import init_databricks_cli_config_provider
     init_databricks_cli_config_provider(IPython.get_ipython().user_ns.entry_point)
@@ -27,54 +27,44 @@ import sys
 
 import click
 
-from databricks_cli.configure.config import profile_option, debug_option
-from databricks_cli.libraries.cli import libraries_group
+from databricks_cli.click_types import LazyGroup
+from databricks_cli.configure.config import profile_option, debug_option, \
+    trace_http_option
 from databricks_cli.version import print_version_callback, version
 from databricks_cli.utils import CONTEXT_SETTINGS
-from databricks_cli.configure.cli import configure_cli
-from databricks_cli.dbfs.cli import dbfs_group
-from databricks_cli.workspace.cli import workspace_group
-from databricks_cli.jobs.cli import jobs_group
-from databricks_cli.clusters.cli import clusters_group
-from databricks_cli.cluster_policies.cli import cluster_policies_group
-from databricks_cli.runs.cli import runs_group
-from databricks_cli.secrets.cli import secrets_group
-from databricks_cli.stack.cli import stack_group
-from databricks_cli.groups.cli import groups_group
-from databricks_cli.tokens.cli import tokens_group
-from databricks_cli.instance_pools.cli import instance_pools_group
-from databricks_cli.pipelines.cli import pipelines_group
-from databricks_cli.repos.cli import repos_group
-from databricks_cli.unity_catalog.cli import unity_catalog_group
-
-
-@click.group(context_settings=CONTEXT_SETTINGS)
+
+# Command groups are only imported when invoked, which keeps the startup of every command from
+# paying for the imports of all the others.
+COMMAND_GROUPS = {
+    'configure': 'databricks_cli.configure.cli:configure_cli',
+    'fs': 'databricks_cli.dbfs.cli:dbfs_group',
+    'workspace': 'databricks_cli.workspace.cli:workspace_group',
+    'jobs': 'databricks_cli.jobs.cli:jobs_group',
+    'clusters': 'databricks_cli.clusters.cli:clusters_group',
+    'cluster-policies': 'databricks_cli.cluster_policies.cli:cluster_policies_group',
+    'runs': 'databricks_cli.runs.cli:runs_group',
+    'libraries': 'databricks_cli.libraries.cli:libraries_group',
+    'secrets': 'databricks_cli.secrets.cli:secrets_group',
+    'stack': 'databricks_cli.stack.cli:stack_group',
+    'groups': 'databricks_cli.groups.cli:groups_group',
+    'tokens': 'databricks_cli.tokens.cli:tokens_group',
+    'instance-pools': 'databricks_cli.instance_pools.cli:instance_pools_group',
+    'pipelines': 'databricks_cli.pipelines.cli:pipelines_group',
+    'repos': 'databricks_cli.repos.cli:repos_group',
+    'unity-catalog': 'databricks_cli.unity_catalog.cli:unity_catalog_group',
+}
+
+
+@click.group(cls=LazyGroup, lazy_subcommands=COMMAND_GROUPS, context_settings=CONTEXT_SETTINGS)
 @click.option('--version', '-v', is_flag=True, callback=print_version_callback,
               expose_value=False, is_eager=True, help=version)
 @debug_option
+@trace_http_option
 @profile_option
 def cli(**_):
     pass
 
 
-cli.add_command(configure_cli, name='configure')
-cli.add_command(dbfs_group, name='fs')
-cli.add_command(workspace_group, name='workspace')
-cli.add_command(jobs_group, name='jobs')
-cli.add_command(clusters_group, name='clusters')
-cli.add_command(cluster_policies_group, name='cluster-policies')
-cli.add_command(runs_group, name='runs')
-cli.add_command(libraries_group, name='libraries')
-cli.add_command(secrets_group, name='secrets')
-cli.add_command(stack_group, name='stack')
-cli.add_command(groups_group, name='groups')
-cli.add_command(tokens_group, name='tokens')
-cli.add_command(instance_pools_group, name="instance-pools")
-cli.add_command(pipelines_group, name='pipelines')
-cli.add_command(repos_group, name='repos')
-cli.add_command(unity_catalog_group, name='unity-catalog')
-
-
 def _trampoline_into_new_cli():
     trampoline_disable_env_var = 'DATABRICKS_CLI_DO_NOT_EXECUTE_NEWER_VERSION'
     if os.environ.get(trampoline_disable_env_var) is not None:
@@ -21,6 +21,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from importlib import import_module
+
 import click
 from click import ParamType, Option, MissingParameter, UsageError
 
@@ -152,6 +154,7 @@ class ContextObject(object):
     def __init__(self):
         self._profile = None
         self._debug = False
+        self.http_tracer = None
 
     def set_debug(self, debug=False):
         self._debug = debug
@@ -198,3 +201,28 @@ class RequiredOptions(Option):
         if len(cleaned_opts.intersection(set(self.one_of))) > 1:
             raise UsageError('Only one of {} should be provided.'.format(self.one_of))
         return super(RequiredOptions, self).handle_parse_result(ctx, opts, args)
+
+
+class LazyGroup(click.Group):
+    """
+    A click group whose subcommands are imported the first time they are looked up.
+
+    lazy_subcommands maps each subcommand name to the location of its command object, given as
+    'package.module:attribute'.
+    """
+    def __init__(self, *args, **kwargs):
+        self.lazy_subcommands = kwargs.pop('lazy_subcommands', {})
+        super(LazyGroup, self).__init__(*args, **kwargs)
+
+    def list_commands(self, ctx):
+        commands = super(LazyGroup, self).list_commands(ctx)
+        return sorted(set(commands) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands and cmd_name not in self.commands:
+            self.add_command(self._load_command(cmd_name), name=cmd_name)
+        return super(LazyGroup, self).get_command(ctx, cmd_name)
+
+    def _load_command(self, cmd_name):
+        module_name, attribute = self.lazy_subcommands[cmd_name].split(':')
+        return getattr(import_module(module_name), attribute)
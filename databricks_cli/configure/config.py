@@ -21,6 +21,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 import uuid
 import click
 import six
@@ -28,10 +29,10 @@ import six
 from databricks_cli.click_types import ContextObject
 from databricks_cli.configure.provider import get_config, \
     update_and_persist_config, ProfileConfigProvider
-from databricks_cli.oauth.oauth import check_and_refresh_access_token
 from databricks_cli.utils import InvalidConfigurationError
 from databricks_cli.sdk import ApiClient
 from databricks_cli.sdk.version import API_VERSIONS
+from databricks_cli.tracing import HttpTracer, TRACE_ENV_VAR
 
 
 def provide_api_client(function):
@@ -57,12 +58,18 @@ def provide_api_client(function):
         # This checks if an OAuth access token has expired and will attempt to refresh it if
         # a refresh token is present
         if config.host and config.token and config.refresh_token:
+            # Imported here as oauthlib and jwt are slow to import and rarely needed.
+            from databricks_cli.oauth.oauth import check_and_refresh_access_token
             config.token, config.refresh_token, updated = \
                 check_and_refresh_access_token(config.host, config.token, config.refresh_token)
             if updated:
                 update_and_persist_config(profile, config)
 
-        kwargs['api_client'] = _get_api_client(config, command_name)
+        api_client = _get_api_client(config, command_name)
+        http_tracer = _get_http_tracer(ctx, enable=_parse_flag(os.environ.get(TRACE_ENV_VAR)))
+        if http_tracer is not None:
+            api_client.add_observer(http_tracer)
+        kwargs['api_client'] = api_client
 
         return function(*args, **kwargs)
     decorator.__doc__ = function.__doc__
@@ -83,6 +90,26 @@ def debug_option(f):
                         expose_value=False, help="Debug Mode. Shows full stack trace on error.")(f)
 
 
+def trace_http_option(f):
+    def callback(ctx, param, value):  # NOQA
+        _get_http_tracer(ctx, enable=value)
+    return click.option('--trace-http', is_flag=True, callback=callback, expose_value=False,
+                        help='Print a summary of the latency of each API endpoint called. '
+                             'Can also be enabled by setting {}=1.'.format(TRACE_ENV_VAR))(f)
+
+
+def _get_http_tracer(ctx, enable):
+    """
+    Returns the tracer of the invocation, which is created if enable is set and then summarized
+    when the outermost command exits.
+    """
+    context_object = ctx.ensure_object(ContextObject)
+    if context_object.http_tracer is None and enable:
+        context_object.http_tracer = HttpTracer()
+        ctx.find_root().call_on_close(context_object.http_tracer.echo_summary)
+    return context_object.http_tracer
+
+
 def profile_option(f):
     def callback(ctx, param, value):  # NOQA
         if value is not None:
@@ -98,11 +125,34 @@ def api_version_option(f):
                         help='Override the API version used to call databricks.')(f)
 
 
+def _parse_flag(value):
+    return value is not None and str(value).lower() in ['1', 'true', 'yes']
+
+
+def _parse_pool_size(name, value):
+    if not value:
+        return None
+    try:
+        size = int(value)
+    except ValueError:
+        size = 0
+    if size < 1:
+        raise InvalidConfigurationError(
+            'Invalid {} {!r}: it must be a positive integer.'.format(name, value))
+    return size
+
+
 def _get_api_client(config, command_name=""):
     verify = config.insecure is None
+    pool_options = {
+        'pool_connections': _parse_pool_size('pool_connections', config.pool_connections),
+        'pool_maxsize': _parse_pool_size('pool_maxsize', config.pool_maxsize),
+        'pool_block': _parse_flag(config.pool_block),
+    }
     if config.is_valid_with_token:
         return ApiClient(host=config.host, token=config.token, verify=verify,
-                         command_name=command_name, jobs_api_version=config.jobs_api_version)
+                         command_name=command_name, jobs_api_version=config.jobs_api_version,
+                         **pool_options)
     return ApiClient(user=config.username, password=config.password,
                      host=config.host, verify=verify, command_name=command_name,
-                     jobs_api_version=config.jobs_api_version)
+                     jobs_api_version=config.jobs_api_version, **pool_options)
@@ -38,6 +38,9 @@ TOKEN = 'token'
 REFRESH_TOKEN = 'refresh_token'
 INSECURE = 'insecure'
 JOBS_API_VERSION = 'jobs-api-version'
+POOL_CONNECTIONS = 'pool-connections'
+POOL_MAXSIZE = 'pool-maxsize'
+POOL_BLOCK = 'pool-block'
 DEFAULT_SECTION = 'DEFAULT'
 
 # User-provided override for the DatabricksConfigProvider
@@ -109,6 +112,12 @@ def update_and_persist_config(profile, databricks_config):
     _set_option(raw_config, profile, REFRESH_TOKEN, databricks_config.refresh_token)
     _set_option(raw_config, profile, INSECURE, databricks_config.insecure)
     _set_option(raw_config, profile, JOBS_API_VERSION, databricks_config.jobs_api_version)
+    # Connection pool settings are only ever edited by hand, so keep them unless they are set.
+    for option, value in [(POOL_CONNECTIONS, databricks_config.pool_connections),
+                          (POOL_MAXSIZE, databricks_config.pool_maxsize),
+                          (POOL_BLOCK, databricks_config.pool_block)]:
+        if value is not None:
+            _set_option(raw_config, profile, option, value)
     _overwrite_config(raw_config)
 
 
@@ -257,7 +266,10 @@ class EnvironmentVariableConfigProvider(DatabricksConfigProvider):
         insecure = os.environ.get('DATABRICKS_INSECURE')
         jobs_api_version = os.environ.get('DATABRICKS_JOBS_API_VERSION')
         config = DatabricksConfig(host, username, password, token,
-                                  refresh_token, insecure, jobs_api_version)
+                                  refresh_token, insecure, jobs_api_version,
+                                  pool_connections=os.environ.get('DATABRICKS_POOL_CONNECTIONS'),
+                                  pool_maxsize=os.environ.get('DATABRICKS_POOL_MAXSIZE'),
+                                  pool_block=os.environ.get('DATABRICKS_POOL_BLOCK'))
         if config.is_valid:
             return config
         return None
@@ -277,8 +289,12 @@ class ProfileConfigProvider(DatabricksConfigProvider):
         refresh_token = _get_option_if_exists(raw_config, self.profile, REFRESH_TOKEN)
         insecure = _get_option_if_exists(raw_config, self.profile, INSECURE)
         jobs_api_version = _get_option_if_exists(raw_config, self.profile, JOBS_API_VERSION)
+        pool_connections = _get_option_if_exists(raw_config, self.profile, POOL_CONNECTIONS)
+        pool_maxsize = _get_option_if_exists(raw_config, self.profile, POOL_MAXSIZE)
+        pool_block = _get_option_if_exists(raw_config, self.profile, POOL_BLOCK)
         config = DatabricksConfig(host, username, password, token,
-                                  refresh_token, insecure, jobs_api_version)
+                                  refresh_token, insecure, jobs_api_version,
+                                  pool_connections, pool_maxsize, pool_block)
         if config.is_valid:
             return config
         return None
@@ -286,7 +302,8 @@ class ProfileConfigProvider(DatabricksConfigProvider):
 
 class DatabricksConfig(object):
     def __init__(self, host, username, password, token,
-                 refresh_token=None, insecure=None, jobs_api_version=None):  # noqa
+                 refresh_token=None, insecure=None, jobs_api_version=None,
+                 pool_connections=None, pool_maxsize=None, pool_block=None):  # noqa
         self.host = host
         self.username = username
         self.password = password
@@ -294,6 +311,9 @@ class DatabricksConfig(object):
         self.refresh_token = refresh_token
         self.insecure = insecure
         self.jobs_api_version = jobs_api_version
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
 
     @classmethod
     def from_token(cls, host, token, refresh_token=None, insecure=None, jobs_api_version=None):
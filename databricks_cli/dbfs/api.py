@@ -21,11 +21,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from base64 import b64encode, b64decode
+from base64 import b64decode
 
+import codecs
 import os
-import shutil
-import tempfile
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 import re
 import click
@@ -33,9 +33,13 @@ import click
 from requests.exceptions import HTTPError
 
 from databricks_cli.sdk import DbfsService
-from databricks_cli.utils import error_and_quit
+from databricks_cli.utils import error_and_quit, run_with_progress, outermost_paths, \
+    create_directory_tree
 from databricks_cli.dbfs.dbfs_path import DbfsPath
 from databricks_cli.dbfs.exceptions import LocalFileExistsException
+from databricks_cli.dbfs.sync import SyncManifest, walk_local_tree
+from databricks_cli.dbfs.transfer import ChunkedDownloader, PipelinedUploader, StreamingRelay, \
+    DEFAULT_PARALLELISM, DEFAULT_MAX_BUFFERED_BYTES, read_ahead, read_range
 
 BUFFER_SIZE_BYTES = 2**20
 
@@ -117,39 +121,35 @@ class DbfsApi(object):
 
     # Method makes multipart/form-data file upload for files <2GB.
     # Otherwise uses create, add-block, close methods for streaming upload.
-    def put_file(self, src_path, dbfs_path, overwrite, headers=None):
+    def put_file(self, src_path, dbfs_path, overwrite, headers=None,
+                 max_buffered_bytes=DEFAULT_MAX_BUFFERED_BYTES):
         # If file size is >2Gb use streaming upload.
         if os.path.getsize(src_path) < self.MULTIPART_UPLOAD_LIMIT:
             self.client.put(dbfs_path.absolute_path, src_path=src_path,
                             overwrite=overwrite, headers=headers)
         else:
-            handle = self.client.create(dbfs_path.absolute_path, overwrite,
-                                        headers=headers)['handle']
-            with open(src_path, 'rb') as local_file:
-                while True:
-                    contents = local_file.read(BUFFER_SIZE_BYTES)
-                    if len(contents) == 0:
-                        break
-                    # add_block should not take a bytes object.
-                    self.client.add_block(handle, b64encode(contents).decode(), headers=headers)
-                self.client.close(handle, headers=headers)
-
-    def get_file(self, dbfs_path, dst_path, overwrite, headers=None):
+            uploader = PipelinedUploader(self.client, BUFFER_SIZE_BYTES, max_buffered_bytes,
+                                         headers=headers)
+            stats = uploader.upload(src_path, dbfs_path.absolute_path, overwrite)
+            click.echo('Uploaded {} to {}.'.format(stats, repr(dbfs_path)), err=True)
+
+    def get_file(self, dbfs_path, dst_path, overwrite, headers=None,
+                 parallelism=DEFAULT_PARALLELISM, progress_callback=None):
+        """
+        Downloads the DBFS file at dbfs_path to dst_path. Up to ``parallelism`` ranged reads
+        are issued concurrently and written in place into a preallocated local file.
+        ``progress_callback(bytes_done, total_bytes)`` is called as the downloaded prefix of
+        the file grows.
+        """
         if os.path.exists(dst_path) and not overwrite:
             raise LocalFileExistsException('{} exists already.'.format(dst_path))
         file_info = self.get_status(dbfs_path, headers=headers)
         if file_info.is_dir:
             error_and_quit(('The dbfs file {} is a directory.').format(repr(dbfs_path)))
-        length = file_info.file_size
-        offset = 0
-        with open(dst_path, 'wb') as local_file:
-            while offset < length:
-                response = self.client.read(dbfs_path.absolute_path, offset, BUFFER_SIZE_BYTES,
-                                            headers=headers)
-                bytes_read = response['bytes_read']
-                data = response['data']
-                offset += bytes_read
-                local_file.write(b64decode(data))
+        downloader = ChunkedDownloader(self.client, BUFFER_SIZE_BYTES, parallelism,
+                                       headers=headers)
+        downloader.download(dbfs_path.absolute_path, file_info.file_size, dst_path,
+                            progress_callback=progress_callback)
 
     @staticmethod
     def get_num_files_deleted(partial_delete_error):
@@ -212,7 +212,8 @@ class DbfsApi(object):
         # Munge dst path in case dst is a dir
         if os.path.isdir(dst):
             dst = os.path.join(dst, dbfs_path_src.basename)
-        self.get_file(dbfs_path_src, dst, overwrite, headers=headers)
+        self.get_file(dbfs_path_src, dst, overwrite, headers=headers,
+                      progress_callback=_echo_download_progress)
 
     def _copy_to_dbfs_recursive(self, src, dbfs_path_dst, overwrite, headers=None):
         try:
@@ -258,7 +259,283 @@ class DbfsApi(object):
                                 'should provide the --overwrite flag.').format(cur_dbfs_src,
                                                                                cur_dst))
 
-    def cp(self, recursive, overwrite, src, dst, headers=None):
+    def _list_tree(self, dbfs_path, parallelism, headers=None):
+        """
+        Lists every file and directory below dbfs_path, listing up to ``parallelism``
+        directories concurrently.
+
+        :return: ([FileInfo], [FileInfo]) the directories and the files of the tree.
+        """
+        directories, files = [], []
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            pending = {executor.submit(self.list_files, dbfs_path, headers=headers)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for file_info in future.result():
+                        if file_info.is_dir:
+                            directories.append(file_info)
+                            pending.add(executor.submit(self.list_files, file_info.dbfs_path,
+                                                        headers=headers))
+                        else:
+                            files.append(file_info)
+        return directories, files
+
+    def _mkdirs_concurrently(self, dbfs_path, relpaths, parallelism, headers=None):
+        """Creates the directories at relpaths below dbfs_path."""
+        create_directory_tree(
+            lambda relpath: self.mkdirs(_join_relpath(dbfs_path, relpath), headers=headers),
+            relpaths, parallelism)
+
+    def _copy_to_dbfs_recursive_parallel(self, src, dbfs_path_dst, overwrite, parallelism,
+                                         headers=None):
+        try:
+            self.mkdirs(dbfs_path_dst, headers=headers)
+        except HTTPError as e:
+            if e.response.json()['error_code'] == DbfsErrorCodes.RESOURCE_ALREADY_EXISTS:
+                click.echo(e.response.json())
+                return
+        directories, copies = [], []
+        for root, _, filenames in os.walk(src):
+            cur_dbfs_dst = dbfs_path_dst
+            relpath = os.path.relpath(root, src)
+            if relpath != os.curdir:
+                directories.append(relpath.replace(os.sep, '/'))
+                cur_dbfs_dst = _join_relpath(dbfs_path_dst, relpath)
+            for filename in filenames:
+                cur_src = os.path.join(root, filename)
+                if os.path.isfile(cur_src):
+                    copies.append((cur_src, cur_dbfs_dst.join(filename)))
+        self._mkdirs_concurrently(dbfs_path_dst, directories, parallelism, headers=headers)
+
+        def put_file(cur_src, cur_dbfs_dst):
+            try:
+                self.put_file(cur_src, cur_dbfs_dst, overwrite, headers=headers)
+            except HTTPError as e:
+                if e.response.json()['error_code'] == DbfsErrorCodes.RESOURCE_ALREADY_EXISTS:
+                    return '{} already exists. Skip.'.format(cur_dbfs_dst)
+                raise e
+            return '{} -> {}'.format(cur_src, cur_dbfs_dst)
+
+        run_with_progress(put_file, copies, parallelism, 'copy')
+
+    def _copy_from_dbfs_recursive_parallel(self, dbfs_path_src, dst, overwrite, parallelism,
+                                           headers=None):
+        if os.path.isfile(dst):
+            click.echo(
+                '{} exists as a file. Skipping this subtree {}'.format(dst, repr(dbfs_path_src)))
+            return
+        directories, files = self._list_tree(dbfs_path_src, parallelism, headers=headers)
+
+        def to_local_path(file_info):
+            return os.path.join(dst, file_info.dbfs_path.relpath(dbfs_path_src))
+
+        for cur_dst in [dst] + [to_local_path(d) for d in directories]:
+            if not os.path.isdir(cur_dst):
+                os.makedirs(cur_dst)
+
+        def get_file(cur_dbfs_src, cur_dst):
+            try:
+                # The files are already spread over the pool, so each one is read as one stream.
+                self.get_file(cur_dbfs_src, cur_dst, overwrite, headers=headers, parallelism=1)
+            except LocalFileExistsException:
+                return ('{} already exists locally as {}. Skip. To overwrite, you ' +
+                        'should provide the --overwrite flag.').format(cur_dbfs_src, cur_dst)
+            return '{} -> {}'.format(cur_dbfs_src, cur_dst)
+
+        copies = [(f.dbfs_path, to_local_path(f)) for f in files]
+        run_with_progress(get_file, copies, parallelism, 'copy')
+
+    def copy_file(self, dbfs_path_src, dbfs_path_dst, overwrite, length=None, headers=None,
+                  parallelism=DEFAULT_PARALLELISM):
+        """
+        Copies a DBFS file to another DBFS path by relaying its contents through memory, reading
+        up to ``parallelism`` chunks ahead. length is the size of the source file and is looked
+        up when not provided.
+        """
+        if length is None:
+            file_info = self.get_status(dbfs_path_src, headers=headers)
+            if file_info.is_dir:
+                error_and_quit(('The dbfs file {} is a directory.').format(repr(dbfs_path_src)))
+            length = file_info.file_size
+        relay = StreamingRelay(self.client, BUFFER_SIZE_BYTES, parallelism, headers=headers)
+        relay.relay(dbfs_path_src.absolute_path, length, dbfs_path_dst.absolute_path, overwrite)
+
+    def _copy_within_dbfs_non_recursive(self, dbfs_path_src, dbfs_path_dst, overwrite,
+                                        headers=None):
+        file_info = self.get_status(dbfs_path_src, headers=headers)
+        if file_info.is_dir:
+            error_and_quit(('The dbfs file {} is a directory.').format(repr(dbfs_path_src)))
+        # Munge dst path in case dbfs_path_dst is a dir
+        try:
+            if self.get_status(dbfs_path_dst, headers=headers).is_dir:
+                dbfs_path_dst = dbfs_path_dst.join(dbfs_path_src.basename)
+        except HTTPError as e:
+            if e.response.json()['error_code'] != DbfsErrorCodes.RESOURCE_DOES_NOT_EXIST:
+                raise e
+        self.copy_file(dbfs_path_src, dbfs_path_dst, overwrite, length=file_info.file_size,
+                       headers=headers)
+
+    def _copy_within_dbfs_recursive(self, dbfs_path_src, dbfs_path_dst, overwrite, parallelism,
+                                    headers=None):
+        try:
+            self.mkdirs(dbfs_path_dst, headers=headers)
+        except HTTPError as e:
+            if e.response.json()['error_code'] == DbfsErrorCodes.RESOURCE_ALREADY_EXISTS:
+                click.echo(e.response.json())
+                return
+        directories, files = self._list_tree(dbfs_path_src, parallelism, headers=headers)
+
+        def to_dst(file_info):
+            return _join_relpath(dbfs_path_dst, file_info.dbfs_path.relpath(dbfs_path_src))
+
+        relpaths = [d.dbfs_path.relpath(dbfs_path_src).replace(os.sep, '/') for d in directories]
+        self._mkdirs_concurrently(dbfs_path_dst, relpaths, parallelism, headers=headers)
+        sizes = {f.dbfs_path.absolute_path: f.file_size for f in files}
+
+        def copy_file(cur_dbfs_src, cur_dbfs_dst):
+            try:
+                # The files are already spread over the pool, so each one is read as one stream.
+                self.copy_file(cur_dbfs_src, cur_dbfs_dst, overwrite,
+                               length=sizes[cur_dbfs_src.absolute_path], headers=headers,
+                               parallelism=1)
+            except HTTPError as e:
+                if e.response.json()['error_code'] == DbfsErrorCodes.RESOURCE_ALREADY_EXISTS:
+                    return '{} already exists. Skip.'.format(cur_dbfs_dst)
+                raise e
+            return '{} -> {}'.format(cur_dbfs_src, cur_dbfs_dst)
+
+        run_with_progress(copy_file, [(f.dbfs_path, to_dst(f)) for f in files], parallelism,
+                          'copy')
+
+    def _list_remote_tree(self, dbfs_path, parallelism, headers=None):
+        """
+        Lists the tree below dbfs_path keyed by paths relative to it. A missing dbfs_path is
+        treated as an empty tree.
+
+        :return: (Dict[str, FileInfo], Set[str]) the files and the directories of the tree.
+        """
+        try:
+            if not self.get_status(dbfs_path, headers=headers).is_dir:
+                error_and_quit('The dbfs path {} is a file.'.format(repr(dbfs_path)))
+        except HTTPError as e:
+            if e.response.json()['error_code'] == DbfsErrorCodes.RESOURCE_DOES_NOT_EXIST:
+                return {}, set()
+            raise e
+        directories, files = self._list_tree(dbfs_path, parallelism, headers=headers)
+
+        def to_relpath(file_info):
+            return file_info.dbfs_path.relpath(dbfs_path).replace(os.sep, '/')
+
+        return {to_relpath(f): f for f in files}, set(to_relpath(d) for d in directories)
+
+    @staticmethod
+    def _plan_sync(local_files, local_dirs, manifest, listed, remote_files, remote_dirs, delete):
+        """
+        Works out which local files to upload and which remote paths to delete. Unchanged files
+        are recorded in the manifest. A file is compared against its remote copy when the
+        destination was listed, and against the manifest otherwise.
+
+        :return: ([str], [str]) the relative paths to upload and the outermost ones to delete.
+        """
+        uploads = []
+        for relpath, state in sorted(local_files.items()):
+            if listed:
+                remote = remote_files.get(relpath)
+                changed = remote is None or state.is_newer_than(remote)
+            else:
+                changed = not manifest.is_unchanged(relpath, state)
+            if changed:
+                uploads.append(relpath)
+            else:
+                manifest.record(relpath, state)
+        deletes = []
+        if delete:
+            extra_dirs = remote_dirs - local_dirs
+            extra_files = [f for f in remote_files if f not in local_files]
+            deletes = outermost_paths(extra_dirs.union(extra_files))
+        return uploads, deletes
+
+    @staticmethod
+    def _echo_sync_plan(local_files, uploads, deletes, unchanged, to_dbfs_path):
+        for relpath in uploads:
+            click.echo('Would upload {} -> {}'.format(local_files[relpath].path,
+                                                      to_dbfs_path(relpath)))
+        for relpath in deletes:
+            click.echo('Would delete {}'.format(to_dbfs_path(relpath)))
+        click.echo('{} to upload, {} to delete, {} unchanged.'.format(
+            len(uploads), len(deletes), unchanged))
+
+    def _delete_remote(self, dbfs_path_dst, relpaths, remote_dirs, headers=None):
+        for relpath in relpaths:
+            dbfs_path = _join_relpath(dbfs_path_dst, relpath)
+            if relpath in remote_dirs:
+                self.delete(dbfs_path, recursive=True, headers=headers)
+            else:
+                self.client.delete(dbfs_path.absolute_path, recursive=False, headers=headers)
+            click.echo('Deleted {}'.format(dbfs_path))
+
+    def sync(self, src, dbfs_path_dst, delete=False, dry_run=False, parallelism=1,
+             manifest_path=None, full_scan=False, headers=None):
+        """
+        Uploads the files of the local directory src that are new or changed compared to
+        dbfs_path_dst. A file has changed if its size differs or it was modified after its copy
+        on DBFS.
+
+        When manifest_path is given, the local state of every synced file is cached there and
+        files that still match it are skipped without listing the destination. The destination
+        is only listed when there is no manifest yet, when ``full_scan`` is set, or when
+        ``delete`` is set, in which case files and directories missing from src are removed
+        from DBFS.
+        """
+        if not os.path.isdir(src):
+            error_and_quit('The local directory {} does not exist.'.format(src))
+        local_files, local_dirs = walk_local_tree(src)
+        manifest = SyncManifest.load(manifest_path) if manifest_path else SyncManifest(None)
+        listed = delete or full_scan or not manifest.entries
+        remote_files, remote_dirs = {}, set()
+        if listed:
+            remote_files, remote_dirs = self._list_remote_tree(dbfs_path_dst, parallelism,
+                                                               headers=headers)
+
+        uploads, deletes = self._plan_sync(local_files, local_dirs, manifest, listed,
+                                           remote_files, remote_dirs, delete)
+        unchanged = len(local_files) - len(uploads)
+
+        def to_dbfs_path(relpath):
+            return _join_relpath(dbfs_path_dst, relpath)
+
+        if dry_run:
+            self._echo_sync_plan(local_files, uploads, deletes, unchanged, to_dbfs_path)
+            return
+
+        parent_dirs = set(relpath.rsplit('/', 1)[0] for relpath in uploads if '/' in relpath)
+        self.mkdirs(dbfs_path_dst, headers=headers)
+        self._mkdirs_concurrently(dbfs_path_dst, parent_dirs, parallelism, headers=headers)
+
+        def upload(relpath, dbfs_path):
+            state = local_files[relpath]
+            self.put_file(state.path, dbfs_path, True, headers=headers)
+            manifest.record(relpath, state)
+            return '{} -> {}'.format(state.path, dbfs_path)
+
+        try:
+            run_with_progress(upload, [(relpath, to_dbfs_path(relpath)) for relpath in uploads],
+                              parallelism, 'copy')
+            self._delete_remote(dbfs_path_dst, deletes, remote_dirs, headers=headers)
+        finally:
+            if manifest_path:
+                manifest.retain(local_files)
+                manifest.save()
+        click.echo('{} uploaded, {} deleted, {} unchanged.'.format(
+            len(uploads), len(deletes), unchanged))
+
+    def cp(self, recursive, overwrite, src, dst, headers=None, parallelism=1):
+        """
+        Copies src to dst, where at least one of them is a DBFS path. With a ``parallelism``
+        greater than 1, recursive copies transfer that many files concurrently and report
+        failures once all copies are done instead of stopping at the first one.
+        """
         if not DbfsPath.is_valid(src) and DbfsPath.is_valid(dst):
             if not os.path.exists(src):
                 error_and_quit('The local file {} does not exist.'.format(src))
@@ -272,7 +549,7 @@ class DbfsApi(object):
                 if not os.path.isdir(src):
                     self._copy_to_dbfs_non_recursive(src, DbfsPath(dst), overwrite, headers=headers)
                     return
-                self._copy_to_dbfs_recursive(src, DbfsPath(dst), overwrite, headers=headers)
+                self._copy_recursive(src, DbfsPath(dst), overwrite, parallelism, headers=headers)
         # Copy from DBFS in this case
         elif DbfsPath.is_valid(src) and not DbfsPath.is_valid(dst):
             if not recursive:
@@ -282,46 +559,111 @@ class DbfsApi(object):
                 if not self.get_status(dbfs_path_src, headers=headers).is_dir:
                     self._copy_from_dbfs_non_recursive(dbfs_path_src, dst, overwrite,
                                                        headers=headers)
-                self._copy_from_dbfs_recursive(dbfs_path_src, dst, overwrite, headers=headers)
+                self._copy_recursive(dbfs_path_src, dst, overwrite, parallelism, headers=headers)
         elif not DbfsPath.is_valid(src) and not DbfsPath.is_valid(dst):
             error_and_quit('Both paths provided are from your local filesystem. '
                            'To use this utility, one of the src or dst must be prefixed '
                            'with dbfs:/')
         elif DbfsPath.is_valid(src) and DbfsPath.is_valid(dst):
-            with TempDir() as temp_dir:
-                # Always copy to <temp_dir>/temp since this will work no matter if it's a
-                # recursive or a non-recursive copy.
-                temp_path = temp_dir.path('temp')
-                self.cp(recursive, True, src, temp_path)
-                self.cp(recursive, overwrite, temp_path, dst)
+            self._copy_dbfs_to_dbfs(recursive, overwrite, DbfsPath(src), DbfsPath(dst),
+                                    parallelism, headers=headers)
         else:
             assert False, 'not reached'
 
-    def cat(self, src):
-        with TempDir() as temp_dir:
-            temp_path = temp_dir.path('temp')
-            self.cp(False, True, src, temp_path)
-            with open(temp_path) as f:
-                click.echo(f.read(), nl=False)
-
-
-class TempDir(object):
-    def __init__(self, remove_on_exit=True):
-        self._dir = None
-        self._path = None
-        self._remove = remove_on_exit
-
-    def __enter__(self):
-        self._path = os.path.abspath(tempfile.mkdtemp())
-        assert os.path.exists(self._path)
-        return self
-
-    def __exit__(self, tp, val, traceback):
-        if self._remove and os.path.exists(self._path):
-            shutil.rmtree(self._path)
-
-        assert not self._remove or not os.path.exists(self._path)
-        assert os.path.exists(os.getcwd())
-
-    def path(self, *path):
-        return os.path.join(self._path, *path)
+    def _copy_recursive(self, src, dst, overwrite, parallelism, headers=None):
+        """
+        Copies the directory src to dst, one of which is a DbfsPath and the other a local path.
+        """
+        if isinstance(src, DbfsPath):
+            if parallelism > 1:
+                self._copy_from_dbfs_recursive_parallel(src, dst, overwrite, parallelism,
+                                                        headers=headers)
+            else:
+                self._copy_from_dbfs_recursive(src, dst, overwrite, headers=headers)
+        elif parallelism > 1:
+            self._copy_to_dbfs_recursive_parallel(src, dst, overwrite, parallelism,
+                                                  headers=headers)
+        else:
+            self._copy_to_dbfs_recursive(src, dst, overwrite, headers=headers)
+
+    def _copy_dbfs_to_dbfs(self, recursive, overwrite, dbfs_path_src, dbfs_path_dst,
+                           parallelism, headers=None):
+        """
+        Copies between two DBFS paths by relaying the contents through memory.
+        """
+        if recursive and self.get_status(dbfs_path_src, headers=headers).is_dir:
+            self._copy_within_dbfs_recursive(dbfs_path_src, dbfs_path_dst, overwrite,
+                                             parallelism, headers=headers)
+        else:
+            self._copy_within_dbfs_non_recursive(dbfs_path_src, dbfs_path_dst, overwrite,
+                                                 headers=headers)
+
+    def cat(self, src, offset=None, length=None, tail_lines=None, headers=None):
+        """
+        Streams the contents of a DBFS file to stdout as they are read. The next chunks are
+        fetched while the current one is being written.
+
+        :param offset: Byte offset to start reading from.
+        :param length: Maximum number of bytes to show.
+        :param tail_lines: Only shows the last tail_lines lines, reading just the end of the file.
+        """
+        dbfs_path = DbfsPath(src)
+        file_info = self.get_status(dbfs_path, headers=headers)
+        if file_info.is_dir:
+            error_and_quit(('The dbfs file {} is a directory.').format(repr(dbfs_path)))
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        if tail_lines is not None:
+            contents = self._read_tail(dbfs_path, file_info.file_size, tail_lines,
+                                       headers=headers)
+            click.echo(decoder.decode(contents, final=True), nl=False)
+            return
+        start = min(offset or 0, file_info.file_size)
+        end = file_info.file_size if length is None else min(start + length, file_info.file_size)
+        for blocks in read_ahead(self.client, dbfs_path.absolute_path, start, end,
+                                 BUFFER_SIZE_BYTES, headers=headers):
+            text = decoder.decode(b''.join(b64decode(data) for data in blocks))
+            if text:
+                click.echo(text, nl=False)
+        text = decoder.decode(b'', final=True)
+        if text:
+            click.echo(text, nl=False)
+
+    def _read_tail(self, dbfs_path, length, lines, headers=None):
+        """
+        Returns the bytes of the last ``lines`` lines of the file, reading chunks backwards from
+        the end only until enough newlines were seen. A newline ending the file does not start
+        another line.
+        """
+        chunks = []
+        end = length
+        newlines = 0
+        while end > 0 and lines > 0:
+            start = max(0, end - BUFFER_SIZE_BYTES)
+            chunk = b''.join(b64decode(data) for _, data in
+                             read_range(self.client, dbfs_path.absolute_path, start, end,
+                                        headers))
+            search_end = len(chunk) - 1 if end == length else len(chunk)
+            position = chunk.rfind(b'\n', 0, search_end)
+            while position != -1:
+                newlines += 1
+                if newlines == lines:
+                    chunks.append(chunk[position + 1:])
+                    return b''.join(reversed(chunks))
+                position = chunk.rfind(b'\n', 0, position)
+            chunks.append(chunk)
+            end = start
+        return b''.join(reversed(chunks)) if lines > 0 else b''
+
+
+def _join_relpath(dbfs_path, relpath):
+    for name in relpath.replace(os.sep, '/').split('/'):
+        dbfs_path = dbfs_path.join(name)
+    return dbfs_path
+
+
+def _echo_download_progress(bytes_done, total_bytes):
+    # Single chunk files complete at once, so there is nothing worth reporting.
+    if bytes_done == total_bytes and bytes_done <= BUFFER_SIZE_BYTES:
+        return
+    click.echo('\rDownloaded {} of {} bytes.\033[K'.format(bytes_done, total_bytes),
+               nl=bytes_done == total_bytes, err=True)
@@ -27,9 +27,11 @@ from tabulate import tabulate
 from databricks_cli.utils import eat_exceptions, error_and_quit, CONTEXT_SETTINGS
 from databricks_cli.version import print_version_callback, version
 from databricks_cli.configure.cli import configure_cli
-from databricks_cli.configure.config import provide_api_client, profile_option, debug_option
+from databricks_cli.configure.config import provide_api_client, profile_option, debug_option, \
+    trace_http_option
 from databricks_cli.dbfs.api import DbfsApi
 from databricks_cli.dbfs.dbfs_path import DbfsPath, DbfsPathClickType
+from databricks_cli.dbfs.sync import default_manifest_path
 
 
 @click.command(context_settings=CONTEXT_SETTINGS)
@@ -93,13 +95,16 @@ def rm_cli(api_client, recursive, dbfs_path):
 @click.command(context_settings=CONTEXT_SETTINGS)
 @click.option('--recursive', '-r', is_flag=True, default=False)
 @click.option('--overwrite', is_flag=True, default=False)
+@click.option('--parallelism', default=1, type=click.IntRange(min=1),
+              help='Number of files to transfer concurrently in recursive copies. '
+                   'Set to 1 by default.')
 @click.argument('src')
 @click.argument('dst')
 @debug_option
 @profile_option
 @eat_exceptions
 @provide_api_client
-def cp_cli(api_client, recursive, overwrite, src, dst):
+def cp_cli(api_client, recursive, overwrite, parallelism, src, dst):
     """
     Copy files to and from DBFS.
 
@@ -113,9 +118,46 @@ def cp_cli(api_client, recursive, overwrite, src, dst):
     ``dbfs cp -r dbfs:/foo foo`` will create a directory foo and place the files ``dbfs:/foo/a`` at
     ``foo/a``. If ``foo/a`` already exists, the file will not be overridden unless the --overwrite
     flag is provided -- however, dbfs cp --recursive will continue to try and copy other files.
+
+    With --parallelism N, recursive copies list the source tree and transfer up to N files
+    concurrently. Copies that fail do not stop the others and are summarized at the end.
     """
     # Copy to DBFS in this case
-    DbfsApi(api_client).cp(recursive, overwrite, src, dst)
+    DbfsApi(api_client).cp(recursive, overwrite, src, dst, parallelism=parallelism)
+
+
+@click.command(context_settings=CONTEXT_SETTINGS)
+@click.option('--delete', is_flag=True, default=False,
+              help='Deletes files and directories in the dst that do not exist in the src.')
+@click.option('--dry-run', is_flag=True, default=False,
+              help='Shows what would be uploaded and deleted without changing anything.')
+@click.option('--full-scan', is_flag=True, default=False,
+              help='Compares against a fresh listing of the dst instead of trusting the '
+                   'manifest of the previous sync.')
+@click.option('--parallelism', default=1, type=click.IntRange(min=1),
+              help='Number of files to upload concurrently. Set to 1 by default.')
+@click.argument('src', type=click.Path(exists=True, file_okay=False))
+@click.argument('dst', type=DbfsPathClickType())
+@debug_option
+@profile_option
+@eat_exceptions
+@provide_api_client
+def sync_cli(api_client, delete, dry_run, full_scan, parallelism, src, dst):
+    """
+    Uploads new and changed files of a local directory to DBFS.
+
+    A file is uploaded if it does not exist in the dst, if its size differs, or if it was
+    modified locally after its copy in DBFS was written. With --delete, files and directories
+    of the dst that do not exist in the src are removed.
+
+    The size and modification time of every synced file are cached in a manifest under
+    ~/.databricks/fs-sync. Later syncs of the same src and dst skip files that have not changed
+    since without listing the dst again, so changes made to the dst by other means are only
+    picked up with --full-scan or --delete.
+    """
+    manifest_path = default_manifest_path(api_client.url, src, dst)
+    DbfsApi(api_client).sync(src, dst, delete=delete, dry_run=dry_run, parallelism=parallelism,
+                             manifest_path=manifest_path, full_scan=full_scan)
 
 
 @click.command(context_settings=CONTEXT_SETTINGS)
@@ -136,6 +178,7 @@ def mv_cli(api_client, src, dst):
 @click.option('--version', '-v', is_flag=True, callback=print_version_callback,
               expose_value=False, is_eager=True, help=version)
 @debug_option
+@trace_http_option
 @profile_option
 def dbfs_group():  # pragma: no cover
     """
@@ -147,16 +190,27 @@ def dbfs_group():  # pragma: no cover
 
 
 @click.command(context_settings=CONTEXT_SETTINGS)
+@click.option('--offset', default=None, type=click.IntRange(min=0),
+              help='Byte offset to start reading from. Set to 0 by default.')
+@click.option('--length', default=None, type=click.IntRange(min=0),
+              help='Maximum number of bytes to show. Shows the rest of the file by default.')
+@click.option('--tail', 'tail_lines', default=None, type=click.IntRange(min=0),
+              help='Shows only the last N lines of the file.')
 @click.argument('src')
 @debug_option
 @profile_option
 @eat_exceptions
 @provide_api_client
-def cat_cli(api_client, src):
+def cat_cli(api_client, offset, length, tail_lines, src):
     """
     Show the contents of a file. Does not work for directories.
+
+    The contents are streamed as they are read, so files of any size can be shown. With --tail,
+    only the end of the file is read. --tail cannot be combined with --offset or --length.
     """
-    DbfsApi(api_client).cat(src)
+    if tail_lines is not None and (offset is not None or length is not None):
+        error_and_quit('--tail cannot be combined with --offset or --length.')
+    DbfsApi(api_client).cat(src, offset=offset, length=length, tail_lines=tail_lines)
 
 
 dbfs_group.add_command(configure_cli, name='configure')
@@ -165,4 +219,5 @@ dbfs_group.add_command(mkdirs_cli, name='mkdirs')
 dbfs_group.add_command(rm_cli, name='rm')
 dbfs_group.add_command(cp_cli, name='cp')
 dbfs_group.add_command(mv_cli, name='mv')
+dbfs_group.add_command(sync_cli, name='sync')
 dbfs_group.add_command(cat_cli, name='cat')
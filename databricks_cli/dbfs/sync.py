@@ -0,0 +1,123 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Change detection for ``databricks fs sync``.
+"""
+
+import json
+import os
+from hashlib import sha1
+
+from databricks_cli.utils import write_json_atomically
+
+MANIFEST_VERSION = 1
+
+
+def default_manifest_path(host, src, dbfs_path_dst):
+    """
+    Returns where the manifest of a sync from src to dbfs_path_dst on host is cached. Each
+    combination of workspace, source and destination gets its own manifest.
+    """
+    key = '\n'.join([host, os.path.abspath(src), dbfs_path_dst.absolute_path])
+    file_name = sha1(key.encode('utf-8')).hexdigest() + '.json'
+    return os.path.join(os.path.expanduser('~'), '.databricks', 'fs-sync', file_name)
+
+
+class LocalFileState(object):
+    def __init__(self, path, size, mtime_millis):
+        self.path = path
+        self.size = size
+        self.mtime_millis = mtime_millis
+
+    def is_newer_than(self, file_info):
+        """
+        Returns whether this local file differs from the remote FileInfo. DBFS sets the
+        modification time of a file when it is written, so an unchanged local file is always
+        older than its uploaded copy.
+        """
+        if file_info.file_size != self.size:
+            return True
+        return file_info.modification_time is not None and \
+            self.mtime_millis > file_info.modification_time
+
+
+def walk_local_tree(src):
+    """
+    Lists the files and directories below src, keyed by their path relative to src with ``/``
+    as the separator.
+
+    :return: (Dict[str, LocalFileState], Set[str]) the files and the directories of the tree.
+    """
+    files, directories = {}, set()
+    for root, dirnames, filenames in os.walk(src):
+        relroot = os.path.relpath(root, src)
+        prefix = '' if relroot == os.curdir else relroot.replace(os.sep, '/') + '/'
+        directories.update(prefix + d for d in dirnames)
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            if not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            files[prefix + filename] = LocalFileState(path, stat.st_size,
+                                                      int(stat.st_mtime * 1000))
+    return files, directories
+
+
+class SyncManifest(object):
+    """
+    Remembers the size and modification time of every local file as of its last successful sync.
+    A file whose state still matches the manifest does not need to be compared against DBFS.
+    """
+    def __init__(self, path, entries=None):
+        self.path = path
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads the manifest at path. A missing or unreadable manifest yields an empty one, which
+        makes the next sync fall back to comparing against a listing of the destination.
+        """
+        try:
+            with open(path, 'r') as f:
+                content = json.load(f)
+            if content.get('version') == MANIFEST_VERSION:
+                return cls(path, content['files'])
+        except (IOError, OSError, ValueError, KeyError, AttributeError):
+            pass
+        return cls(path)
+
+    def is_unchanged(self, relpath, state):
+        entry = self.entries.get(relpath)
+        return entry is not None and entry['size'] == state.size and \
+            entry['mtime'] == state.mtime_millis
+
+    def record(self, relpath, state):
+        self.entries[relpath] = {'size': state.size, 'mtime': state.mtime_millis}
+
+    def retain(self, relpaths):
+        self.entries = {k: v for k, v in self.entries.items() if k in relpaths}
+
+    def save(self):
+        write_json_atomically(self.path, {'version': MANIFEST_VERSION, 'files': self.entries})
@@ -0,0 +1,402 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Concurrent engines for moving file contents between the local filesystem and DBFS.
+"""
+
+import os
+import queue
+import stat
+import threading
+import time
+from base64 import b64decode, b64encode
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from itertools import islice
+
+from requests.exceptions import ConnectionError as RequestsConnectionError, HTTPError, Timeout
+
+DEFAULT_PARALLELISM = 8
+MAX_CHUNK_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 0.5
+DEFAULT_MAX_BUFFERED_BYTES = 64 * 2**20
+QUEUE_POLL_SECONDS = 0.1
+
+# Marks the end of the stream passed between the stages of the upload pipeline.
+_END_OF_STREAM = object()
+
+
+def _is_transient(exception):
+    if isinstance(exception, HTTPError):
+        status_code = getattr(exception.response, 'status_code', None)
+        return status_code is not None and status_code >= 500
+    return isinstance(exception, (RequestsConnectionError, Timeout))
+
+
+def call_with_retries(function, attempts=MAX_CHUNK_ATTEMPTS):
+    """
+    Calls ``function`` and retries it with exponential backoff when it fails with a transient
+    error (a connection failure, a timeout or a 5xx response). Any other error is raised
+    immediately.
+    """
+    attempt = 0
+    while True:
+        try:
+            return function()
+        except (RequestsConnectionError, Timeout, HTTPError) as e:
+            attempt += 1
+            if attempt >= attempts or not _is_transient(e):
+                raise
+            time.sleep(RETRY_DELAY_SECONDS * 2 ** (attempt - 1))
+
+
+class _PositionalWriter(object):
+    """
+    Writes byte strings at absolute offsets of an open file descriptor. Uses ``os.pwrite`` where
+    the platform provides it and falls back to a locked seek and write otherwise.
+    """
+    def __init__(self, fd):
+        self.fd = fd
+        self._lock = threading.Lock()
+
+    def write(self, data, offset):
+        view = memoryview(data)
+        while len(view) > 0:
+            written = self._write_once(view, offset)
+            view = view[written:]
+            offset += written
+
+    def _write_once(self, view, offset):
+        if hasattr(os, 'pwrite'):
+            return os.pwrite(self.fd, view, offset)
+        with self._lock:
+            os.lseek(self.fd, offset, os.SEEK_SET)
+            return os.write(self.fd, view)
+
+
+class OrderedProgress(object):
+    """
+    Tracks chunks that may complete in any order and reports progress only for the contiguous
+    prefix of the file that is done, so the reported byte count never goes backwards or skips
+    ahead of a missing chunk.
+    """
+    def __init__(self, total_bytes, callback=None):
+        self.total_bytes = total_bytes
+        self.bytes_done = 0
+        self._callback = callback
+        self._pending = {}
+
+    def complete(self, offset, num_bytes):
+        self._pending[offset] = num_bytes
+        advanced = False
+        while self.bytes_done in self._pending:
+            self.bytes_done += self._pending.pop(self.bytes_done)
+            advanced = True
+        if advanced and self._callback is not None:
+            self._callback(self.bytes_done, self.total_bytes)
+
+
+class ChunkedDownloader(object):
+    """
+    Downloads a DBFS file by issuing ranged ``/dbfs/read`` calls over a thread pool. Every chunk
+    is written straight to its place in a preallocated local file, and each read is retried on
+    transient failures. Destinations that cannot be written at arbitrary offsets, such as pipes
+    and terminals, receive the chunks in order instead.
+    """
+    def __init__(self, client, chunk_size, parallelism=DEFAULT_PARALLELISM, headers=None):
+        """
+        :param client: DbfsService used to issue the reads.
+        :param chunk_size: Number of bytes requested by each read.
+        :param parallelism: Maximum number of reads in flight at once.
+        """
+        self.client = client
+        self.chunk_size = chunk_size
+        self.parallelism = max(1, parallelism or 1)
+        self.headers = headers
+
+    def download(self, path, length, dst_path, progress_callback=None):
+        """
+        Downloads the first ``length`` bytes of the DBFS file at the API path ``path`` into
+        ``dst_path``, overwriting it. ``progress_callback(bytes_done, total_bytes)`` is invoked
+        from the calling thread as the downloaded prefix of the file grows.
+        """
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+        fd = os.open(dst_path, flags, 0o666)
+        try:
+            progress = OrderedProgress(length, progress_callback)
+            if not stat.S_ISREG(os.fstat(fd).st_mode):
+                self._download_in_order(path, length, fd, progress)
+                return
+            os.ftruncate(fd, length)
+            writer = _PositionalWriter(fd)
+            offsets = range(0, length, self.chunk_size)
+            if self.parallelism == 1 or len(offsets) <= 1:
+                for offset in offsets:
+                    size = self._fetch_chunk(path, writer, offset, length)
+                    progress.complete(offset, size)
+                return
+            workers = min(self.parallelism, len(offsets))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self._fetch_chunk, path, writer, offset, length):
+                           offset for offset in offsets}
+                try:
+                    for future in as_completed(futures):
+                        progress.complete(futures[future], future.result())
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            os.close(fd)
+
+    def _download_in_order(self, path, length, fd, progress):
+        """
+        Appends the chunks to fd in order, still reading up to ``parallelism`` chunks ahead.
+        """
+        offset = 0
+        chunks = read_ahead(self.client, path, 0, length, self.chunk_size, self.parallelism,
+                            self.headers)
+        for blocks in chunks:
+            size = 0
+            for data in blocks:
+                view = memoryview(b64decode(data))
+                size += len(view)
+                while len(view) > 0:
+                    view = view[os.write(fd, view):]
+            progress.complete(offset, size)
+            offset += size
+
+    def _fetch_chunk(self, path, writer, offset, length):
+        """
+        Reads the chunk starting at ``offset`` into place.
+        """
+        end = min(offset + self.chunk_size, length)
+        for position, data in read_range(self.client, path, offset, end, self.headers):
+            writer.write(b64decode(data), position)
+        return end - offset
+
+
+def read_range(client, path, start, end, headers=None):
+    """
+    Reads the bytes [start, end) of the DBFS file at the API path ``path`` and yields
+    ``(offset, base64_data)`` pairs. A single read may return fewer bytes than requested, in
+    which case the remainder of the range is requested again. Each read is retried on transient
+    failures.
+    """
+    position = start
+    while position < end:
+        read = partial(client.read, path, position, end - position, headers=headers)
+        response = call_with_retries(read)
+        bytes_read = response['bytes_read']
+        if bytes_read == 0:
+            raise RuntimeError('Unexpected end of file at offset {} of {}.'.format(
+                position, path))
+        yield position, response['data']
+        position += bytes_read
+
+
+def read_ahead(client, path, start, end, chunk_size, window=DEFAULT_PARALLELISM, headers=None):
+    """
+    Reads the bytes [start, end) of the DBFS file at the API path ``path`` chunk by chunk and
+    yields the base64 payloads of every chunk, in order, as a list. Up to ``window`` chunks are
+    fetched concurrently ahead of the one being consumed, which also bounds the memory held.
+    """
+    offsets = iter(range(start, end, chunk_size))
+
+    def read_chunk(offset):
+        chunk_end = min(offset + chunk_size, end)
+        return [data for _, data in read_range(client, path, offset, chunk_end, headers)]
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(1, window)) as executor:
+        try:
+            for offset in islice(offsets, max(1, window)):
+                pending.append(executor.submit(read_chunk, offset))
+            while pending:
+                blocks = pending.popleft().result()
+                for offset in islice(offsets, 1):
+                    pending.append(executor.submit(read_chunk, offset))
+                yield blocks
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class StreamingRelay(object):
+    """
+    Copies a DBFS file to another DBFS path without touching local disk. The base64 payloads
+    returned by ``/dbfs/read`` are forwarded to ``add-block`` as they are, so nothing is decoded
+    or re-encoded. Up to ``parallelism`` chunks are read ahead of the block being appended.
+    """
+    def __init__(self, client, chunk_size, parallelism=DEFAULT_PARALLELISM, headers=None):
+        self.client = client
+        self.chunk_size = chunk_size
+        self.parallelism = max(1, parallelism or 1)
+        self.headers = headers
+
+    def relay(self, src_path, length, dst_path, overwrite):
+        """
+        Copies the first ``length`` bytes of the file at the API path src_path to dst_path.
+
+        If a read or an ``add-block`` fails, the handle is deliberately left open: closing it
+        would publish a truncated file at dst_path, while an abandoned handle expires on the
+        server and leaves dst_path untouched.
+        """
+        handle = self.client.create(dst_path, overwrite, headers=self.headers)['handle']
+        chunks = read_ahead(self.client, src_path, 0, length, self.chunk_size,
+                            self.parallelism, self.headers)
+        for blocks in chunks:
+            for data in blocks:
+                self.client.add_block(handle, data, headers=self.headers)
+        self.client.close(handle, headers=self.headers)
+
+
+class _StageFailure(object):
+    """Carries an exception raised in a pipeline stage over to the consuming thread."""
+    def __init__(self, exception):
+        self.exception = exception
+
+
+def _put(stage_queue, item, stop):
+    """Blocks until item is enqueued. Returns False if the pipeline was stopped meanwhile."""
+    while not stop.is_set():
+        try:
+            stage_queue.put(item, timeout=QUEUE_POLL_SECONDS)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(stage_queue, stop):
+    """Blocks until an item is available. Returns _END_OF_STREAM if the pipeline was stopped."""
+    while not stop.is_set():
+        try:
+            return stage_queue.get(timeout=QUEUE_POLL_SECONDS)
+        except queue.Empty:
+            pass
+    return _END_OF_STREAM
+
+
+class UploadStats(object):
+    def __init__(self, bytes_uploaded, elapsed_seconds):
+        self.bytes_uploaded = bytes_uploaded
+        self.elapsed_seconds = elapsed_seconds
+
+    @property
+    def bytes_per_second(self):
+        if self.elapsed_seconds <= 0:
+            return float(self.bytes_uploaded)
+        return self.bytes_uploaded / self.elapsed_seconds
+
+    def __str__(self):
+        return '{} bytes in {:.1f}s ({:.2f} MiB/s)'.format(
+            self.bytes_uploaded, self.elapsed_seconds, self.bytes_per_second / 2**20)
+
+
+class PipelinedUploader(object):
+    """
+    Streams a local file into DBFS with ``create``, ``add-block`` and ``close``. A reader thread
+    and an encoder thread feed base64 encoded blocks through bounded queues to the calling
+    thread, so disk reads and encoding overlap with the ``add-block`` round trips. Blocks of a
+    handle must be appended in order, so the requests themselves remain sequential.
+    """
+    def __init__(self, client, chunk_size, max_buffered_bytes=DEFAULT_MAX_BUFFERED_BYTES,
+                 headers=None):
+        """
+        :param client: DbfsService used to issue the requests.
+        :param chunk_size: Number of bytes sent by each add-block call.
+        :param max_buffered_bytes: Approximate ceiling on the memory held by queued chunks.
+        """
+        self.client = client
+        self.chunk_size = chunk_size
+        # A chunk occupies chunk_size bytes raw and about 4/3 of that once encoded, and each
+        # stage may also hold one chunk while it blocks on the next queue.
+        self.queue_depth = max(1, max_buffered_bytes // (3 * chunk_size) - 1)
+        self.headers = headers
+
+    def upload(self, src_path, path, overwrite, progress_callback=None):
+        """
+        Uploads the local file src_path to the DBFS API path ``path``.
+        ``progress_callback(bytes_done, total_bytes)`` is called after every block.
+
+        :return: UploadStats
+        """
+        total_bytes = os.path.getsize(src_path)
+        start_time = time.time()
+        handle = self.client.create(path, overwrite, headers=self.headers)['handle']
+        raw_chunks = queue.Queue(self.queue_depth)
+        encoded_chunks = queue.Queue(self.queue_depth)
+        stop = threading.Event()
+        stages = [
+            threading.Thread(target=self._read, args=(src_path, raw_chunks, stop)),
+            threading.Thread(target=self._encode, args=(raw_chunks, encoded_chunks, stop)),
+        ]
+        for stage in stages:
+            stage.daemon = True
+            stage.start()
+        bytes_uploaded = 0
+        try:
+            while True:
+                item = _get(encoded_chunks, stop)
+                if item is _END_OF_STREAM:
+                    break
+                if isinstance(item, _StageFailure):
+                    raise item.exception
+                data, size = item
+                self.client.add_block(handle, data, headers=self.headers)
+                bytes_uploaded += size
+                if progress_callback is not None:
+                    progress_callback(bytes_uploaded, total_bytes)
+        finally:
+            stop.set()
+            for stage in stages:
+                stage.join()
+        self.client.close(handle, headers=self.headers)
+        return UploadStats(bytes_uploaded, time.time() - start_time)
+
+    def _read(self, src_path, raw_chunks, stop):
+        try:
+            with open(src_path, 'rb') as local_file:
+                while True:
+                    contents = local_file.read(self.chunk_size)
+                    if len(contents) == 0:
+                        break
+                    if not _put(raw_chunks, contents, stop):
+                        return
+        except Exception as e:  # noqa
+            _put(raw_chunks, _StageFailure(e), stop)
+            return
+        _put(raw_chunks, _END_OF_STREAM, stop)
+
+    @staticmethod
+    def _encode(raw_chunks, encoded_chunks, stop):
+        while True:
+            item = _get(raw_chunks, stop)
+            if item is not _END_OF_STREAM and not isinstance(item, _StageFailure):
+                # add_block should not take a bytes object.
+                item = (b64encode(item).decode(), len(item))
+            if not _put(encoded_chunks, item, stop) or not isinstance(item, tuple):
+                return
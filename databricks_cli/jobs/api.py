@@ -20,16 +20,40 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from databricks_cli.jobs.index import JobNameIndex, default_index_path
 from databricks_cli.sdk import JobsService
+from databricks_cli.utils import run_concurrently
+
+# Largest page of jobs returned by jobs/list.
+MAX_PAGE_SIZE = 25
+# Per-run parameters accepted by jobs/run-now.
+RUN_NOW_PARAMS = ('jar_params', 'notebook_params', 'python_params', 'spark_submit_params',
+                  'python_named_params')
 
 
 class JobsApi(object):
-    def __init__(self, api_client):
+    def __init__(self, api_client, use_name_index=False):
+        """
+        With ``use_name_index``, jobs are looked up by name in a local index of the workspace
+        instead of listing them every time. Jobs created, reset or deleted through this class
+        are invalidated in the index either way.
+        """
         self.client = JobsService(api_client)
+        self.use_name_index = use_name_index
+        host = getattr(api_client, 'url', None)
+        self.name_index_path = default_index_path(host) if isinstance(host, str) else None
+        self._name_index = None
+        self._name_index_lock = threading.RLock()
 
     def create_job(self, json, headers=None, version=None):
-        return self.client.client.perform_query('POST', '/jobs/create', data=json, headers=headers,
-                                                version=version)
+        result = self.client.client.perform_query('POST', '/jobs/create', data=json,
+                                                  headers=headers, version=version)
+        self._invalidate_name_index(names=[json.get('name')])
+        return result
 
     def list_jobs(self, job_type=None, expand_tasks=None, offset=None, limit=None, headers=None,
                   version=None, name=None):
@@ -40,15 +64,51 @@ class JobsApi(object):
             resp['jobs'] = []
         return resp
 
+    def iter_jobs(self, job_type=None, expand_tasks=None, name=None, page_size=MAX_PAGE_SIZE,
+                  prefetch=True, headers=None, version=None):
+        """
+        Yields every job, paging through jobs/list. Only one page is held at a time; with
+        ``prefetch``, the next page is requested while the jobs of the current one are consumed.
+        The first page is requested with the server's default size, as a single page is all
+        that API 2.0 returns.
+        """
+        def fetch(offset, limit):
+            return self.list_jobs(job_type=job_type, expand_tasks=expand_tasks, offset=offset,
+                                  limit=limit, headers=headers, version=version, name=name)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = fetch(None, None)
+            offset = 0
+            while True:
+                jobs = page['jobs']
+                offset += len(jobs)
+                has_more = page.get('has_more', False) and len(jobs) > 0
+                next_page = None
+                if has_more and prefetch:
+                    next_page = executor.submit(fetch, offset, page_size)
+                for job in jobs:
+                    yield job
+                if not has_more:
+                    return
+                page = next_page.result() if next_page else fetch(offset, page_size)
+
     def delete_job(self, job_id, headers=None, version=None):
-        return self.client.delete_job(job_id, headers=headers, version=version)
+        result = self.client.delete_job(job_id, headers=headers, version=version)
+        self._invalidate_name_index(job_id=job_id)
+        return result
 
     def get_job(self, job_id, headers=None, version=None):
         return self.client.get_job(job_id, headers=headers, version=version)
 
     def reset_job(self, json, headers=None, version=None):
-        return self.client.client.perform_query('POST', '/jobs/reset', data=json, headers=headers,
-                                                version=version)
+        new_settings = json.get('new_settings') or {}
+        try:
+            return self.client.client.perform_query('POST', '/jobs/reset', data=json,
+                                                    headers=headers, version=version)
+        finally:
+            # A failed reset may mean that the job was deleted by another client.
+            self._invalidate_name_index(job_id=json.get('job_id'),
+                                        names=[new_settings.get('name')])
 
     def run_now(self, job_id, jar_params, notebook_params, python_params, spark_submit_params,
                 python_named_params=None, idempotency_token=None, headers=None, version=None):
@@ -56,7 +116,64 @@ class JobsApi(object):
                                    spark_submit_params, python_named_params,
                                    idempotency_token, headers=headers, version=version)
 
+    def run_now_batch(self, run_requests, parallelism=1, headers=None, version=None):
+        """
+        Triggers a run for each of run_requests over a pool of ``parallelism`` threads sharing
+        the connections of the api client. A request is a dict with a ``job_id`` and optional
+        ``params`` (keyed by RUN_NOW_PARAMS) and ``idempotency_token``. Yields
+        ``(request, result, exception)`` tuples in completion order.
+        """
+        def run(request):
+            params = request.get('params') or {}
+            return self.run_now(request['job_id'], params.get('jar_params'),
+                                params.get('notebook_params'), params.get('python_params'),
+                                params.get('spark_submit_params'),
+                                params.get('python_named_params'),
+                                request.get('idempotency_token'), headers=headers,
+                                version=version)
+        return run_concurrently(run, run_requests, parallelism)
+
     def _list_jobs_by_name(self, name, headers=None):
-        jobs = self.list_jobs(headers=headers, name=name)['jobs']
+        with self._name_index_lock:
+            index = self._get_name_index(headers=headers)
+            if index is not None:
+                jobs = index.lookup(name)
+                if jobs is not None:
+                    return jobs
+        jobs = self.iter_jobs(headers=headers, name=name)
         result = list(filter(lambda job: job['settings']['name'] == name, jobs))
+        if index is not None:
+            with self._name_index_lock:
+                index.record(name, result)
+                index.save()
         return result
+
+    def _get_name_index(self, headers=None):
+        """
+        Loads the name index on first use, rebuilding it from a full listing when it is missing
+        or expired.
+        """
+        if not self.use_name_index or self.name_index_path is None:
+            return None
+        if self._name_index is None:
+            index = JobNameIndex.load(self.name_index_path)
+            if index.is_expired:
+                index.rebuild(self.iter_jobs(headers=headers))
+                index.save()
+            self._name_index = index
+        return self._name_index
+
+    def _invalidate_name_index(self, job_id=None, names=()):
+        if self.name_index_path is None:
+            return
+        with self._name_index_lock:
+            index = self._name_index
+            if index is None:
+                if not os.path.exists(self.name_index_path):
+                    return
+                index = JobNameIndex.load(self.name_index_path)
+            if job_id is not None:
+                index.remove_job(job_id)
+            for name in names:
+                index.forget(name)
+            index.save()
@@ -21,15 +21,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from json import loads as json_loads
+import textwrap
+from json import loads as json_loads, dumps as json_dumps
 
 import click
 from tabulate import tabulate
 
 from databricks_cli.click_types import OutputClickType, JsonClickType, JobIdClickType
-from databricks_cli.jobs.api import JobsApi
+from databricks_cli.jobs.api import JobsApi, MAX_PAGE_SIZE, RUN_NOW_PARAMS
 from databricks_cli.utils import eat_exceptions, CONTEXT_SETTINGS, pretty_format, json_cli_base, \
-    truncate_string
+    truncate_string, error_and_quit
 
 from databricks_cli.configure.config import provide_api_client, profile_option, \
     get_profile_from_context, debug_option, get_config, api_version_option
@@ -109,10 +110,12 @@ def reset_cli(api_client, json_file, json, job_id, version):
     JobsApi(api_client).reset_job(request_body, version=version)
 
 
+def _job_to_row(job):
+    return job['job_id'], truncate_string(job['settings']['name'])
+
+
 def _jobs_to_table(jobs_json):
-    ret = []
-    for j in jobs_json['jobs']:
-        ret.append((j['job_id'], truncate_string(j['settings']['name'])))
+    ret = [_job_to_row(j) for j in jobs_json['jobs']]
     return sorted(ret, key=lambda t: t[1].lower())
 
 
@@ -160,22 +163,21 @@ def list_cli(api_client, output, job_type, version, expand_tasks, offset, limit,
                    '--offset, --limit, --all, and --name are only available in API 2.1', err=True)
         return
     jobs_api = JobsApi(api_client)
-    has_more = True
-    jobs = []
     if _all:
-        offset = 0
-        limit = 20
-    while has_more:
-        jobs_json = jobs_api.list_jobs(job_type=job_type, expand_tasks=expand_tasks,
-                                       offset=offset, limit=limit, version=version,
-                                       name=name)
-        jobs += jobs_json['jobs'] if 'jobs' in jobs_json else []
-        has_more = jobs_json.get('has_more', False) and _all
-        if has_more:
-            offset = offset + \
-                (len(jobs_json['jobs']) if 'jobs' in jobs_json else 20)
-
-    out = {'jobs': jobs}
+        jobs = jobs_api.iter_jobs(job_type=job_type, expand_tasks=expand_tasks, name=name,
+                                  page_size=limit or MAX_PAGE_SIZE, version=version)
+        if OutputClickType.is_json(output):
+            _echo_jobs_json(jobs)
+        else:
+            # Only the table columns are kept, since the rows are sorted before being printed.
+            rows = [_job_to_row(j) for j in jobs]
+            click.echo(tabulate(sorted(rows, key=lambda t: t[1].lower()),
+                       tablefmt='plain', disable_numparse=True))
+        return
+    jobs_json = jobs_api.list_jobs(job_type=job_type, expand_tasks=expand_tasks,
+                                   offset=offset, limit=limit, version=version,
+                                   name=name)
+    out = {'jobs': jobs_json['jobs'] if 'jobs' in jobs_json else []}
     if OutputClickType.is_json(output):
         click.echo(pretty_format(out))
     else:
@@ -183,6 +185,19 @@ def list_cli(api_client, output, job_type, version, expand_tasks, offset, limit,
                    tablefmt='plain', disable_numparse=True))
 
 
+def _echo_jobs_json(jobs):
+    """
+    Prints the same document as pretty_format({'jobs': jobs}), a job at a time as they are
+    listed.
+    """
+    click.echo('{\n  "jobs": [', nl=False)
+    separator = '\n'
+    for job in jobs:
+        click.echo(separator + textwrap.indent(pretty_format(job), '    '), nl=False)
+        separator = ',\n'
+    click.echo(']\n}' if separator == '\n' else '\n  ]\n}')
+
+
 @click.command(context_settings=CONTEXT_SETTINGS,
                short_help='Deletes the specified job.')
 @click.option('--job-id', required=True, type=JobIdClickType(), help=JobIdClickType.help)
@@ -262,6 +277,78 @@ def run_now_cli(api_client, job_id, jar_params, notebook_params, python_params,
     click.echo(pretty_format(res))
 
 
+def _read_run_requests(input_file):
+    """Parses the JSON lines of input_file into run requests, skipping blank lines."""
+    run_requests = []
+    with open(input_file, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                request = json_loads(line)
+            except ValueError as e:
+                error_and_quit('Line {} of {} is not valid JSON: {}'.format(
+                    line_number, input_file, e))
+            if not isinstance(request, dict) or 'job_id' not in request:
+                error_and_quit('Line {} of {} has no job_id.'.format(line_number, input_file))
+            unknown_params = set(request.get('params') or {}) - set(RUN_NOW_PARAMS)
+            if unknown_params:
+                error_and_quit('Line {} of {} has unknown params: {}'.format(
+                    line_number, input_file, ', '.join(sorted(unknown_params))))
+            request['line'] = line_number
+            run_requests.append(request)
+    return run_requests
+
+
+@click.command(context_settings=CONTEXT_SETTINGS)
+@click.option('--results-file', required=True, type=click.Path(dir_okay=False, writable=True),
+              help='File to write one JSON line per request to, with its run_id or error.')
+@click.option('--parallelism', default=8, type=click.IntRange(min=1),
+              help='Number of jobs to trigger concurrently. Set to 8 by default.')
+@click.argument('input_file', type=click.Path(exists=True, dir_okay=False))
+@api_version_option
+@debug_option
+@profile_option
+@eat_exceptions
+@provide_api_client
+def run_now_batch_cli(api_client, results_file, parallelism, input_file, version):
+    """
+    Runs many jobs with per-run parameters.
+
+    INPUT_FILE holds one JSON object per line, with a job_id and optional params and
+    idempotency_token, e.g.
+    {"job_id": 1, "params": {"notebook_params": {"date": "2020-01-01"}}}. params takes the
+    per-run parameters of run-now: jar_params, notebook_params, python_params,
+    python_named_params and spark_submit_params.
+
+    The runs are triggered concurrently from a single process. Requests that are rate limited
+    are retried with backoff. Each result is written to --results-file as soon as it is known,
+    with the line of the request, its input and the run_id or the error.
+    """
+    check_version(api_client, version)
+    run_requests = _read_run_requests(input_file)
+    results = JobsApi(api_client).run_now_batch(run_requests, parallelism=parallelism,
+                                                version=version)
+    failures = 0
+    with open(results_file, 'w') as f:
+        for count, (request, result, exception) in enumerate(results, 1):
+            line = request.pop('line')
+            output = {'line': line, 'input': request}
+            if exception is None:
+                output['run_id'] = result.get('run_id')
+                message = 'Triggered job {}: run {}.'.format(request['job_id'], output['run_id'])
+            else:
+                failures += 1
+                output['error'] = '{}: {}'.format(type(exception).__name__, exception)
+                message = 'Failed to trigger job {} (line {}): {}'.format(
+                    request['job_id'], line, output['error'])
+            f.write(json_dumps(output) + '\n')
+            f.flush()
+            click.echo('[{}/{}] {}'.format(count, len(run_requests), message))
+    if failures:
+        raise RuntimeError('{} of {} jobs failed to trigger.'.format(failures, len(run_requests)))
+
+
 @click.command(context_settings=CONTEXT_SETTINGS)
 @api_version_option
 @debug_option
@@ -298,6 +385,7 @@ jobs_group.add_command(delete_cli, name='delete')
 jobs_group.add_command(get_cli, name='get')
 jobs_group.add_command(reset_cli, name='reset')
 jobs_group.add_command(run_now_cli, name='run-now')
+jobs_group.add_command(run_now_batch_cli, name='run-now-batch')
 jobs_group.add_command(configure, name='configure')
 
 
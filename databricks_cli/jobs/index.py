@@ -0,0 +1,124 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A local index of the jobs of a workspace by name, which saves listing the jobs on every
+name-based lookup.
+
+The index is built from a full listing and trusted until it expires. Jobs created, reset or
+deleted through JobsApi are invalidated in it, and names it doesn't know are always looked up
+on the server, but changes that other clients make to the jobs it knows are only noticed once
+it expires. The index is a cache: failing to read or write it never fails the caller.
+"""
+
+import json
+import os
+import time
+from hashlib import sha1
+
+from databricks_cli.utils import write_json_atomically
+
+INDEX_VERSION = 2
+# Age after which the index is rebuilt from a full listing, to notice the jobs of known names
+# that other clients created, renamed or deleted.
+MAX_INDEX_AGE_SECONDS = 60 * 60
+
+
+def default_index_path(host):
+    file_name = sha1(host.encode('utf-8')).hexdigest() + '.json'
+    return os.path.join(os.path.expanduser('~'), '.databricks', 'job-index', file_name)
+
+
+def _index_entry(job):
+    """Keeps the fields of the job that name lookups return."""
+    return {
+        'job_id': job.get('job_id'),
+        'created_time': job.get('created_time'),
+        'creator_user_name': job.get('creator_user_name'),
+        'settings': {'name': job.get('settings', {}).get('name')},
+    }
+
+
+class JobNameIndex(object):
+    """Maps the names of existing jobs to the jobs that have them."""
+    def __init__(self, path, jobs=None, built_at=None):
+        self.path = path
+        self.jobs = jobs or {}
+        self.built_at = built_at
+
+    @classmethod
+    def load(cls, path):
+        """Loads the index at path. A missing or unreadable index yields an empty one."""
+        try:
+            with open(path, 'r') as f:
+                content = json.load(f)
+            if content.get('version') == INDEX_VERSION:
+                return cls(path, content['jobs'], content['built_at'])
+        except (IOError, OSError, ValueError, KeyError, AttributeError):
+            pass
+        return cls(path)
+
+    @property
+    def is_expired(self):
+        return self.built_at is None or time.time() - self.built_at > MAX_INDEX_AGE_SECONDS
+
+    def lookup(self, name):
+        """Returns the jobs named name, or None if the index doesn't know about the name."""
+        return self.jobs.get(name) or None
+
+    def record(self, name, jobs):
+        """
+        Records the jobs named name. A name without jobs isn't recorded, so that a job created
+        with it by another client is found by the next lookup.
+        """
+        if jobs:
+            self.jobs[name] = [_index_entry(job) for job in jobs]
+        else:
+            self.forget(name)
+
+    def remove_job(self, job_id):
+        for name in list(self.jobs):
+            self.jobs[name] = [job for job in self.jobs[name]
+                               if str(job['job_id']) != str(job_id)]
+            if not self.jobs[name]:
+                del self.jobs[name]
+
+    def forget(self, name):
+        self.jobs.pop(name, None)
+
+    def rebuild(self, jobs):
+        """Replaces the content of the index with the jobs of a full listing, in any order."""
+        self.jobs = {}
+        for job in jobs:
+            entry = _index_entry(job)
+            self.jobs.setdefault(entry['settings']['name'], []).append(entry)
+        self.built_at = time.time()
+
+    def save(self):
+        """Saves the index, returning whether it could be written."""
+        try:
+            write_json_atomically(self.path, {'version': INDEX_VERSION, 'jobs': self.jobs,
+                                              'built_at': self.built_at})
+        except (IOError, OSError):
+            return False
+        return True
@@ -21,24 +21,60 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from datetime import datetime, timezone
 from hashlib import sha1
+import mmap
 import os
+import posixpath
+import time
 import copy
 
+from requests.exceptions import HTTPError
 from six.moves import urllib
 
 from databricks_cli.sdk import DeltaPipelinesService
-from databricks_cli.dbfs.api import DbfsApi
+from databricks_cli.dbfs.api import DbfsApi, DbfsErrorCodes
 from databricks_cli.dbfs.dbfs_path import DbfsPath
+from databricks_cli.pipelines.hash_cache import LibraryHashCache, default_cache_path
+from databricks_cli.utils import poll_interval, run_concurrently
 
-BUFFER_SIZE = 1024 * 64
 base_pipelines_dir = 'dbfs:/pipelines/code'
+# Number of libraries hashed or uploaded concurrently.
+LIBRARY_PARALLELISM = 8
+UPDATE_TERMINAL_STATES = frozenset(['COMPLETED', 'FAILED', 'CANCELED'])
+# First and longest poll interval in seconds, per update state. Updates waiting for a cluster
+# change state slowly, while stopping updates are about to complete.
+UPDATE_POLL_INTERVALS = {
+    'QUEUED': (10, 60),
+    'CREATED': (5, 30),
+    'WAITING_FOR_RESOURCES': (10, 60),
+    'INITIALIZING': (5, 30),
+    'SETTING_UP_TABLES': (5, 30),
+    'RUNNING': (5, 30),
+    'STOPPING': (1, 5),
+}
+DEFAULT_UPDATE_POLL_INTERVAL = (5, 30)
+EVENTS_PAGE_SIZE = 100
+
+
+def _event_timestamp(millis):
+    """Formats epoch milliseconds as the ISO 8601 timestamps of pipeline events."""
+    moment = datetime.fromtimestamp(millis / 1000.0, tz=timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
 
 
 class PipelinesApi(object):
-    def __init__(self, api_client):
+    def __init__(self, api_client, use_hash_cache=False):
+        """
+        With ``use_hash_cache``, the hashes of local libraries and the libraries known to be
+        uploaded are remembered in a local cache, so that unchanged libraries are neither
+        hashed nor looked up in DBFS again.
+        """
         self.client = DeltaPipelinesService(api_client)
         self.dbfs_client = DbfsApi(api_client)
+        host = getattr(api_client, 'url', None)
+        self.hash_cache_path = (default_cache_path(host)
+                                if use_hash_cache and isinstance(host, str) else None)
 
     def create(self, settings, settings_dir, allow_duplicate_names, headers=None):
         data = self._upload_libraries_and_update_settings(settings, settings_dir)
@@ -86,6 +122,96 @@ class PipelinesApi(object):
     def stop(self, pipeline_id, headers=None):
         self.client.stop(pipeline_id, headers)
 
+    def get_update(self, pipeline_id, update_id, headers=None):
+        return self.client.client.perform_query(
+            'GET', '/pipelines/{}/updates/{}'.format(pipeline_id, update_id), data={},
+            headers=headers)
+
+    def get_latest_update_id(self, pipeline_id, headers=None):
+        """Returns the ID of the most recent update of the pipeline, or None if it has none."""
+        latest_updates = self.get(pipeline_id, headers).get('latest_updates') or []
+        return latest_updates[0]['update_id'] if latest_updates else None
+
+    def list_events(self, pipeline_id, max_results=None, order_by=None, event_filter=None,
+                    page_token=None, headers=None):
+        _data = {}
+        if max_results:
+            _data['max_results'] = max_results
+        if order_by:
+            _data['order_by'] = order_by
+        if event_filter:
+            _data['filter'] = event_filter
+        if page_token:
+            _data['page_token'] = page_token
+        return self.client.client.perform_query(
+            'GET', '/pipelines/{}/events'.format(pipeline_id), data=_data, headers=headers)
+
+    def iter_events(self, pipeline_id, since, headers=None):
+        """
+        Yields the events of the pipeline from the ISO 8601 timestamp since onwards, oldest
+        first, following the page tokens of the listing.
+        """
+        page_token = None
+        while True:
+            if page_token is None:
+                response = self.list_events(
+                    pipeline_id, max_results=EVENTS_PAGE_SIZE, order_by='timestamp asc',
+                    event_filter="timestamp >= '{}'".format(since), headers=headers)
+            else:
+                response = self.list_events(pipeline_id, page_token=page_token, headers=headers)
+            events = response.get('events', [])
+            for event in events:
+                yield event
+            page_token = response.get('next_page_token')
+            if not events or not page_token:
+                return
+
+    def wait_for_update(self, pipeline_id, update_id, timeout=None, on_state_change=None,
+                        on_event=None, headers=None):
+        """
+        Polls the update until it reaches a terminal state and returns it, or returns None if it
+        hasn't after timeout seconds. The polling interval depends on the state of the update,
+        and is reset whenever the state changes or new events arrive. on_state_change(update)
+        is called when the update is first seen and whenever its state changes. With on_event,
+        the events of the update are streamed from a timestamp cursor, so that every poll only
+        lists the events that are new since the previous one, and on_event(event) is called
+        for each of them in order.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        cursor, seen_ids = None, set()
+        state, polls_in_state = None, 0
+        while True:
+            update = self.get_update(pipeline_id, update_id, headers)['update']
+            if update['state'] != state:
+                state, polls_in_state = update['state'], 0
+                if on_state_change is not None:
+                    on_state_change(update)
+            if on_event is not None:
+                if cursor is None:
+                    cursor = _event_timestamp(update.get('creation_time') or time.time() * 1000)
+                for event in self.iter_events(pipeline_id, cursor, headers):
+                    # Events that share the timestamp of the cursor are listed again by the
+                    # next poll.
+                    if event['timestamp'] != cursor:
+                        cursor, seen_ids = event['timestamp'], set()
+                    if event['id'] in seen_ids:
+                        continue
+                    seen_ids.add(event['id'])
+                    if event.get('origin', {}).get('update_id', update_id) == update_id:
+                        on_event(event)
+                        polls_in_state = 0
+            if state in UPDATE_TERMINAL_STATES:
+                return update
+            intervals = UPDATE_POLL_INTERVALS.get(state, DEFAULT_UPDATE_POLL_INTERVAL)
+            delay = poll_interval(intervals, polls_in_state)
+            if deadline is not None:
+                if time.time() >= deadline:
+                    return None
+                # The last poll happens at the deadline.
+                delay = min(delay, deadline - time.time())
+            polls_in_state += 1
+            time.sleep(delay)
+
     def _upload_libraries_and_update_settings(self, settings, settings_dir):
         settings = copy.deepcopy(settings)
         lib_objects = LibraryObject.from_json(settings.get('libraries', []))
@@ -126,39 +252,89 @@ class PipelinesApi(object):
         return local_lib_objects, external_lib_objects
 
     def _upload_local_libraries(self, settings_dir, local_lib_objects):
-        relative_local_lib_objects = [
-            LibraryObject(
-                llo.lib_type, os.path.join(settings_dir, llo.path)) for llo in local_lib_objects]
-        remote_lib_objects = [LibraryObject(rllo.lib_type, self._get_hashed_path(rllo.path))
-                              for rllo in relative_local_lib_objects]
-        transformed_remote_lib_objects = [LibraryObject(rlo.lib_type, DbfsPath(rlo.path))
-                                          for rlo in remote_lib_objects]
-        upload_files = [llo_tuple for llo_tuple in
-                        zip(relative_local_lib_objects, transformed_remote_lib_objects)
-                        if not self.dbfs_client.file_exists(llo_tuple[1].path)]
-
-        for llo, rlo in upload_files:
-            self.dbfs_client.put_file(llo.path, rlo.path, False)
-
-        return remote_lib_objects
+        """
+        Uploads the local libraries to content-addressed paths under base_pipelines_dir and
+        returns them as LibraryObjects of their DBFS paths. The libraries are hashed
+        concurrently, a single listing of base_pipelines_dir tells which ones were already
+        uploaded, and each missing file is uploaded once, concurrently with the others.
+        """
+        if not local_lib_objects:
+            return []
+        hash_cache = (LibraryHashCache.load(self.hash_cache_path)
+                      if self.hash_cache_path is not None else None)
+        local_paths = [os.path.join(settings_dir, llo.path) for llo in local_lib_objects]
+        unique_local_paths = list(dict.fromkeys(local_paths))
+        remote_paths = {}
+        for local_path, remote_path, exception in run_concurrently(
+                lambda path: self._get_hashed_path(path, hash_cache), unique_local_paths,
+                LIBRARY_PARALLELISM):
+            if exception is not None:
+                raise exception
+            remote_paths[local_path] = remote_path
+
+        unconfirmed_paths = set(path for path in remote_paths.values()
+                                if hash_cache is None or not hash_cache.is_uploaded(path))
+        if unconfirmed_paths:
+            existing_paths = self._list_uploaded_paths(unconfirmed_paths)
+        else:
+            existing_paths = set()
+        uploads = {}
+        for local_path in unique_local_paths:
+            remote_path = remote_paths[local_path]
+            if remote_path in unconfirmed_paths and remote_path not in existing_paths:
+                uploads.setdefault(remote_path, local_path)
+        for _, _, exception in run_concurrently(
+                lambda upload: self.dbfs_client.put_file(upload[1], DbfsPath(upload[0]), False),
+                uploads.items(), LIBRARY_PARALLELISM):
+            if exception is not None:
+                raise exception
+
+        if hash_cache is not None:
+            hash_cache.mark_uploaded(unconfirmed_paths)
+            hash_cache.save()
+        return [LibraryObject(llo.lib_type, remote_paths[local_path])
+                for llo, local_path in zip(local_lib_objects, local_paths)]
+
+    def _list_uploaded_paths(self, remote_paths):
+        """
+        Returns which of remote_paths exist in DBFS. Jars are found by listing
+        base_pipelines_dir; wheels live in a directory named after their hash, which is only
+        listed if it exists.
+        """
+        existing_paths = set(self._list_paths(base_pipelines_dir))
+        wheel_dirs = set(posixpath.dirname(path) for path in remote_paths
+                         if posixpath.dirname(path) != base_pipelines_dir)
+        for wheel_dir in wheel_dirs:
+            if wheel_dir in existing_paths:
+                existing_paths.update(self._list_paths(wheel_dir))
+        return existing_paths
+
+    def _list_paths(self, dbfs_dir):
+        """Returns the absolute paths of the files in dbfs_dir, which may not exist."""
+        try:
+            files = self.dbfs_client.list_files(DbfsPath(dbfs_dir))
+        except HTTPError as e:
+            try:
+                if e.response.json()['error_code'] == DbfsErrorCodes.RESOURCE_DOES_NOT_EXIST:
+                    return []
+            except ValueError:
+                pass
+            raise e
+        return [f.dbfs_path.absolute_path for f in files]
 
     @staticmethod
-    def _get_hashed_path(path):
+    def _get_hashed_path(path, hash_cache=None):
         """
         Finds the corresponding dbfs file path for the file located at the supplied path by
         calculating its hash using SHA1.
         :param path: Local File Path
+        :param hash_cache: LibraryHashCache to reuse the hash of an unchanged file from
         :return: Remote Path (pipeline_base_dir + file_hash (dot) file_extension)
         """
-        hash_buffer = sha1()
-        with open(path, 'rb') as f:
-            while True:
-                data = f.read(BUFFER_SIZE)
-                if not data:
-                    break
-                hash_buffer.update(data)
-
-        file_hash = hash_buffer.hexdigest()
+        if hash_cache is not None:
+            file_hash = hash_cache.get_digest(path, _hash_file)
+        else:
+            file_hash = _hash_file(path)
         # splitext includes the period in the extension
         extension = os.path.splitext(path)[1][1:]
         if extension == 'whl':
@@ -172,6 +348,21 @@ class PipelinesApi(object):
         return path
 
 
+def _hash_file(path):
+    hash_buffer = sha1()
+    with open(path, 'rb') as f:
+        # Empty files cannot be memory-mapped.
+        if os.fstat(f.fileno()).st_size > 0:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                # A single update over the mapping leaves reads to the OS and lets hashlib
+                # release the GIL, so that libraries are hashed in parallel.
+                hash_buffer.update(mapped)
+            finally:
+                mapped.close()
+    return hash_buffer.hexdigest()
+
+
 class LibraryObject(object):
     def __init__(self, lib_type, lib_path):
         self.path = lib_path
@@ -98,7 +98,7 @@ def create_cli(api_client, settings_arg, settings, allow_duplicate_names):
                          "when creating a pipeline.")
 
     try:
-        response = PipelinesApi(api_client).create(
+        response = PipelinesApi(api_client, use_hash_cache=True).create(
             settings_obj, settings_dir, allow_duplicate_names)
     except requests.exceptions.HTTPError as e:
         _handle_duplicate_name_exception(settings_obj, e, is_create_pipeline=True)
@@ -167,7 +167,8 @@ def edit_cli(api_client, settings_arg, settings, pipeline_id, allow_duplicate_na
     _validate_pipeline_id(settings_obj['id'])
 
     try:
-        PipelinesApi(api_client).edit(settings_obj, settings_dir, allow_duplicate_names)
+        PipelinesApi(api_client, use_hash_cache=True).edit(
+            settings_obj, settings_dir, allow_duplicate_names)
     except requests.exceptions.HTTPError as e:
         _handle_duplicate_name_exception(settings_obj, e, is_create_pipeline=False)
     click.echo("Successfully edited pipeline settings: {}.".format(
@@ -246,7 +247,7 @@ def deploy_cli(api_client, settings_arg, settings, spec, allow_duplicate_names,
     settings_dir = os.path.dirname(src)
     if not pipeline_id and 'id' not in settings_obj:
         try:
-            response = PipelinesApi(api_client).create(
+            response = PipelinesApi(api_client, use_hash_cache=True).create(
                 settings_obj, settings_dir, allow_duplicate_names)
         except requests.exceptions.HTTPError as e:
             _handle_duplicate_name_exception(settings_obj, e, is_create_pipeline=True)
@@ -265,7 +266,7 @@ def deploy_cli(api_client, settings_arg, settings, spec, allow_duplicate_names,
         settings_obj['id'] = pipeline_id or settings_obj.get('id', None)
         _validate_pipeline_id(settings_obj['id'])
         try:
-            PipelinesApi(api_client).edit(
+            PipelinesApi(api_client, use_hash_cache=True).edit(
                 settings_obj, settings_dir, allow_duplicate_names)
         except requests.exceptions.HTTPError as e:
             _handle_duplicate_name_exception(settings_obj, e, is_create_pipeline=False)
@@ -392,11 +393,16 @@ def run_cli(api_client, pipeline_id):
 @click.option('--full-refresh', default=False, type=bool, is_flag=True,
               help='If present, truncates tables and creates new checkpoint ' +
                    'folders so that data is reprocessed from the beginning.')
+@click.option('--wait', default=False, is_flag=True,
+              help='If present, streams the events of the update until it ends, and exits '
+                   'with 1 unless it completes successfully.')
+@click.option('--timeout', default=None, type=click.IntRange(min=0),
+              help='With --wait, gives up on the update after this many seconds.')
 @debug_option
 @profile_option
 @pipelines_exception_eater
 @provide_api_client
-def start_cli(api_client, pipeline_id, full_refresh):
+def start_cli(api_client, pipeline_id, full_refresh, wait, timeout):
     """
     Starts a pipeline update.
 
@@ -405,8 +411,64 @@ def start_cli(api_client, pipeline_id, full_refresh):
     databricks pipelines start --pipeline-id 1234 --full-refresh
     """
     _validate_pipeline_id(pipeline_id)
-    resp = PipelinesApi(api_client).start_update(pipeline_id, full_refresh=full_refresh)
+    pipelines_api = PipelinesApi(api_client)
+    resp = pipelines_api.start_update(pipeline_id, full_refresh=full_refresh)
     click.echo(_gen_start_update_msg(resp, pipeline_id, full_refresh))
+    if wait:
+        update_id = (resp or {}).get('update_id') or \
+            pipelines_api.get_latest_update_id(pipeline_id)
+        _watch_update(pipelines_api, pipeline_id, update_id, timeout)
+
+
+@click.command(context_settings=CONTEXT_SETTINGS,
+               short_help='Streams the events of a pipeline update until it ends.')
+@click.option('--pipeline-id', default=None, type=PipelineIdClickType(),
+              help=PipelineIdClickType.help)
+@click.option('--update-id', default=None,
+              help='The update to watch. Defaults to the most recent update of the pipeline.')
+@click.option('--timeout', default=None, type=click.IntRange(min=0),
+              help='Gives up on the update after this many seconds.')
+@debug_option
+@profile_option
+@pipelines_exception_eater
+@provide_api_client
+def watch_cli(api_client, pipeline_id, update_id, timeout):
+    """
+    Streams the events of a pipeline update until it ends.
+
+    The update is polled at an interval that adapts to its state, and each poll only fetches
+    the events that are new since the previous one. Exits with 0 if the update completed, and
+    with 1 if it failed, was canceled or did not end within --timeout.
+
+    Usage:
+
+    databricks pipelines watch --pipeline-id 1234
+    """
+    _validate_pipeline_id(pipeline_id)
+    pipelines_api = PipelinesApi(api_client)
+    if update_id is None:
+        update_id = pipelines_api.get_latest_update_id(pipeline_id)
+        if update_id is None:
+            error_and_quit('Pipeline {} has no updates.'.format(pipeline_id))
+    _watch_update(pipelines_api, pipeline_id, update_id, timeout)
+
+
+def _watch_update(pipelines_api, pipeline_id, update_id, timeout):
+    def echo_state(update):
+        click.echo('Update {} is {}.'.format(update_id, update['state']), err=True)
+
+    def echo_event(event):
+        click.echo('{} {} {}'.format(event['timestamp'], event.get('level', 'INFO'),
+                                     event.get('message', '')))
+
+    update = pipelines_api.wait_for_update(pipeline_id, update_id, timeout=timeout,
+                                           on_state_change=echo_state, on_event=echo_event)
+    if update is None:
+        error_and_quit('Update {} did not end within {} seconds.'.format(update_id, timeout))
+    click.echo('Update {} ended with state {}.'.format(update_id, update['state']))
+    if update['state'] != 'COMPLETED':
+        error_and_quit('Update {} of pipeline {} did not complete.'.format(
+            update_id, pipeline_id))
 
 
 @click.command(context_settings=CONTEXT_SETTINGS,
@@ -517,6 +579,7 @@ pipelines_group.add_command(get_cli, name='get')
 pipelines_group.add_command(list_cli, name='list')
 pipelines_group.add_command(start_cli, name='start')
 pipelines_group.add_command(stop_cli, name='stop')
+pipelines_group.add_command(watch_cli, name='watch')
 
 # DEPRECATED and will be removed in future versions.
 pipelines_group.add_command(reset_cli, name='reset')
@@ -0,0 +1,129 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A local cache of the content hashes of pipeline libraries, and of the hashed paths that are
+known to be uploaded to a workspace, which lets an unchanged deploy skip both the hashing and
+the DBFS listings. The cache is best-effort: failing to read or write it never fails a deploy.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha1
+
+from databricks_cli.utils import write_json_atomically
+
+CACHE_VERSION = 1
+# Maximum number of entries of each kind kept, the least recently used being evicted first.
+MAX_DIGESTS = 1000
+MAX_UPLOADED_PATHS = 1000
+# Files modified this recently may be modified again without their mtime changing, so their
+# digest isn't cached.
+RACY_SECONDS = 2
+# Age after which an upload is checked again, in case the file was removed from DBFS.
+MAX_UPLOAD_AGE_SECONDS = 7 * 24 * 60 * 60
+
+
+def default_cache_path(host):
+    file_name = sha1(host.encode('utf-8')).hexdigest() + '.json'
+    return os.path.join(os.path.expanduser('~'), '.databricks', 'pipelines-cache', file_name)
+
+
+class LibraryHashCache(object):
+    """
+    digests maps absolute local paths to [size, mtime_ns, inode, digest], and uploaded_paths
+    maps DBFS paths to the time their existence was last confirmed. Both are kept in least
+    recently used order.
+    """
+    def __init__(self, path, digests=None, uploaded_paths=None):
+        self.path = path
+        self.digests = OrderedDict(digests or ())
+        self.uploaded_paths = OrderedDict(uploaded_paths or ())
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        """Loads the cache at path. A missing or unreadable cache yields an empty one."""
+        try:
+            with open(path, 'r') as f:
+                content = json.load(f, object_pairs_hook=OrderedDict)
+            if content.get('version') == CACHE_VERSION:
+                return cls(path, content['digests'], content['uploaded_paths'])
+        except (IOError, OSError, ValueError, KeyError, AttributeError, TypeError):
+            pass
+        return cls(path)
+
+    def get_digest(self, path, hash_file):
+        """
+        Returns the digest of the file at path, calling hash_file(path) to compute it unless
+        the file has the same size, mtime and inode as when it was last hashed.
+        """
+        abs_path = os.path.abspath(path)
+        stat = os.stat(abs_path)
+        key = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+        with self._lock:
+            entry = self.digests.get(abs_path)
+            if isinstance(entry, list) and entry[:3] == key and len(entry) == 4:
+                self.digests.move_to_end(abs_path)
+                return entry[3]
+        # The file is stat'ed before being hashed, so that a concurrent modification leaves
+        # an entry that doesn't match the file anymore.
+        digest = hash_file(abs_path)
+        if time.time() - stat.st_mtime > RACY_SECONDS:
+            with self._lock:
+                self.digests.pop(abs_path, None)
+                self.digests[abs_path] = key + [digest]
+        return digest
+
+    def is_uploaded(self, remote_path):
+        with self._lock:
+            confirmed_at = self.uploaded_paths.get(remote_path)
+            if confirmed_at is None or time.time() - confirmed_at > MAX_UPLOAD_AGE_SECONDS:
+                return False
+            self.uploaded_paths.move_to_end(remote_path)
+            return True
+
+    def mark_uploaded(self, remote_paths):
+        now = time.time()
+        with self._lock:
+            for remote_path in remote_paths:
+                self.uploaded_paths.pop(remote_path, None)
+                self.uploaded_paths[remote_path] = now
+
+    def save(self):
+        """Saves the cache, returning whether it could be written."""
+        with self._lock:
+            while len(self.digests) > MAX_DIGESTS:
+                self.digests.popitem(last=False)
+            while len(self.uploaded_paths) > MAX_UPLOADED_PATHS:
+                self.uploaded_paths.popitem(last=False)
+            content = {'version': CACHE_VERSION, 'digests': self.digests,
+                       'uploaded_paths': self.uploaded_paths}
+            try:
+                write_json_atomically(self.path, content)
+            except (IOError, OSError):
+                return False
+        return True
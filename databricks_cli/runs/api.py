@@ -21,7 +21,60 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import heapq
+import itertools
+import time
+
+import requests
+
 from databricks_cli.sdk import JobsService
+from databricks_cli.utils import backoff_with_jitter, poll_interval, run_concurrently
+
+COMPLETED_STATES = frozenset(['TERMINATED', 'SKIPPED', 'INTERNAL_ERROR'])
+# First and longest poll interval in seconds, per life cycle state. Runs waiting for a cluster
+# change state slowly, while terminating runs are about to complete.
+POLL_INTERVALS = {
+    'QUEUED': (10, 60),
+    'PENDING': (10, 60),
+    'BLOCKED': (10, 60),
+    'RUNNING': (5, 30),
+    'TERMINATING': (1, 5),
+}
+DEFAULT_POLL_INTERVAL = (5, 30)
+# Runs due within this many seconds of each other are polled together.
+POLL_COALESCE_SECONDS = 1
+# Number of consecutive transient errors after which polling a run is given up.
+MAX_POLL_RETRIES = 5
+# Largest page of runs returned by jobs/runs/list in API 2.1.
+MAX_PAGE_SIZE = 25
+
+
+def _unique(items):
+    seen = set()
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            yield item
+
+
+def _task_run_ids(runs):
+    """Yields the run_id of each of runs, or the run_ids of its tasks if it has any."""
+    for run in runs:
+        tasks = run.get('tasks')
+        if tasks:
+            for task in tasks:
+                yield task['run_id']
+        else:
+            yield run['run_id']
+
+
+def _is_transient(exception):
+    """Tells whether a failed request may succeed if it is retried."""
+    if isinstance(exception, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(exception, requests.exceptions.HTTPError) and exception.response is not None:
+        return exception.response.status_code == 429 or exception.response.status_code >= 500
+    return False
 
 
 class RunsApi(object):
@@ -36,6 +89,28 @@ class RunsApi(object):
         return self.client.list_runs(job_id, active_only, completed_only, offset, limit,
                                      version=version)
 
+    def iter_runs(self, job_id=None, active_only=None, completed_only=None, since=None,
+                  page_size=MAX_PAGE_SIZE, expand_tasks=None, version=None):
+        """
+        Yields runs newest first, paging through jobs/runs/list as they are consumed. With
+        ``since``, a time in epoch milliseconds, paging stops at the first run that started
+        before it.
+        """
+        offset = 0
+        while True:
+            page = self.client.list_runs(job_id=job_id, active_only=active_only,
+                                         completed_only=completed_only, offset=offset,
+                                         limit=page_size, start_time_from=since,
+                                         expand_tasks=expand_tasks, version=version)
+            runs = page.get('runs', [])
+            for run in runs:
+                if since is not None and run.get('start_time', since) < since:
+                    return
+                yield run
+            offset += len(runs)
+            if not page.get('has_more', False) or not runs:
+                return
+
     def get_run(self, run_id, version=None):
         return self.client.get_run(run_id, version=version)
 
@@ -44,3 +119,93 @@ class RunsApi(object):
 
     def get_run_output(self, run_id, version=None):
         return self.client.get_run_output(run_id, version=version)
+
+    def iter_run_outputs(self, runs=None, run_ids=None, parallelism=8, version=None):
+        """
+        Yields ``(run_id, output, exception)`` for the runs, given either as run dicts or as
+        run_ids, fetching their outputs over a pool of ``parallelism`` threads. The output of a
+        multi-task run is not available, so such runs are replaced by their task runs, and every
+        run is fetched once. run_ids are first resolved with get_run to find their tasks; a run
+        that can't be resolved is yielded with the exception of get_run. Outputs are fetched a
+        batch at a time so that runs are consumed as they are listed.
+        """
+        failures = []
+        if run_ids is not None:
+            runs = self._iter_runs_by_id(run_ids, parallelism, failures, version)
+        output_run_ids = _unique(_task_run_ids(runs))
+        while True:
+            batch = list(itertools.islice(output_run_ids, parallelism * 4))
+            while failures:
+                run_id, exception = failures.pop(0)
+                yield run_id, None, exception
+            if not batch:
+                return
+            for run_id, output, exception in run_concurrently(
+                    lambda run_id: self.get_run_output(run_id, version=version), batch,
+                    parallelism):
+                yield run_id, output, exception
+
+    def _iter_runs_by_id(self, run_ids, parallelism, failures, version):
+        """Yields the runs of run_ids, appending (run_id, exception) to failures for the others."""
+        run_ids = list(_unique(run_ids))
+        for start in range(0, len(run_ids), parallelism * 4):
+            batch = run_ids[start:start + parallelism * 4]
+            for run_id, run, exception in run_concurrently(
+                    lambda run_id: self.get_run(run_id, version=version), batch, parallelism):
+                if exception is not None:
+                    failures.append((run_id, exception))
+                    continue
+                yield run
+
+    def wait_for_runs(self, run_ids, parallelism=8, timeout=None, on_state_change=None,
+                      version=None):
+        """
+        Polls the runs of run_ids from a single schedule until they complete, and yields
+        ``(run_id, run, exception)`` for each run as it completes or fails to be polled. Every run
+        is polled at its own interval, which depends on its life cycle state; the runs that are
+        due are polled together over a pool of ``parallelism`` threads. A transient polling
+        error is retried with backoff, up to MAX_POLL_RETRIES times in a row, and any other error
+        is yielded for its run only. on_state_change(run) is called when a run is first seen and
+        whenever its life cycle state changes. The runs that have not completed are polled a
+        last time once timeout seconds have passed, and the remaining ones are not yielded.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        schedule = [(0, index, run_id) for index, run_id in enumerate(run_ids)]
+        heapq.heapify(schedule)
+        states, failures = {}, {}
+        while schedule:
+            due_time, _, _ = schedule[0]
+            delay = due_time - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            due = []
+            while schedule and schedule[0][0] <= due_time + POLL_COALESCE_SECONDS:
+                due.append(heapq.heappop(schedule)[1:])
+            polls = run_concurrently(lambda item: self.get_run(item[1], version=version), due,
+                                     parallelism)
+            for (index, run_id), run, exception in polls:
+                if exception is not None:
+                    failures[run_id] = failures.get(run_id, 0) + 1
+                    if not _is_transient(exception) or failures[run_id] > MAX_POLL_RETRIES:
+                        yield run_id, None, exception
+                        continue
+                    next_time = time.time() + backoff_with_jitter(failures[run_id] - 1)
+                else:
+                    failures.pop(run_id, None)
+                    life_cycle_state = run['state']['life_cycle_state']
+                    previous_state, polls_in_state = states.get(run_id, (None, 0))
+                    if life_cycle_state != previous_state:
+                        polls_in_state = 0
+                        if on_state_change is not None:
+                            on_state_change(run)
+                    if life_cycle_state in COMPLETED_STATES:
+                        yield run_id, run, None
+                        continue
+                    states[run_id] = (life_cycle_state, polls_in_state + 1)
+                    intervals = POLL_INTERVALS.get(life_cycle_state, DEFAULT_POLL_INTERVAL)
+                    next_time = time.time() + poll_interval(intervals, polls_in_state)
+                if deadline is not None:
+                    if time.time() >= deadline:
+                        continue
+                    next_time = min(next_time, deadline)
+                heapq.heappush(schedule, (next_time, index, run_id))
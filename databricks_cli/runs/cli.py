@@ -21,9 +21,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import itertools
 import sys
 import time
-from json import loads as json_loads
+from json import loads as json_loads, dumps as json_dumps
 
 import click
 from tabulate import tabulate
@@ -34,7 +35,7 @@ from databricks_cli.utils import eat_exceptions, CONTEXT_SETTINGS, pretty_format
     error_and_quit, backoff_with_jitter
 from databricks_cli.configure.config import provide_api_client, profile_option, debug_option, \
     api_version_option
-from databricks_cli.runs.api import RunsApi
+from databricks_cli.runs.api import RunsApi, MAX_PAGE_SIZE
 from databricks_cli.version import print_version_callback, version as cli_version
 
 
@@ -87,6 +88,13 @@ def submit_cli(api_client, json_file, json, wait, version):
             attempt += 1
 
 
+SINCE_TYPE = click.DateTime(['%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S'])
+
+
+def _to_millis(since):
+    return int(time.mktime(since.timetuple()) * 1000) if since else None
+
+
 def _runs_to_table(runs_json):
     ret = []
     for r in runs_json.get('runs', []):
@@ -113,13 +121,19 @@ def _runs_to_table(runs_json):
 @click.option('--limit', default=None, type=int,
               help='The limit determines the number of runs listed. '
                    'Limit must be between 0 and 1000. Set to 20 runs by default.')
+@click.option('--all', '_all', is_flag=True,
+              help='Lists all runs by paging through the results. With --all, --limit sets '
+                   'the page size.')
+@click.option('--since', default=None, type=SINCE_TYPE,
+              help='With --all, only lists the runs that started at or after this local time.')
 @click.option('--output', help=OutputClickType.help, type=OutputClickType())
 @api_version_option
 @debug_option
 @profile_option
 @eat_exceptions  # noqa
 @provide_api_client
-def list_cli(api_client, job_id, active_only, completed_only, offset, limit, output, version):  # noqa
+def list_cli(api_client, job_id, active_only, completed_only, offset, limit, _all, since,  # noqa
+             output, version):
     """
     Lists job runs.
 
@@ -135,8 +149,31 @@ def list_cli(api_client, job_id, active_only, completed_only, offset, limit, out
       - Life cycle state
 
       - Result state (can be n/a)
+
+    With --all, runs are printed as the pages are received: in the JSON output mode, as one
+    JSON object per line, and in the TABLE output mode, as a table per page.
     """
     check_version(api_client, version)
+    if since is not None and not _all:
+        error_and_quit('--since can only be used with --all.')
+    if _all:
+        if offset is not None:
+            error_and_quit('--offset cannot be used with --all.')
+        since_millis = _to_millis(since)
+        page_size = limit or MAX_PAGE_SIZE
+        runs = RunsApi(api_client).iter_runs(job_id, active_only, completed_only,
+                                             since=since_millis, page_size=page_size,
+                                             version=version)
+        if OutputClickType.is_json(output):
+            for run in runs:
+                click.echo(json_dumps(run))
+        else:
+            while True:
+                page = list(itertools.islice(runs, page_size))
+                if not page:
+                    break
+                click.echo(tabulate(_runs_to_table({'runs': page}), tablefmt='plain'))
+        return
     runs_json = RunsApi(api_client).list_runs(
         job_id, active_only, completed_only, offset, limit, version=version)
     if OutputClickType.is_json(output):
@@ -181,6 +218,55 @@ def get_output_cli(api_client, run_id, version):
         RunsApi(api_client).get_run_output(run_id, version=version)))
 
 
+@click.command(context_settings=CONTEXT_SETTINGS)
+@click.option('--job-id', default=None, type=int,
+              help='Gets the outputs of the completed runs of this job.')
+@click.option('--run-id', 'run_ids', multiple=True, type=RunIdClickType(),
+              help='Gets the output of this run. Can be given several times.')
+@click.option('--since', default=None, type=SINCE_TYPE,
+              help='With --job-id, only gets the runs that started at or after this local time.')
+@click.option('--parallelism', default=8, type=click.IntRange(min=1),
+              help='Number of outputs to get concurrently. Set to 8 by default.')
+@api_version_option
+@debug_option
+@profile_option
+@eat_exceptions
+@provide_api_client
+def get_outputs_cli(api_client, job_id, run_ids, since, parallelism, version):
+    """
+    Gets the outputs of many runs as JSON lines.
+
+    Either --job-id or --run-id must be given. The outputs are fetched concurrently and each
+    one is printed as soon as it is received, as a JSON object on its own line with the run_id
+    and either the output or the error. Runs with tasks are replaced by their task runs, since
+    only the output of a task run can be retrieved.
+    """
+    check_version(api_client, version)
+    if (job_id is None) == (not run_ids):
+        error_and_quit('Exactly one of --job-id and --run-id must be given.')
+    if since is not None and job_id is None:
+        error_and_quit('--since can only be used with --job-id.')
+    runs_api = RunsApi(api_client)
+    if job_id is not None:
+        runs = runs_api.iter_runs(job_id=job_id, completed_only=True, since=_to_millis(since),
+                                  expand_tasks=True, version=version)
+        outputs = runs_api.iter_run_outputs(runs=runs, parallelism=parallelism,
+                                            version=version)
+    else:
+        outputs = runs_api.iter_run_outputs(run_ids=run_ids, parallelism=parallelism,
+                                            version=version)
+    failures = 0
+    for run_id, output, exception in outputs:
+        if exception is None:
+            click.echo(json_dumps({'run_id': run_id, 'output': output}))
+        else:
+            failures += 1
+            click.echo(json_dumps({'run_id': run_id, 'error': '{}: {}'.format(
+                type(exception).__name__, exception)}))
+    if failures:
+        raise RuntimeError('Failed to get the output of {} runs.'.format(failures))
+
+
 @click.command(context_settings=CONTEXT_SETTINGS)
 @click.option('--run-id', required=True, type=RunIdClickType())
 @api_version_option
@@ -197,6 +283,60 @@ def cancel_cli(api_client, run_id, version):
         RunsApi(api_client).cancel_run(run_id, version=version)))
 
 
+@click.command(context_settings=CONTEXT_SETTINGS)
+@click.option('--timeout', default=None, type=click.IntRange(min=0),
+              help='Gives up on the runs that have not completed after this many seconds.')
+@click.option('--parallelism', default=8, type=click.IntRange(min=1),
+              help='Number of runs to poll concurrently. Set to 8 by default.')
+@click.argument('run_ids', nargs=-1, required=True, type=RunIdClickType())
+@api_version_option
+@debug_option
+@profile_option
+@eat_exceptions
+@provide_api_client
+def wait_cli(api_client, timeout, parallelism, run_ids, version):
+    """
+    Waits for one or more runs to complete.
+
+    The runs are polled from a single process, each at an interval that adapts to its state:
+    runs waiting for a cluster are polled less often than runs that are about to finish. A line
+    is printed for every run as it completes. Runs that can't be polled are reported as failed
+    without stopping the others. Exits with 0 if every run succeeded, and with 1 if any run
+    failed or did not complete within --timeout.
+    """
+    check_version(api_client, version)
+    run_ids = list(dict.fromkeys(run_ids))
+
+    def echo_state(run):
+        click.echo('Run {} is {}. URL: {}'.format(run['run_id'], run['state']['life_cycle_state'],
+                                                  run.get('run_page_url', 'n/a')), err=True)
+
+    runs = RunsApi(api_client).wait_for_runs(run_ids, parallelism=parallelism, timeout=timeout,
+                                             on_state_change=echo_state, version=version)
+    completed, failed = set(), []
+    for count, (run_id, run, exception) in enumerate(runs, 1):
+        completed.add(str(run_id))
+        if exception is not None:
+            failed.append(run_id)
+            click.echo('[{}/{}] Run {} could not be polled: {}: {}'.format(
+                count, len(run_ids), run_id, type(exception).__name__, exception))
+            continue
+        run_state = run['state']
+        result_state = run_state.get('result_state', run_state['life_cycle_state'])
+        if result_state != 'SUCCESS':
+            failed.append(run_id)
+        click.echo('[{}/{}] Run {} completed with state {}. {}'.format(
+            count, len(run_ids), run_id, result_state,
+            run_state.get('state_message', '')).rstrip())
+    timed_out = [run_id for run_id in run_ids if str(run_id) not in completed]
+    if failed or timed_out:
+        message = '{} of {} runs failed'.format(len(failed), len(run_ids))
+        if timed_out:
+            message += ' and {} did not complete in time: {}'.format(
+                len(timed_out), ', '.join(str(run_id) for run_id in timed_out))
+        error_and_quit(message + '.')
+
+
 @click.group(context_settings=CONTEXT_SETTINGS,
              short_help='Utility to interact with the jobs runs.')
 @click.option('--version', '-v', is_flag=True, callback=print_version_callback,
@@ -216,3 +356,5 @@ runs_group.add_command(list_cli, name='list')
 runs_group.add_command(get_cli, name='get')
 runs_group.add_command(cancel_cli, name='cancel')
 runs_group.add_command(get_output_cli, name='get-output')
+runs_group.add_command(get_outputs_cli, name='get-outputs')
+runs_group.add_command(wait_cli, name='wait')
@@ -35,6 +35,7 @@ import requests
 import ssl
 import copy
 import pprint
+import time
 
 from . import version
 
@@ -89,54 +90,162 @@ class FallbackNetrcAuth(requests.auth.AuthBase):
         
         return HTTPBasicAuth(*netrc_tuple)(r)
 
+class RequestEvent(object):
+    """
+    Describes one call to ApiClient.perform_query. Observers receive it in before_request, with
+    the method and path set, and again in after_request, once the remaining fields are filled.
+    status is None and error is set when no response was received.
+    """
+    def __init__(self, method, path, url):
+        self.method = method
+        self.path = path
+        self.url = url
+        self.status = None
+        self.latency = None
+        self.retries = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.error = None
+
+
+class ApiClientObserver(object):
+    """
+    Base class of the observers registered with ApiClient.add_observer. Observers may be called
+    from several threads at once.
+    """
+    def before_request(self, event):
+        pass
+
+    def after_request(self, event):
+        pass
+
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 32
+
+
+def create_session(pool_connections=None, pool_maxsize=None, pool_block=None):
+    """
+    Creates a requests session with the retry policy and connection pools used by ApiClient.
+    A single session can be passed to several ApiClient instances so that they share their
+    connection pools.
+
+    :param pool_connections: Number of per-host connection pools to cache.
+    :param pool_maxsize: Maximum number of connections kept open per host. Threads sharing the
+                         session beyond this number open connections that are discarded after use,
+                         unless pool_block is set.
+    :param pool_block: Makes threads wait for a pooled connection to free up instead.
+    """
+    retries = Retry(
+        total=6,
+        backoff_factor=1,
+        status_forcelist=[429],
+        allowed_methods=set({'POST'}) | set(Retry.DEFAULT_ALLOWED_METHODS),
+        respect_retry_after_header=True,
+        raise_on_status=False # return original response when retries have been exhausted
+    )
+    adapter = TlsV1HttpAdapter(
+        pool_connections=pool_connections or DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or DEFAULT_POOL_MAXSIZE,
+        pool_block=bool(pool_block),
+        max_retries=retries)
+    session = requests.Session()
+    session.auth = FallbackNetrcAuth()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_api_url(host):
+    """Returns the base URL of the REST API of the workspace at host."""
+    parsed_url = urlparse(host)
+    return "%s://%s/api/" % (parsed_url.scheme, parsed_url.hostname)
+
+
+def get_default_headers(user, password, token, default_headers, command_name):
+    """Returns the authentication, user agent and other headers sent with every request."""
+    if user is not None and password is not None:
+        encoded_auth = (user + ":" + password).encode()
+        user_header_data = "Basic " + base64.standard_b64encode(encoded_auth).decode()
+        auth = {'Authorization': user_header_data, 'Content-Type': 'text/json'}
+    elif token is not None:
+        auth = {'Authorization': 'Bearer {}'.format(token), 'Content-Type': 'text/json'}
+    else:
+        auth = {}
+    user_agent = {'user-agent': 'databricks-cli-{v}-{c}'.format(v=databricks_cli_version,
+                                                                c=command_name)}
+    headers = {}
+    headers.update(auth)
+    headers.update(default_headers)
+    headers.update(user_agent)
+    return headers
+
+
+def resolve_url(url, path, version, api_version, jobs_api_version):
+    """Returns the URL of path below the base API url, routed to the right API version."""
+    if version:
+        return url + version + path
+    elif jobs_api_version and path and path.startswith('/jobs'):
+        return url + jobs_api_version + path
+    elif path and _is_uc_path(path):
+        return url + UC_API_VERSION + path
+    return url + api_version + path
+
+
 class ApiClient(object):
     """
     A partial Python implementation of dbc rest api
     to be used by different versions of the client.
     """
     def __init__(self, user=None, password=None, host=None, token=None,
-                 api_version=version.API_VERSION, default_headers={}, verify=True, command_name="", jobs_api_version=None):
+                 api_version=version.API_VERSION, default_headers={}, verify=True, command_name="", jobs_api_version=None,
+                 pool_connections=None, pool_maxsize=None, pool_block=None, session=None,
+                 observers=None):
         if host[-1] == "/":
             host = host[:-1]
 
-        retries = Retry(
-            total=6,
-            backoff_factor=1,
-            status_forcelist=[429],
-            allowed_methods=set({'POST'}) | set(Retry.DEFAULT_ALLOWED_METHODS),
-            respect_retry_after_header=True,
-            raise_on_status=False # return original response when retries have been exhausted
-        )
-        self.session = requests.Session()
-        self.session.auth = FallbackNetrcAuth()
-        self.session.mount('https://', TlsV1HttpAdapter(max_retries=retries))
-
-        parsed_url = urlparse(host)
-        scheme = parsed_url.scheme
-        hostname = parsed_url.hostname
-        self.url = "%s://%s/api/" % (scheme, hostname)
-        if user is not None and password is not None:
-            encoded_auth = (user + ":" + password).encode()
-            user_header_data = "Basic " + base64.standard_b64encode(encoded_auth).decode()
-            auth = {'Authorization': user_header_data, 'Content-Type': 'text/json'}
-        elif token is not None:
-            auth = {'Authorization': 'Bearer {}'.format(token), 'Content-Type': 'text/json'}
-        else:
-            auth = {}
-        user_agent = {'user-agent': 'databricks-cli-{v}-{c}'.format(v=databricks_cli_version,
-                                                                    c=command_name)}
-        self.default_headers = {}
-        self.default_headers.update(auth)
-        self.default_headers.update(default_headers)
-        self.default_headers.update(user_agent)
+        if session is None:
+            session = create_session(pool_connections, pool_maxsize, pool_block)
+        self.session = session
+
+        self.url = get_api_url(host)
+        self.default_headers = get_default_headers(user, password, token, default_headers,
+                                                   command_name)
         self.verify = verify
         self.api_version = api_version
         self.jobs_api_version = jobs_api_version
+        self.observers = list(observers or [])
+
+    def add_observer(self, observer):
+        """Registers an ApiClientObserver notified around every request"""
+        self.observers.append(observer)
 
     def close(self):
         """Close the client"""
         pass
 
+    def get_connection_stats(self):
+        """
+        Returns how many requests the session sent, and how many of them opened a new connection
+        rather than reusing a pooled one.
+        """
+        num_requests = 0
+        num_connections = 0
+        for adapter in set(self.session.adapters.values()):
+            poolmanager = getattr(adapter, 'poolmanager', None)
+            if poolmanager is None:
+                continue
+            for key in poolmanager.pools.keys():
+                pool = poolmanager.pools.get(key)
+                if pool is not None:
+                    num_requests += pool.num_requests
+                    num_connections += pool.num_connections
+        return {
+            'requests': num_requests,
+            'connections_opened': num_connections,
+            'connections_reused': max(0, num_requests - num_connections),
+        }
+
     # helper functions starting here
 
     def perform_query(self, method, path, data = {}, headers = None, files=None, version=None):
@@ -148,6 +257,44 @@ class ApiClient(object):
             tmp_headers.update(headers)
             headers = tmp_headers
 
+        if self.observers:
+            resp = self._send_observed(method, path, data, headers, files, version)
+        else:
+            resp = self._send(method, path, data, headers, files, version)
+        try:
+            resp.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            message = e.args[0]
+            try:
+                reason = pprint.pformat(json.loads(resp.text), indent=2)
+                message += '\n Response from server: \n {}'.format(reason)
+            except ValueError:
+                pass
+            raise requests.exceptions.HTTPError(message, response=e.response)
+        return resp.json()
+
+    def _send_observed(self, method, path, data, headers, files, version):
+        event = RequestEvent(method, path, self.get_url(path, version=version))
+        for observer in self.observers:
+            observer.before_request(event)
+        start = time.time()
+        try:
+            resp = self._send(method, path, data, headers, files, version)
+        except Exception as e:
+            event.error = e
+            raise
+        else:
+            event.status = resp.status_code
+            event.retries = _count_retries(resp)
+            event.request_bytes = _body_size(resp.request.body)
+            event.response_bytes = len(resp.content)
+        finally:
+            event.latency = time.time() - start
+            for observer in self.observers:
+                observer.after_request(event)
+        return resp
+
+    def _send(self, method, path, data, headers, files, version):
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", exceptions.InsecureRequestWarning)
             if method == 'GET':
@@ -162,27 +309,27 @@ class ApiClient(object):
                     # Multipart file upload
                     resp = self.session.request(method, self.get_url(path, version=version), files = files, data = data,
                                                 verify = self.verify, headers = headers)
-        try:
-            resp.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            message = e.args[0]
-            try:
-                reason = pprint.pformat(json.loads(resp.text), indent=2)
-                message += '\n Response from server: \n {}'.format(reason)
-            except ValueError:
-                pass
-            raise requests.exceptions.HTTPError(message, response=e.response)
-        return resp.json()
-
+        return resp
 
     def get_url(self, path, version=None):
-        if version:
-            return self.url + version + path
-        elif self.jobs_api_version and path and path.startswith('/jobs'):
-            return self.url + self.jobs_api_version + path
-        elif path and _is_uc_path(path):
-            return self.url + UC_API_VERSION + path
-        return self.url + self.api_version + path
+        return resolve_url(self.url, path, version, self.api_version, self.jobs_api_version)
+
+
+def _count_retries(resp):
+    retries = getattr(resp.raw, 'retries', None)
+    return len(retries.history) if retries is not None else 0
+
+
+def _body_size(body):
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode('utf-8'))
+    try:
+        return len(body)
+    except TypeError:
+        # Streamed bodies have no size up front.
+        return 0
 
 
 def _is_uc_path(path):
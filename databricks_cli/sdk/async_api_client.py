@@ -0,0 +1,182 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+An asyncio counterpart of ApiClient
+
+AsyncApiClient exposes the same perform_query contract as ApiClient as a coroutine. Since the
+services in databricks_cli.sdk.service return the result of perform_query as is, they can be
+driven with an AsyncApiClient and awaited:
+
+  async with AsyncApiClient(host=host, token=token) as client:
+      jobs = JobsService(client)
+      runs = await asyncio.gather(*[jobs.get_run(run_id) for run_id in run_ids])
+
+The transport requires aiohttp.
+"""
+
+import asyncio
+import json
+
+import requests
+from requests.utils import get_netrc_auth
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from . import version as api_versions
+from .api_client import get_api_url, get_default_headers, resolve_url, \
+    _translate_boolean_to_query_param
+
+DEFAULT_MAX_CONNECTIONS = 100
+# Mirrors the urllib3 retry policy of ApiClient: up to 6 retries in total of connection
+# failures, timeouts and 429 responses, honouring Retry-After and otherwise backing off
+# exponentially.
+MAX_RETRIES = 6
+BACKOFF_FACTOR = 1
+BACKOFF_MAX = 120
+
+
+class AsyncApiClient(object):
+    """
+    Takes the authentication and routing arguments of ApiClient, plus max_connections, the
+    maximum number of connections the client opens concurrently.
+    """
+    def __init__(self, user=None, password=None, host=None, token=None,
+                 api_version=api_versions.API_VERSION, default_headers={}, verify=True,
+                 command_name="", jobs_api_version=None, max_connections=DEFAULT_MAX_CONNECTIONS):
+        if aiohttp is None:
+            raise ImportError('AsyncApiClient requires aiohttp. '
+                              'Install it with `pip install databricks-cli[async]`.')
+        self.url = get_api_url(host)
+        self.default_headers = get_default_headers(user, password, token, default_headers,
+                                                   command_name)
+        self.verify = verify
+        self.api_version = api_version
+        self.jobs_api_version = jobs_api_version
+        self.max_connections = max_connections
+        self._session = None
+
+    def get_url(self, path, version=None):
+        return resolve_url(self.url, path, version, self.api_version, self.jobs_api_version)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the client"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        # aiohttp sessions must be created within the running event loop.
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def perform_query(self, method, path, data={}, headers=None, files=None,
+                            version=None):
+        """set up connection and perform query"""
+        headers = dict(self.default_headers, **(headers or {}))
+        # A None value removes a default header, as it does with requests.
+        headers = {k: v for k, v in headers.items() if v is not None}
+        url = self.get_url(path, version=version)
+        auth = None
+        if 'Authorization' not in headers:
+            netrc_tuple = get_netrc_auth(url)
+            if netrc_tuple is not None and any(netrc_tuple):
+                auth = aiohttp.BasicAuth(*netrc_tuple)
+
+        if method == 'GET':
+            params = {k: _translate_boolean_to_query_param(data[k]) for k in data}
+            request_kwargs = {'params': params}
+        elif files is None:
+            request_kwargs = {'data': json.dumps(data)}
+        else:
+            # Multipart file upload
+            form = aiohttp.FormData()
+            for k, v in data.items():
+                form.add_field(k, _translate_boolean_to_query_param(v))
+            for k, (filename, fileobj, content_type) in files.items():
+                form.add_field(k, fileobj, filename=filename, content_type=content_type)
+            request_kwargs = {'data': form}
+
+        attempt = 0
+        while True:
+            try:
+                async with self._get_session().request(method, url, headers=headers, auth=auth,
+                                                       ssl=None if self.verify else False,
+                                                       **request_kwargs) as resp:
+                    status = resp.status
+                    content = await resp.read()
+                    retry_after = resp.headers.get('Retry-After')
+                    reason = resp.reason
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= MAX_RETRIES:
+                    raise
+                await asyncio.sleep(_retry_delay(None, attempt))
+                attempt += 1
+                continue
+            if status != 429 or attempt >= MAX_RETRIES:
+                break
+            await asyncio.sleep(_retry_delay(retry_after, attempt))
+            attempt += 1
+
+        if status >= 400:
+            raise _http_error(method, url, status, reason, content)
+        return json.loads(content.decode('utf-8'))
+
+
+def _retry_delay(retry_after, attempt):
+    try:
+        return max(0, int(retry_after))
+    except (TypeError, ValueError):
+        return min(BACKOFF_MAX, BACKOFF_FACTOR * 2 ** attempt)
+
+
+def _http_error(method, url, status, reason, content):
+    """
+    Builds the same HTTPError ApiClient raises, backed by a requests Response, so that callers
+    handle errors from both clients alike.
+    """
+    response = requests.Response()
+    response.status_code = status
+    response.reason = reason
+    response.url = url
+    response._content = content
+    kind = 'Client' if status < 500 else 'Server'
+    message = '{} {} Error: {} for url: {}'.format(status, kind, reason, url)
+    try:
+        reason_json = json.loads(content.decode('utf-8'))
+        message += '\n Response from server: \n {}'.format(json.dumps(reason_json, indent=2))
+    except ValueError:
+        pass
+    return requests.exceptions.HTTPError(message, response=response)
@@ -23,7 +23,9 @@
 
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
+from hashlib import sha256
 from requests.exceptions import HTTPError
 
 import click
@@ -31,6 +33,8 @@ import click
 from databricks_cli.jobs.api import JobsApi
 from databricks_cli.workspace.api import WorkspaceApi, DIRECTORY, NOTEBOOK
 from databricks_cli.dbfs.api import DbfsApi
+from databricks_cli.dbfs.dbfs_path import DbfsPath
+from databricks_cli.workspace.sync import hash_file
 from databricks_cli.workspace.types import WorkspaceLanguage
 from databricks_cli.version import version as CLI_VERSION
 from databricks_cli.stack.exceptions import StackError
@@ -52,11 +56,24 @@ RESOURCE_ID = 'id'
 RESOURCE_SERVICE = 'service'
 RESOURCE_WRITE_STATUS = 'writeStatus'
 RESOURCE_PROPERTIES = 'properties'
+RESOURCE_DEPENDS_ON = 'depends_on'
 
 # Resource Status Fields
 RESOURCE_DATABRICKS_ID = 'databricks_id'
+RESOURCE_FINGERPRINT = 'fingerprint'
 CLI_VERSION_KEY = 'cli_version'
 
+# Fingerprint Fields
+FINGERPRINT_CONTENT = 'content_sha256'
+FINGERPRINT_REMOTE_STATE = 'remote_state'
+# Number of remote directories listed concurrently when fingerprinting a directory resource.
+REMOTE_LISTING_PARALLELISM = 4
+
+# Plan Actions
+PLAN_CREATE = 'create'
+PLAN_UPDATE = 'update'
+PLAN_UNCHANGED = 'unchanged'
+
 # Job Service Properties
 JOBS_RESOURCE_NAME = 'name'
 JOBS_RESOURCE_JOB_ID = 'job_id'
@@ -72,13 +89,98 @@ DBFS_RESOURCE_PATH = 'path'
 DBFS_RESOURCE_IS_DIR = 'is_dir'
 
 
+def _iter_strings(value):
+    """Yields every string nested in value, a JSON-like structure."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            for string in _iter_strings(item):
+                yield string
+    elif isinstance(value, list):
+        for item in value:
+            for string in _iter_strings(item):
+                yield string
+
+
+def _hash_source(local_path, exclude_hidden_files):
+    """
+    Returns the hex SHA-256 digest of the file at local_path, or of the relative paths and
+    contents of the files below it if it is a directory.
+    """
+    if not os.path.isdir(local_path):
+        return hash_file(local_path)
+    digest = sha256()
+    for root, dirnames, filenames in os.walk(local_path):
+        if exclude_hidden_files:
+            dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+            filenames = [name for name in filenames if not name.startswith('.')]
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(root, filename)
+            relative_path = os.path.relpath(path, local_path).replace(os.sep, '/')
+            digest.update('{}\0{}\0'.format(relative_path, hash_file(path)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _hash_listing(entries):
+    """Returns the hex SHA-256 digest of the entries of a listing, in any order."""
+    return sha256(json.dumps(sorted(entries)).encode('utf-8')).hexdigest()
+
+
+def _references_path(string, path):
+    """
+    Whether string refers to path or to something below it. Notebooks are referred to without
+    the extension of their source file.
+    """
+    path = path.rstrip('/')
+    if string == path or string.startswith(path + '/'):
+        return True
+    return string == os.path.splitext(path)[0]
+
+
+def resource_dependencies(resources):
+    """
+    Returns a dict mapping the ID of each of resources to the set of IDs of the resources that
+    must be deployed before it. Those are the resources listed in its 'depends_on' field, and
+    for jobs:
+
+    - the workspace and DBFS resources whose path is referred to in the job settings, e.g. by a
+      notebook_path or a jar library,
+    - the job resources with the same name that come before it in the config, so that they are
+      not matched to the same existing job concurrently.
+    """
+    # Workspace and DBFS resources both keep their path under the 'path' property.
+    asset_paths = [(resource.get(RESOURCE_ID), resource.get(RESOURCE_PROPERTIES).get(
+        WORKSPACE_RESOURCE_PATH)) for resource in resources
+                   if resource.get(RESOURCE_SERVICE) in (WORKSPACE_SERVICE, DBFS_SERVICE)]
+    job_ids_by_name = {}
+    dependencies = {}
+    for resource in resources:
+        resource_id = resource.get(RESOURCE_ID)
+        depends_on = set(resource.get(RESOURCE_DEPENDS_ON, []))
+        if resource.get(RESOURCE_SERVICE) == JOBS_SERVICE:
+            properties = resource.get(RESOURCE_PROPERTIES)
+            strings = set(_iter_strings(properties))
+            for asset_id, path in asset_paths:
+                if path and any(_references_path(string, path) for string in strings):
+                    depends_on.add(asset_id)
+            same_name = job_ids_by_name.setdefault(properties.get(JOBS_RESOURCE_NAME), [])
+            depends_on.update(same_name)
+            same_name.append(resource_id)
+        depends_on.discard(resource_id)
+        dependencies[resource_id] = depends_on
+    return dependencies
+
+
 class StackApi(object):
     def __init__(self, api_client):
-        self.jobs_client = JobsApi(api_client)
+        self.jobs_client = JobsApi(api_client, use_name_index=True)
         self.workspace_client = WorkspaceApi(api_client)
         self.dbfs_client = DbfsApi(api_client)
 
-    def deploy(self, stack_config, stack_status=None, headers=None, **kwargs):
+    def deploy(self, stack_config, stack_status=None, headers=None, parallelism=1, force=False,
+               **kwargs):
         """
         Deploys a stack given stack JSON configuration template at path config_path.
 
@@ -92,6 +194,10 @@ class StackApi(object):
         :param stack_status: Must have the fields of 'name', the name of the stack, 'resources',
         a list of stack resources, and 'deployed', a list of resource statuses from a previous
         deployment.
+        :param parallelism: Number of resources to deploy concurrently. A resource is only
+        deployed once the resources it depends on are, see resource_dependencies.
+        :param force: Deploys every resource without planning. Otherwise, resources whose
+        fingerprint in stack_status still matches, see plan, are not deployed again.
         :return: new_stack_status: The new stack status generated from the deployment of
         the given stack_config.
         """
@@ -108,24 +214,42 @@ class StackApi(object):
         click.echo('#' * 80)
         click.echo('Deploying stack {}'.format(stack_name))
 
-        # List of statuses, One for each resource in stack_config[STACK_RESOURCES]
-        resource_statuses = []
-        click.echo('#' * 80)
-        for resource_config in stack_config.get(STACK_RESOURCES):
-            # Retrieve resource deployment info from the last deployment.
-            resource_map_key = (resource_config.get(RESOURCE_ID),
-                                resource_config.get(RESOURCE_SERVICE))
-            resource_status = resource_id_to_status.get(resource_map_key) \
-                if resource_map_key in resource_id_to_status else None
-            # Deploy resource, get resource_status
-            new_resource_status = self._deploy_resource(resource_config,
-                                                        resource_status,
-                                                        headers=headers,
-                                                        **kwargs)
+        resources = stack_config.get(STACK_RESOURCES)
+        dependencies = resource_dependencies(resources)
+        # Every resource is deployed when forced, so there is nothing to plan.
+        plan = {} if force else {
+            change[RESOURCE_ID]: change
+            for change in self._plan(resources, resource_id_to_status, headers=headers)}
 
-            if resource_config.get(RESOURCE_WRITE_STATUS, True):
-                resource_statuses.append(new_resource_status)
+        def deploy_resource(resource_config):
+            resource_id = resource_config.get(RESOURCE_ID)
+            # Retrieve resource deployment info from the last deployment.
+            resource_map_key = (resource_id, resource_config.get(RESOURCE_SERVICE))
+            resource_status = resource_id_to_status.get(resource_map_key)
+            change = plan.get(resource_id)
+            if change is not None and change['action'] == PLAN_UNCHANGED:
+                click.echo('Resource "{}" is unchanged since the last deployment, skipping.'
+                           .format(resource_id))
+                click.echo('#' * 80)
+                return resource_status
+            content = change[FINGERPRINT_CONTENT] if change is not None else \
+                self._content_hash(resource_config)
+            new_resource_status = self._deploy_resource(resource_config, resource_status,
+                                                        headers=headers, **kwargs)
+            new_resource_status[RESOURCE_FINGERPRINT] = {
+                FINGERPRINT_CONTENT: content,
+                FINGERPRINT_REMOTE_STATE: self._remote_state(resource_config, headers=headers),
+            }
             click.echo('#' * 80)
+            return new_resource_status
+
+        click.echo('#' * 80)
+        new_statuses = self._deploy_in_order(resources, dependencies, deploy_resource,
+                                             parallelism)
+        # One status for each resource in stack_config[STACK_RESOURCES], in config order.
+        resource_statuses = [new_statuses[resource_config.get(RESOURCE_ID)]
+                             for resource_config in resources
+                             if resource_config.get(RESOURCE_WRITE_STATUS, True)]
 
         new_stack_status = {STACK_NAME: stack_name,
                             CLI_VERSION_KEY: CLI_VERSION,
@@ -137,6 +261,154 @@ class StackApi(object):
 
         return new_stack_status
 
+    def plan(self, stack_config, stack_status=None, headers=None):
+        """
+        Compares the resources of stack_config with their fingerprints in stack_status, the
+        status of the last deployment, to tell which resources a deployment would change.
+
+        A resource is unchanged if the hash of its properties and local source files is the same
+        as when it was last deployed and, for workspace and DBFS assets, if neither the remote
+        object nor any object below a remote directory was modified since, see _remote_state.
+        Job settings are only compared locally.
+
+        :return: list of dicts with the 'id', 'service', 'action' ('create', 'update' or
+        'unchanged') and 'reason' of each resource, in config order.
+        """
+        self._validate_config(stack_config)
+        resource_id_to_status = {}
+        if stack_status:
+            self._validate_status(stack_status)
+            resource_id_to_status = self._get_resource_to_status_map(stack_status)
+        changes = self._plan(stack_config.get(STACK_RESOURCES), resource_id_to_status,
+                             headers=headers)
+        for change in changes:
+            del change[FINGERPRINT_CONTENT]
+        return changes
+
+    def _plan(self, resources, resource_id_to_status, headers=None):
+        changes = []
+        for resource_config in resources:
+            resource_id = resource_config.get(RESOURCE_ID)
+            resource_service = resource_config.get(RESOURCE_SERVICE)
+            resource_status = resource_id_to_status.get((resource_id, resource_service))
+            content = self._content_hash(resource_config)
+            fingerprint = (resource_status or {}).get(RESOURCE_FINGERPRINT)
+            if resource_status is None:
+                action, reason = PLAN_CREATE, 'not deployed yet'
+            elif not fingerprint:
+                action, reason = PLAN_UPDATE, 'no fingerprint from the last deployment'
+            elif fingerprint.get(FINGERPRINT_CONTENT) != content:
+                action, reason = PLAN_UPDATE, 'changed locally'
+            elif fingerprint.get(FINGERPRINT_REMOTE_STATE) != \
+                    self._remote_state(resource_config, headers=headers):
+                action, reason = PLAN_UPDATE, 'changed remotely'
+            else:
+                action, reason = PLAN_UNCHANGED, 'unchanged'
+            changes.append({RESOURCE_ID: resource_id, RESOURCE_SERVICE: resource_service,
+                            'action': action, 'reason': reason, FINGERPRINT_CONTENT: content})
+        return changes
+
+    @staticmethod
+    def _content_hash(resource_config):
+        """
+        Hashes the properties of the resource, along with its local source files for workspace
+        and DBFS assets.
+        """
+        properties = resource_config.get(RESOURCE_PROPERTIES)
+        digest = sha256(json.dumps(properties, sort_keys=True).encode('utf-8'))
+        if resource_config.get(RESOURCE_SERVICE) in (WORKSPACE_SERVICE, DBFS_SERVICE):
+            local_path = properties.get(WORKSPACE_RESOURCE_SOURCE_PATH)
+            if os.path.exists(local_path):
+                exclude_hidden_files = resource_config.get(RESOURCE_SERVICE) == WORKSPACE_SERVICE
+                digest.update(_hash_source(local_path, exclude_hidden_files).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _remote_state(self, resource_config, headers=None):
+        """
+        Returns what identifies the deployed version of a workspace or DBFS asset: the
+        modification time of a file or notebook, or for a directory, a hash of the paths and
+        modification times of the objects below it, which takes listing the whole directory.
+        Returns None if the asset doesn't exist or the resource is a job.
+        """
+        properties = resource_config.get(RESOURCE_PROPERTIES)
+        resource_service = resource_config.get(RESOURCE_SERVICE)
+        try:
+            if resource_service == WORKSPACE_SERVICE:
+                workspace_path = properties.get(WORKSPACE_RESOURCE_PATH)
+                status = self.workspace_client.client.get_status(workspace_path, headers=headers)
+                if status.get('object_type') != DIRECTORY:
+                    return status.get('modified_at')
+                directories, objects = self.workspace_client._list_tree(
+                    workspace_path, REMOTE_LISTING_PARALLELISM, headers=headers)
+                return _hash_listing([obj.path, obj.object_type, obj.object_id, obj.modified_at]
+                                     for obj in directories + objects)
+            if resource_service == DBFS_SERVICE:
+                dbfs_path = DbfsPath(properties.get(DBFS_RESOURCE_PATH))
+                file_info = self.dbfs_client.get_status(dbfs_path, headers=headers)
+                if not file_info.is_dir:
+                    return file_info.modification_time
+                directories, files = self.dbfs_client._list_tree(
+                    dbfs_path, REMOTE_LISTING_PARALLELISM, headers=headers)
+                return _hash_listing([f.dbfs_path.absolute_path, f.is_dir, f.file_size,
+                                      f.modification_time] for f in directories + files)
+        except HTTPError:
+            pass
+        return None
+
+    @staticmethod
+    def _deploy_in_order(resources, dependencies, deploy_resource, parallelism):
+        """
+        Calls deploy_resource on each of resources once the resources it depends on are
+        deployed, running up to ``parallelism`` deployments at a time. Ready resources are
+        started in config order. A failed deployment does not stop the deployments that don't
+        depend on it; once every other deployment has finished, the failures are raised as a
+        StackError.
+
+        :return: dict of resource ID to the value returned by deploy_resource.
+        """
+        pending = [resource.get(RESOURCE_ID) for resource in resources]
+        resources_by_id = {resource.get(RESOURCE_ID): resource for resource in resources}
+        results, failures = {}, []
+        running = {}
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            while pending or running:
+                for resource_id in list(pending):
+                    if len(running) >= parallelism:
+                        break
+                    failed_dependencies = [dependency for dependency, _ in failures
+                                           if dependency in dependencies[resource_id]]
+                    if failed_dependencies:
+                        pending.remove(resource_id)
+                        failures.append((resource_id, StackError(
+                            'Not deployed because "{}" failed to deploy.'.format(
+                                failed_dependencies[0]))))
+                    elif all(dependency in results for dependency in dependencies[resource_id]):
+                        pending.remove(resource_id)
+                        future = executor.submit(deploy_resource, resources_by_id[resource_id])
+                        running[future] = resource_id
+                if not running:
+                    if pending:
+                        # Only a dependency cycle leaves pending resources that can never start.
+                        raise StackError('Resources {} depend on each other.'.format(pending))
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    resource_id = running.pop(future)
+                    if future.exception() is not None:
+                        click.echo('Failed to deploy resource "{}": {}'.format(
+                            resource_id, future.exception()))
+                        failures.append((resource_id, future.exception()))
+                    else:
+                        results[resource_id] = future.result()
+        if len(failures) == 1:
+            raise failures[0][1]
+        if failures:
+            raise StackError('{} of {} resources failed to deploy:\n{}'.format(
+                len(failures), len(resources), '\n'.join(
+                    '  {}: {}'.format(resource_id, exception)
+                    for resource_id, exception in failures)))
+        return results
+
     def download(self, stack_config, headers=None, **kwargs):
         """
         Downloads a stack given a dict of the stack configuration.
@@ -479,6 +751,16 @@ class StackApi(object):
             else:
                 raise StackError('Resource service "{}" not supported'.format(resource_service))
 
+        for resource in stack_config.get(STACK_RESOURCES):
+            depends_on = resource.get(RESOURCE_DEPENDS_ON, [])
+            if not isinstance(depends_on, list):
+                raise StackError('Field "{}" of resource "{}" must be a list of resource IDs.'
+                                 .format(RESOURCE_DEPENDS_ON, resource.get(RESOURCE_ID)))
+            for dependency in depends_on:
+                if dependency not in seen_resource_ids:
+                    raise StackError('Resource "{}" depends on unknown resource "{}".'.format(
+                        resource.get(RESOURCE_ID), dependency))
+
     def _validate_status(self, stack_status):
         """
         Validate fields within a stack status. This ensures that a stack status has the
@@ -24,6 +24,7 @@ import os
 import json
 
 import click
+from tabulate import tabulate
 
 from databricks_cli.utils import eat_exceptions, CONTEXT_SETTINGS
 from databricks_cli.version import print_version_callback, version
@@ -82,6 +83,11 @@ def _save_json(path, data):
 @click.argument('config_path', type=click.Path(exists=True), required=True)
 @click.option('--overwrite', '-o', is_flag=True, default=False, show_default=True,
               help='Include to overwrite existing workspace notebooks and dbfs files')
+@click.option('--parallelism', default=1, type=click.IntRange(min=1), show_default=True,
+              help='Number of resources to deploy concurrently. Resources are deployed after '
+                   'the resources they depend on.')
+@click.option('--force', is_flag=True, default=False, show_default=True,
+              help='Deploy every resource, including those unchanged since the last deployment.')
 @debug_option
 @profile_option
 @eat_exceptions
@@ -96,6 +102,13 @@ def deploy(api_client, config_path, **kwargs):
     please delete the stack status file and try the deployment again. If the problem persists,
     please raise a Github issue on the Databricks CLI repository at
     https://www.github.com/databricks/databricks-cli/issues
+
+    A resource can list the IDs of the resources it needs in a "depends_on" field. Jobs also
+    depend on the workspace and DBFS resources whose paths their settings refer to. With
+    --parallelism, independent resources are deployed concurrently.
+
+    Resources that have not changed since the last deployment are skipped, unless --force is
+    given. See "databricks stack plan".
     """
     click.echo('#' * 80)
     click.echo('Deploying stack at: {} with options: {}'.format(config_path, kwargs))
@@ -141,6 +154,39 @@ def download(api_client, config_path, **kwargs):
     click.echo('#' * 80)
 
 
+@click.command(context_settings=CONTEXT_SETTINGS,
+               short_help='Show which resources of a stack a deployment would change')
+@click.argument('config_path', type=click.Path(exists=True), required=True)
+@debug_option
+@profile_option
+@eat_exceptions
+@provide_api_client
+def plan(api_client, config_path):
+    """
+    Show which resources of a stack a deployment would change.
+
+    Every resource is compared with the fingerprint recorded for it in the stack status of the
+    last deployment. A resource is unchanged if its properties and local source files are the
+    same and, for workspace and DBFS assets, if neither the deployed object nor any object below
+    a deployed directory was modified since. Directories are listed to find out. Changes made to
+    deployed jobs outside of the stack are not detected.
+    """
+    stack_config = _load_json(config_path)
+    stack_status = _load_json(_generate_stack_status_path(config_path))
+    config_dir = os.path.dirname(os.path.abspath(config_path))
+    cli_dir = os.getcwd()
+    os.chdir(config_dir)  # Switch current working directory to where json config is stored
+    try:
+        changes = StackApi(api_client).plan(stack_config, stack_status)
+    finally:
+        os.chdir(cli_dir)
+    click.echo('#' * 80)
+    click.echo(tabulate([(change['action'], change['id'], change['service'], change['reason'])
+                         for change in changes], tablefmt='plain'))
+    changed = [change for change in changes if change['action'] != 'unchanged']
+    click.echo('{} of {} resources would be deployed.'.format(len(changed), len(changes)))
+
+
 @click.group(context_settings=CONTEXT_SETTINGS,
              short_help='[Beta] Utility to deploy and download Databricks resource stacks.')
 @click.option('--version', '-v', is_flag=True, callback=print_version_callback,
@@ -156,3 +202,4 @@ def stack_group():  # pragma: no cover
 
 stack_group.add_command(deploy, name='deploy')
 stack_group.add_command(download, name='download')
+stack_group.add_command(plan, name='plan')
@@ -0,0 +1,119 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from collections import OrderedDict
+
+import click
+
+from databricks_cli.sdk.api_client import ApiClientObserver
+
+TRACE_ENV_VAR = 'DATABRICKS_CLI_TRACE'
+# Upper bounds, in seconds, of the latency histogram buckets. The last bucket is unbounded.
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+
+class EndpointStats(object):
+    """Aggregates the requests sent to one endpoint."""
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.retries = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    def add(self, event):
+        self.latencies.append(event.latency)
+        if event.status is None or event.status >= 400:
+            self.errors += 1
+        self.retries += event.retries
+        self.request_bytes += event.request_bytes
+        self.response_bytes += event.response_bytes
+
+    def percentile(self, fraction):
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+    def histogram(self):
+        counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        for latency in self.latencies:
+            counts[_bucket_index(latency)] += 1
+        return counts
+
+
+class HttpTracer(ApiClientObserver):
+    """
+    Records the latency, retries and sizes of every request, grouped by endpoint, and renders a
+    summary of them. A single tracer can observe several api clients, also across threads.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = OrderedDict()
+
+    def after_request(self, event):
+        key = '{} {}'.format(event.method, event.path)
+        with self._lock:
+            self._endpoints.setdefault(key, EndpointStats()).add(event)
+
+    def get_endpoint_stats(self):
+        with self._lock:
+            return OrderedDict(self._endpoints)
+
+    def format_summary(self):
+        # Imported here to keep tabulate off the startup path of every command.
+        from tabulate import tabulate
+        headers = ['Endpoint', 'Count', 'Errors', 'Retries', 'p50 ms', 'p90 ms', 'p99 ms',
+                   'Max ms', 'Sent', 'Received', 'Histogram']
+        rows = []
+        for key, stats in sorted(self.get_endpoint_stats().items(),
+                                 key=lambda item: -sum(item[1].latencies)):
+            rows.append([key, len(stats.latencies), stats.errors, stats.retries,
+                         _millis(stats.percentile(0.5)), _millis(stats.percentile(0.9)),
+                         _millis(stats.percentile(0.99)), _millis(max(stats.latencies)),
+                         stats.request_bytes, stats.response_bytes,
+                         ' '.join(str(count) for count in stats.histogram())])
+        table = tabulate(rows, headers=headers, tablefmt='plain')
+        return '{}\nHistogram buckets: {}'.format(table, _histogram_legend())
+
+    def echo_summary(self):
+        """Writes the summary to stderr, if any request was recorded."""
+        if not self.get_endpoint_stats():
+            return
+        click.echo('HTTP trace (slowest endpoints first):', err=True)
+        click.echo(self.format_summary(), err=True)
+
+
+def _bucket_index(latency):
+    for index, bound in enumerate(LATENCY_BUCKETS):
+        if latency < bound:
+            return index
+    return len(LATENCY_BUCKETS)
+
+
+def _histogram_legend():
+    bounds = ['<{}s'.format(bound) for bound in LATENCY_BUCKETS]
+    return '{} >={}s'.format(' '.join(bounds), LATENCY_BUCKETS[-1])
+
+
+def _millis(seconds):
+    return int(round(seconds * 1000))
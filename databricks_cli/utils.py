@@ -22,9 +22,12 @@
 # limitations under the License.
 
 import math
+import os
 import random
 import sys
+import tempfile
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from json import dumps as json_dumps, loads as json_loads
 
 import click
@@ -114,6 +117,139 @@ def backoff_with_jitter(attempt):
     return random.randrange(math.floor(sleep_time * 0.5), sleep_time)
 
 
+def poll_interval(intervals, polls_in_state):
+    """
+    Returns how long to wait before polling something again, given the (first, longest)
+    intervals of its current state and the number of polls that already found it in that
+    state. The interval doubles with each such poll and is jittered so that polls spread out.
+    """
+    first, longest = intervals
+    interval = min(longest, first * 2 ** min(polls_in_state, MAX_EXPONENT))
+    return interval * random.uniform(0.75, 1)
+
+
+def run_concurrently(function, items, parallelism):
+    """
+    Calls function on each of items over a pool of at most ``parallelism`` threads and yields
+    ``(item, result, exception)`` tuples in completion order. An exception raised by function is
+    yielded instead of raised, so that callers can carry on and report per-item failures.
+    """
+    items = list(items)
+    if parallelism <= 1 or len(items) <= 1:
+        for item in items:
+            try:
+                result = function(item)
+            except Exception as e:  # noqa
+                yield item, None, e
+            else:
+                yield item, result, None
+        return
+    with ThreadPoolExecutor(max_workers=min(parallelism, len(items))) as executor:
+        futures = {executor.submit(function, item): item for item in items}
+        try:
+            for future in as_completed(futures):
+                exception = future.exception()
+                result = future.result() if exception is None else None
+                yield futures[future], result, exception
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def run_with_progress(function, items, parallelism, action):
+    """
+    Calls function(src, dst) for every (src, dst) pair of items over a pool of ``parallelism``
+    threads, echoing a numbered line as each call finishes: the line function returns, or that
+    src failed to ``action``. A failed call does not stop the others; failures are summarized
+    with summarize_failures once every call has finished.
+    """
+    items = list(items)
+    failures = []
+    results = run_concurrently(lambda item: function(*item), items, parallelism)
+    for count, ((src, _), message, exception) in enumerate(results, 1):
+        if exception is not None:
+            failures.append((src, exception))
+            message = 'Failed to {} {}.'.format(action, src)
+        click.echo('[{}/{}] {}'.format(count, len(items), message))
+    summarize_failures(failures, action, total=len(items))
+
+
+def summarize_failures(failures, action, noun='files', total=None):
+    """
+    Echoes each (item, exception) pair of failures, then raises a RuntimeError that counts them.
+    Does nothing if there are no failures.
+    """
+    if not failures:
+        return
+    count = len(failures) if total is None else '{} of {}'.format(len(failures), total)
+    click.echo('{} {} failed to {}:'.format(count, noun, action))
+    for item, exception in failures:
+        click.echo('  {}: {}: {}'.format(item, type(exception).__name__, exception))
+    raise RuntimeError('{} {} failed to {}.'.format(len(failures), noun, action))
+
+
+def create_directory_tree(mkdirs, paths, parallelism):
+    """
+    Creates the ``/`` separated directory paths by calling mkdirs over a pool of
+    ``parallelism`` threads, and raises the first failure.
+    """
+    # mkdirs creates missing parents, so creating the leaves builds the whole skeleton.
+    for _, _, exception in run_concurrently(mkdirs, innermost_paths(paths), parallelism):
+        if exception is not None:
+            raise exception
+
+
+def _path_ancestors(relpath):
+    parts = relpath.split('/')
+    return ['/'.join(parts[:i]) for i in range(1, len(parts))]
+
+
+def outermost_paths(relpaths):
+    """
+    Drops every path that lies below another path of relpaths.
+
+    >>> outermost_paths(['a', 'a/b', 'c/d'])
+    ['a', 'c/d']
+    """
+    relpaths = set(relpaths)
+    return sorted(p for p in relpaths if not any(a in relpaths for a in _path_ancestors(p)))
+
+
+def innermost_paths(relpaths):
+    """
+    Drops every path that is an ancestor of another path of relpaths.
+
+    >>> innermost_paths(['a', 'a/b', 'c'])
+    ['a/b', 'c']
+    """
+    relpaths = set(relpaths)
+    ancestors = set(a for p in relpaths for a in _path_ancestors(p))
+    return sorted(p for p in relpaths if p not in ancestors)
+
+
+def write_json_atomically(path, content, **kwargs):
+    """
+    Writes content as JSON to a uniquely named temporary file next to path, and renames it over
+    path, so that neither readers nor concurrent writers ever see a partial file. kwargs are
+    passed on to json.dumps.
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory, exist_ok=True)
+    temp_file = tempfile.NamedTemporaryFile('w', dir=directory or None, delete=False,
+                                            prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with temp_file:
+            temp_file.write(json_dumps(content, **kwargs))
+        os.replace(temp_file.name, path)
+    except BaseException:
+        try:
+            os.remove(temp_file.name)
+        except OSError:
+            pass
+        raise
+
+
 def pretty_format(json, encode_utf8=False):
     if encode_utf8:
         return json_dumps(json, indent=2, ensure_ascii=False)
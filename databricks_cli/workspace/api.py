@@ -22,18 +22,39 @@
 # limitations under the License.
 
 import os
+import posixpath
 from base64 import b64encode, b64decode
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 import click
+from requests.exceptions import HTTPError
 
 from databricks_cli.dbfs.exceptions import LocalFileExistsException
 from databricks_cli.sdk import WorkspaceService
+from databricks_cli.utils import error_and_quit, run_concurrently, run_with_progress, \
+    summarize_failures, create_directory_tree, outermost_paths
+from databricks_cli.workspace.dbc import pack_directory, unpack_archive
+from databricks_cli.workspace.sync import WorkspaceSyncManifest, MANIFEST_FILE_NAME, hash_file
 from databricks_cli.workspace.types import WorkspaceFormat, WorkspaceLanguage
 
 DIRECTORY = 'DIRECTORY'
 NOTEBOOK = 'NOTEBOOK'
 LIBRARY = 'LIBRARY'
 REPO = 'REPO'
+# Number of base64 characters decoded at a time when writing exports. Must be a multiple of 4.
+DECODE_CHUNK_CHARS = 4 * 1024 * 1024
+# The workspace API rejects requests larger than this, which bounds the size of DBC imports.
+MAX_IMPORT_BYTES = 10 * 1024 * 1024
+# Error codes of the requests rejected for exceeding the size limits of the workspace API.
+SIZE_LIMIT_ERROR_CODES = ['MAX_NOTEBOOK_SIZE_EXCEEDED', 'MAX_READ_SIZE_EXCEEDED',
+                          'RESOURCE_EXHAUSTED']
+RESOURCE_ALREADY_EXISTS = 'RESOURCE_ALREADY_EXISTS'
+RESOURCE_DOES_NOT_EXIST = 'RESOURCE_DOES_NOT_EXIST'
+# Default cap on the size of the base64 payloads held in memory by concurrent imports.
+DEFAULT_MAX_INFLIGHT_BYTES = 128 * 1024 * 1024
 
 
 class WorkspaceFileInfo(object):
@@ -42,6 +63,7 @@ class WorkspaceFileInfo(object):
         self.object_type = object_type
         self.language = language
         self.object_id = object_id
+        self.modified_at = kwargs.get('modified_at')
 
     def to_row(self, is_long_form, is_absolute, with_object_id=False):
         path = self.path if is_absolute else self.basename
@@ -123,18 +145,36 @@ class WorkspaceApi(object):
         if os.path.exists(target_path) and not is_overwrite:
             raise LocalFileExistsException('Target {} already exists.'.format(target_path))
         output = self.client.export_workspace(source_path, fmt, headers=headers)
-        content = output['content']
         # Will overwrite target_path.
-        with open(target_path, 'wb') as f:
-            decoded = b64decode(content)
-            f.write(decoded)
+        _write_base64(output['content'], target_path)
 
     def delete(self, workspace_path, is_recursive, headers=None):
         self.client.delete(workspace_path, is_recursive, headers=headers)
 
     def import_workspace_dir(self, source_path, target_path, overwrite, exclude_hidden_files,
-                             headers=None):
-        # pylint: disable=too-many-locals
+                             headers=None, parallelism=1,
+                             max_inflight_bytes=DEFAULT_MAX_INFLIGHT_BYTES, bulk=False):
+        if bulk:
+            self._import_workspace_dir_bulk(source_path, target_path, overwrite,
+                                            exclude_hidden_files, headers=headers)
+            return
+        if parallelism > 1:
+            self._import_workspace_dir_parallel(source_path, target_path, overwrite,
+                                                exclude_hidden_files, parallelism,
+                                                max_inflight_bytes, headers=headers)
+            return
+        self._import_dir_contents(
+            source_path, target_path, overwrite, exclude_hidden_files,
+            lambda src, dst: self.import_workspace_dir(src, dst, overwrite, exclude_hidden_files,
+                                                       headers=headers),
+            headers=headers)
+
+    def _import_dir_contents(self, source_path, target_path, overwrite, exclude_hidden_files,
+                             import_subdir, headers=None):
+        """
+        Imports the files directly in source_path one by one, and each of its subdirectories with
+        import_subdir(src, dst).
+        """
         filenames = os.listdir(source_path)
         if exclude_hidden_files:
             # for now, just exclude hidden files or directories based on starting '.'
@@ -145,8 +185,7 @@ class WorkspaceApi(object):
             # don't use os.path.join here since it will set \ on Windows
             cur_dst = target_path.rstrip('/') + '/' + filename
             if os.path.isdir(cur_src):
-                self.import_workspace_dir(cur_src, cur_dst, overwrite, exclude_hidden_files,
-                                          headers=headers)
+                import_subdir(cur_src, cur_dst)
             elif os.path.isfile(cur_src):
                 ext = WorkspaceLanguage.get_extension(cur_src)
                 if ext != '':
@@ -160,7 +199,26 @@ class WorkspaceApi(object):
                     click.echo(('{} does not have a valid extension of {}. Skip this file and ' +
                                 'continue.').format(cur_src, extensions))
 
-    def export_workspace_dir(self, source_path, target_path, overwrite, headers=None):
+    def export_workspace_dir(self, source_path, target_path, overwrite, headers=None,
+                             parallelism=1, bulk=False):
+        if bulk:
+            self._export_workspace_dir_bulk(source_path, target_path, overwrite, headers=headers)
+            return
+        if parallelism > 1:
+            self._export_workspace_dir_parallel(source_path, target_path, overwrite, parallelism,
+                                                headers=headers)
+            return
+        self._export_dir_contents(
+            source_path, target_path, overwrite,
+            lambda src, dst: self.export_workspace_dir(src, dst, overwrite, headers=headers),
+            headers=headers)
+
+    def _export_dir_contents(self, source_path, target_path, overwrite, export_subdir,
+                             headers=None):
+        """
+        Exports the notebooks directly in source_path one by one, and each of its subdirectories
+        with export_subdir(src, dst).
+        """
         if os.path.isfile(target_path):
             click.echo('{} exists as a file. Skipping this subtree {}'
                        .format(target_path, source_path))
@@ -171,7 +229,7 @@ class WorkspaceApi(object):
             cur_src = obj.path
             cur_dst = os.path.join(target_path, obj.basename)
             if obj.is_dir:
-                self.export_workspace_dir(cur_src, cur_dst, overwrite, headers=headers)
+                export_subdir(cur_src, cur_dst)
             elif obj.is_notebook:
                 cur_dst = cur_dst + WorkspaceLanguage.to_extension(obj.language)
                 try:
@@ -182,3 +240,431 @@ class WorkspaceApi(object):
                     click.echo('{} already exists locally as {}. Skip.'.format(cur_src, cur_dst))
             else:
                 click.echo('{} is neither a dir or a notebook. Skip.'.format(cur_src))
+
+    def _export_workspace_dir_bulk(self, source_path, target_path, overwrite, headers=None):
+        """
+        Exports source_path as a single DBC archive and unpacks it into SOURCE files. Directories
+        too large to be exported at once have their notebooks exported one by one and each of
+        their subdirectories exported in bulk again.
+        """
+        if os.path.isfile(target_path):
+            click.echo('{} exists as a file. Skipping this subtree {}'
+                       .format(target_path, source_path))
+            return
+        try:
+            output = self.client.export_workspace(source_path, WorkspaceFormat.DBC,
+                                                  headers=headers)
+        except HTTPError as e:
+            if _error_code(e) not in SIZE_LIMIT_ERROR_CODES:
+                raise
+            click.echo('{} is too large to export as one archive. Exporting its contents '
+                       'separately.'.format(source_path))
+            self._export_dir_contents(
+                source_path, target_path, overwrite,
+                lambda src, dst: self._export_workspace_dir_bulk(src, dst, overwrite,
+                                                                 headers=headers),
+                headers=headers)
+            return
+        if not os.path.isdir(target_path):
+            os.makedirs(target_path)
+        written, skipped = unpack_archive(b64decode(output['content']), target_path, overwrite)
+        click.echo('{} -> {} ({} notebooks)'.format(source_path, target_path, len(written)))
+        for path in skipped:
+            click.echo('{} already exists locally. Skip.'.format(path))
+
+    def _import_workspace_dir_bulk(self, source_path, target_path, overwrite,
+                                   exclude_hidden_files, headers=None):
+        """
+        Imports the SOURCE notebooks below source_path as DBC archives, and the other files one
+        by one. source_path is walked once. A target that already exists can't be imported as
+        an archive, so it is imported file by file. Otherwise, each subtree whose notebooks fit
+        in a single request is packed and imported as one archive, and the files directly in
+        larger directories are imported one by one.
+        """
+        target_path = target_path.rstrip('/') or '/'
+        directories, imports = self._plan_import_dir(source_path, target_path,
+                                                     exclude_hidden_files)
+        if target_path == '/' or self._exists(target_path, headers=headers):
+            click.echo('{} already exists. Importing its files one by one.'.format(target_path))
+            self._mkdirs_concurrently(directories, 1, headers=headers)
+            self._run_imports(imports, overwrite, 1, DEFAULT_MAX_INFLIGHT_BYTES,
+                              headers=headers)
+            return
+
+        subdirs, files = {}, {}
+        for directory in directories[1:]:
+            subdirs.setdefault(posixpath.dirname(directory), []).append(directory)
+        for src, dst in imports:
+            files.setdefault(posixpath.dirname(dst), []).append((src, dst))
+        # The size of its notebooks approximates the size of the archive of a subtree, which
+        # is compressed.
+        packed_sizes = {}
+        for directory in reversed(directories):
+            packed_sizes[directory] = sum(
+                os.path.getsize(src) for src, _ in files.get(directory, []) if _is_source(src))
+            packed_sizes[directory] += sum(packed_sizes[d] for d in subdirs.get(directory, []))
+
+        def subtree(directory):
+            subtree_dirs, subtree_imports = [directory], list(files.get(directory, []))
+            for subdir in subdirs.get(directory, []):
+                sub_dirs, sub_imports = subtree(subdir)
+                subtree_dirs.extend(sub_dirs)
+                subtree_imports.extend(sub_imports)
+            return subtree_dirs, subtree_imports
+
+        def import_dir(directory, local_dir):
+            if packed_sizes[directory] and \
+                    _base64_size(packed_sizes[directory]) <= MAX_IMPORT_BYTES and \
+                    self._import_archive(local_dir, directory, *subtree(directory),
+                                         overwrite=overwrite, headers=headers):
+                return
+            self.mkdirs(directory, headers=headers)
+            for src, dst in files.get(directory, []):
+                (language, file_format) = WorkspaceLanguage.to_language_and_format(src)
+                self.import_workspace(src, dst, language, file_format, overwrite,
+                                      headers=headers)
+                click.echo('{} -> {}'.format(src, dst))
+            for subdir in subdirs.get(directory, []):
+                import_dir(subdir, os.path.join(local_dir, posixpath.basename(subdir)))
+
+        self.mkdirs(posixpath.dirname(target_path), headers=headers)
+        import_dir(target_path, source_path)
+
+    def _import_archive(self, source_path, target_path, directories, imports, overwrite,
+                        headers=None):
+        """
+        Packs the SOURCE notebooks of imports into a DBC archive imported at target_path, then
+        creates the empty directories and imports the other files. Returns False without
+        importing anything if the workspace rejects the archive for its size or because
+        target_path exists.
+        """
+        packed = [(src, dst) for src, dst in imports if _is_source(src)]
+        archive = pack_directory(source_path, posixpath.basename(target_path),
+                                 [src for src, _ in packed])
+        try:
+            self.client.import_workspace(target_path, WorkspaceFormat.DBC, None,
+                                         b64encode(archive).decode(), False, headers=headers)
+        except HTTPError as e:
+            if _error_code(e) not in SIZE_LIMIT_ERROR_CODES + [RESOURCE_ALREADY_EXISTS]:
+                raise
+            click.echo('{} could not be imported as one archive. Importing its contents '
+                       'separately.'.format(source_path))
+            return False
+        click.echo('{} -> {} ({} notebooks)'.format(source_path, target_path, len(packed)))
+        # Archives don't hold empty directories, nor files in other formats than SOURCE.
+        populated = set(a for _, dst in packed for a in _workspace_ancestors(dst))
+        self._mkdirs_concurrently([d for d in directories if d not in populated], 1,
+                                  headers=headers)
+        packed = set(packed)
+        for src, dst in imports:
+            if (src, dst) not in packed:
+                (language, file_format) = WorkspaceLanguage.to_language_and_format(src)
+                self.import_workspace(src, dst, language, file_format, overwrite,
+                                      headers=headers)
+                click.echo('{} -> {}'.format(src, dst))
+        return True
+
+    def _exists(self, workspace_path, headers=None):
+        try:
+            self.client.get_status(workspace_path, headers=headers)
+        except HTTPError as e:
+            if _error_code(e) == RESOURCE_DOES_NOT_EXIST or \
+                    (e.response is not None and e.response.status_code == 404):
+                return False
+            raise
+        return True
+
+    def _import_workspace_dir_parallel(self, source_path, target_path, overwrite,
+                                       exclude_hidden_files, parallelism, max_inflight_bytes,
+                                       headers=None):
+        """
+        Creates the directory skeleton of source_path below target_path, then imports its files
+        over a pool of ``parallelism`` threads. At most max_inflight_bytes of base64 payloads are
+        held in memory at once. A failed import does not stop the others; failures are
+        summarized once every import has finished.
+        """
+        directories, imports = self._plan_import_dir(source_path, target_path,
+                                                     exclude_hidden_files)
+        self._mkdirs_concurrently(directories, parallelism, headers=headers)
+        self._run_imports(imports, overwrite, parallelism, max_inflight_bytes, headers=headers)
+
+    @staticmethod
+    def _plan_import_dir(source_path, target_path, exclude_hidden_files):
+        """
+        Lists the directories to create and the files to import to mirror source_path at
+        target_path.
+
+        :return: ([str], [(str, str)]) the workspace directories, and the local and workspace
+                 paths of each file.
+        """
+        directories, imports = [target_path.rstrip('/') or '/'], []
+        target_path = target_path.rstrip('/')
+        for root, dirnames, filenames in os.walk(source_path):
+            if exclude_hidden_files:
+                dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+                filenames = [f for f in filenames if not f.startswith('.')]
+            relpath = os.path.relpath(root, source_path)
+            # don't use os.path.join here since it will set \ on Windows
+            cur_target = target_path if relpath == '.' else \
+                target_path + '/' + '/'.join(relpath.split(os.sep))
+            directories.extend(cur_target + '/' + dirname for dirname in dirnames)
+            for filename in filenames:
+                if filename == MANIFEST_FILE_NAME:
+                    continue
+                cur_src = os.path.join(root, filename)
+                if not os.path.isfile(cur_src):
+                    continue
+                ext = WorkspaceLanguage.get_extension(cur_src)
+                if ext == '':
+                    extensions = ', '.join(WorkspaceLanguage.EXTENSIONS)
+                    click.echo(('{} does not have a valid extension of {}. Skip this file and ' +
+                                'continue.').format(cur_src, extensions))
+                    continue
+                cur_dst = cur_target + '/' + filename[:-len(ext)]
+                imports.append((cur_src, cur_dst))
+        return directories, imports
+
+    def _mkdirs_concurrently(self, workspace_paths, parallelism, headers=None):
+        create_directory_tree(lambda path: self.mkdirs(path, headers=headers), workspace_paths,
+                              parallelism)
+
+    def _run_imports(self, imports, overwrite, parallelism, max_inflight_bytes,
+                     on_imported=None, headers=None):
+        """
+        Imports every (src, dst) pair of imports over a pool of ``parallelism`` threads, holding
+        at most max_inflight_bytes of base64 payloads in memory at once. on_imported(src, dst) is
+        called after each successful import. A failed import does not stop the others; failures
+        are summarized once every import has finished.
+        """
+        budget = _ByteBudget(max_inflight_bytes)
+
+        def import_file(src, dst):
+            (language, file_format) = WorkspaceLanguage.to_language_and_format(src)
+            payload_size = _base64_size(os.path.getsize(src))
+            with budget.reserve(payload_size):
+                self.import_workspace(src, dst, language, file_format, overwrite,
+                                      headers=headers)
+            if on_imported is not None:
+                on_imported(src, dst)
+            return '{} -> {}'.format(src, dst)
+
+        run_with_progress(import_file, imports, parallelism, 'import')
+
+    def _list_tree(self, workspace_path, parallelism, headers=None):
+        """
+        Lists every object below workspace_path, listing up to ``parallelism`` directories
+        concurrently. A missing workspace_path is listed as empty.
+
+        :return: ([WorkspaceFileInfo], [WorkspaceFileInfo]) the directories and the other
+                 objects of the tree.
+        """
+        directories, objects = [], []
+        try:
+            listing = self.list_objects(workspace_path, headers=headers)
+        except HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return directories, objects
+            raise
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            pending = set()
+            while True:
+                for obj in listing:
+                    if obj.is_dir:
+                        directories.append(obj)
+                        pending.add(executor.submit(self.list_objects, obj.path,
+                                                    headers=headers))
+                    else:
+                        objects.append(obj)
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                listing = [obj for future in done for obj in future.result()]
+        return directories, objects
+
+    def sync(self, source_path, target_path, delete=False, dry_run=False,
+             exclude_hidden_files=False, parallelism=1, manifest_path=None,
+             max_inflight_bytes=DEFAULT_MAX_INFLIGHT_BYTES, headers=None):
+        """
+        Imports the files of the local directory source_path that changed since they were last
+        synced to target_path, or that are missing from it.
+
+        The content hash of every imported file is kept in a manifest, stored at the root of
+        source_path unless manifest_path is given. With ``delete``, notebooks and directories
+        below target_path that have no local counterpart are removed from the workspace.
+        """
+        # pylint: disable=too-many-locals
+        if not os.path.isdir(source_path):
+            error_and_quit('The local directory {} does not exist.'.format(source_path))
+        manifest_path = manifest_path or os.path.join(source_path, MANIFEST_FILE_NAME)
+        target_path = target_path.rstrip('/') or '/'
+        manifest = WorkspaceSyncManifest.load(manifest_path,
+                                              self.client.client.url + target_path)
+        directories, imports = self._plan_import_dir(source_path, target_path,
+                                                     exclude_hidden_files)
+        remote_dirs, remote_objects = self._list_tree(target_path, parallelism, headers=headers)
+        remote_paths = set(obj.path for obj in remote_objects)
+
+        def relpath(src):
+            return '/'.join(os.path.relpath(src, source_path).split(os.sep))
+
+        hashes = {}
+        for src, content_hash, exception in run_concurrently(
+                hash_file, [src for src, _ in imports], parallelism):
+            if exception is not None:
+                raise exception
+            hashes[relpath(src)] = content_hash
+        changed = [(src, dst) for src, dst in imports if dst not in remote_paths or
+                   not manifest.is_unchanged(relpath(src), hashes[relpath(src)])]
+        deletes = []
+        if delete:
+            local_paths = set(directories).union(dst for _, dst in imports)
+            extra = [obj.path for obj in remote_dirs + remote_objects
+                     if (obj.is_dir or obj.is_notebook) and obj.path not in local_paths]
+            deletes = outermost_paths(extra)
+        unchanged = len(imports) - len(changed)
+
+        if dry_run:
+            for src, dst in changed:
+                click.echo('Would import {} -> {}'.format(src, dst))
+            for path in deletes:
+                click.echo('Would delete {}'.format(path))
+            click.echo('{} to import, {} to delete, {} unchanged.'.format(
+                len(changed), len(deletes), unchanged))
+            return
+
+        self._mkdirs_concurrently(directories, parallelism, headers=headers)
+        try:
+            self._run_imports(changed, True, parallelism, max_inflight_bytes,
+                              on_imported=lambda src, _: manifest.record(
+                                  relpath(src), hashes[relpath(src)]),
+                              headers=headers)
+            remote_dir_paths = set(obj.path for obj in remote_dirs)
+            for path in deletes:
+                self.delete(path, path in remote_dir_paths, headers=headers)
+                click.echo('Deleted {}'.format(path))
+        finally:
+            manifest.retain(hashes)
+            manifest.save()
+        click.echo('{} imported, {} deleted, {} unchanged.'.format(
+            len(changed), len(deletes), unchanged))
+
+    def _export_workspace_dir_parallel(self, source_path, target_path, overwrite, parallelism,
+                                       headers=None):
+        """
+        Exports the tree below source_path over a pool of ``parallelism`` threads. Directories
+        are listed breadth-first and their notebooks are exported as soon as they are listed,
+        so exports start before the whole tree is known. Failures do not stop the export and are
+        summarized together with the counts of exported and skipped objects once it is done.
+        """
+        counts = Counter()
+        failures = []
+
+        def list_dir(src, dst):
+            if os.path.isfile(dst):
+                click.echo('{} exists as a file. Skipping this subtree {}'.format(dst, src))
+                return []
+            if not os.path.isdir(dst):
+                os.makedirs(dst)
+            return self.list_objects(src, headers=headers)
+
+        def export_notebook(src, dst):
+            try:
+                self.export_workspace(src, dst, WorkspaceFormat.SOURCE, overwrite,
+                                      headers=headers)
+                return 'exported'
+            except LocalFileExistsException:
+                return 'existing'
+
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            pending = {executor.submit(list_dir, source_path, target_path):
+                       (source_path, target_path, True)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    src, dst, is_listing = pending.pop(future)
+                    if future.exception() is not None:
+                        failures.append((src, future.exception()))
+                    elif not is_listing:
+                        counts[future.result()] += 1
+                    else:
+                        for obj in future.result():
+                            cur_dst = os.path.join(dst, obj.basename)
+                            if obj.is_dir:
+                                pending[executor.submit(list_dir, obj.path, cur_dst)] = \
+                                    (obj.path, cur_dst, True)
+                            elif obj.is_notebook:
+                                cur_dst += WorkspaceLanguage.to_extension(obj.language)
+                                pending[executor.submit(export_notebook, obj.path, cur_dst)] = \
+                                    (obj.path, cur_dst, False)
+                            else:
+                                counts['other'] += 1
+
+        click.echo('Exported {} notebooks from {} to {}.'.format(counts['exported'], source_path,
+                                                                 target_path))
+        if counts['existing']:
+            click.echo('Skipped {} notebooks that already exist locally.'
+                       .format(counts['existing']))
+        if counts['other']:
+            click.echo('Skipped {} objects that are neither a dir or a notebook.'
+                       .format(counts['other']))
+        summarize_failures(failures, 'export', noun='objects')
+
+
+class _ByteBudget(object):
+    """
+    Bounds the number of bytes reserved at once across threads. A reservation larger than the
+    whole budget is granted once nothing else is reserved, so that large files still go through.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.reserved_bytes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, num_bytes):
+        with self._condition:
+            while self.reserved_bytes > 0 and self.reserved_bytes + num_bytes > self.max_bytes:
+                self._condition.wait()
+            self.reserved_bytes += num_bytes
+
+    def release(self, num_bytes):
+        with self._condition:
+            self.reserved_bytes -= num_bytes
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, num_bytes):
+        self.acquire(num_bytes)
+        try:
+            yield
+        finally:
+            self.release(num_bytes)
+
+
+def _error_code(http_error):
+    try:
+        return http_error.response.json().get('error_code')
+    except (AttributeError, ValueError):
+        return None
+
+
+def _is_source(path):
+    return WorkspaceLanguage.to_language_and_format(path)[1] == WorkspaceFormat.SOURCE
+
+
+def _workspace_ancestors(path):
+    parts = path.split('/')
+    return ['/'.join(parts[:i]) for i in range(2, len(parts))]
+
+
+def _base64_size(num_bytes):
+    return 4 * ((num_bytes + 2) // 3)
+
+
+def _write_base64(content, target_path):
+    """
+    Decodes the base64 content into target_path a chunk at a time, so that the decoded payload
+    is never held in memory next to the encoded one.
+    """
+    with open(target_path, 'wb') as f:
+        for start in range(0, len(content), DECODE_CHUNK_CHARS):
+            f.write(b64decode(content[start:start + DECODE_CHUNK_CHARS]))
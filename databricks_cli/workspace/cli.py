@@ -152,22 +152,35 @@ def delete_cli(api_client, workspace_path, recursive):
 @click.argument('source_path')
 @click.argument('target_path')
 @click.option('--overwrite', '-o', is_flag=True, default=False)
+@click.option('--parallelism', default=1, type=click.IntRange(min=1),
+              help='Number of directories to list and notebooks to export concurrently. '
+                   'Set to 1 by default.')
+@click.option('--bulk', is_flag=True, default=False,
+              help='Export the directory as a single DBC archive and unpack it locally.')
 @debug_option
 @profile_option
 @eat_exceptions
 @provide_api_client
-def export_dir_cli(api_client, source_path, target_path, overwrite):
+def export_dir_cli(api_client, source_path, target_path, overwrite, parallelism, bulk):
     """
     Recursively exports a directory from the Databricks workspace.
 
     Only directories and notebooks are exported. Notebooks are always exported in the SOURCE
     format. Notebooks will also have the extension of .scala, .py, .sql, or .r appended
     depending on the language type.
+
+    With --parallelism N, up to N directories and notebooks are processed concurrently, and a
+    summary is printed at the end instead of a line per notebook.
+
+    With --bulk, the directory is exported in a single request, as a DBC archive that is
+    unpacked into the same layout. Subdirectories too large for one archive are exported
+    separately.
     """
     workspace_api = WorkspaceApi(api_client)
     assert workspace_api.get_status(source_path).is_dir, 'The source path must be a directory. {}' \
         .format(source_path)
-    workspace_api.export_workspace_dir(source_path, target_path, overwrite)
+    workspace_api.export_workspace_dir(source_path, target_path, overwrite,
+                                       parallelism=parallelism, bulk=bulk)
 
 
 @click.command(context_settings=CONTEXT_SETTINGS,
@@ -176,19 +189,62 @@ def export_dir_cli(api_client, source_path, target_path, overwrite):
 @click.argument('target_path')
 @click.option('--overwrite', '-o', is_flag=True, default=False)
 @click.option('--exclude-hidden-files', '-e', is_flag=True, default=False)
+@click.option('--parallelism', default=1, type=click.IntRange(min=1),
+              help='Number of files to import concurrently. Set to 1 by default.')
+@click.option('--bulk', is_flag=True, default=False,
+              help='Import the notebooks as a single DBC archive.')
 @debug_option
 @profile_option
 @eat_exceptions
 @provide_api_client
-def import_dir_cli(api_client, source_path, target_path, overwrite, exclude_hidden_files):
+def import_dir_cli(api_client, source_path, target_path, overwrite, exclude_hidden_files,
+                   parallelism, bulk):
     """
     Recursively imports a directory from local to the Databricks workspace.
 
     Only directories and files with the extensions .scala, .py, .sql, .r, .R, .ipynb are imported.
     When imported, these extensions will be stripped off the name of the notebook.
+
+    With --parallelism N, the directories are created first and then up to N files are imported
+    concurrently. Imports that fail do not stop the others and are summarized at the end.
+
+    With --bulk, the .scala, .py, .sql and .r notebooks are packed into a DBC archive that is
+    imported in a single request. Directories that already exist in the workspace, or that are
+    too large for one archive, have their files imported separately.
     """
     WorkspaceApi(api_client).import_workspace_dir(source_path, target_path, overwrite,
-                                                  exclude_hidden_files)
+                                                  exclude_hidden_files, parallelism=parallelism,
+                                                  bulk=bulk)
+
+
+@click.command(context_settings=CONTEXT_SETTINGS,
+               short_help='Imports the changes of a local directory to the workspace.')
+@click.argument('source_path')
+@click.argument('target_path')
+@click.option('--delete', is_flag=True, default=False,
+              help='Delete notebooks and directories of the target that are missing locally.')
+@click.option('--dry-run', is_flag=True, default=False,
+              help='Print what would be imported and deleted without changing anything.')
+@click.option('--exclude-hidden-files', '-e', is_flag=True, default=False)
+@click.option('--parallelism', default=1, type=click.IntRange(min=1),
+              help='Number of files to import concurrently. Set to 1 by default.')
+@debug_option
+@profile_option
+@eat_exceptions
+@provide_api_client
+def sync_cli(api_client, source_path, target_path, delete, dry_run, exclude_hidden_files,
+             parallelism):
+    """
+    Imports the files of a local directory that changed since the last sync to the workspace.
+
+    Files are imported like with import_dir. A file is imported again only if its content
+    changed since it was last synced to this target, or if it is missing from the workspace.
+    The content hashes are kept in a .databricks-workspace-sync.json manifest at the root of
+    SOURCE_PATH.
+    """
+    WorkspaceApi(api_client).sync(source_path, target_path, delete=delete, dry_run=dry_run,
+                                  exclude_hidden_files=exclude_hidden_files,
+                                  parallelism=parallelism)
 
 
 @click.group(context_settings=CONTEXT_SETTINGS,
@@ -214,3 +270,4 @@ workspace_group.add_command(delete_cli, name='delete')
 workspace_group.add_command(delete_cli, name='rm')
 workspace_group.add_command(export_dir_cli, name='export_dir')
 workspace_group.add_command(import_dir_cli, name='import_dir')
+workspace_group.add_command(sync_cli, name='sync')
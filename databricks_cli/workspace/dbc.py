@@ -0,0 +1,215 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Conversion between DBC archives and directories of notebooks in the SOURCE format.
+
+A DBC archive is a zip file holding one JSON document per notebook, with the notebook's cells
+under ``commands``. In the SOURCE format, cells are separated by ``COMMAND ----------`` comments
+and cells in another language than the notebook's are prefixed with ``MAGIC`` comments.
+"""
+
+import io
+import json
+import os
+import posixpath
+import uuid
+import zipfile
+
+from databricks_cli.workspace.types import WorkspaceLanguage
+
+NOTEBOOK_V1 = 'NotebookV1'
+COMMAND_V1 = 'CommandV1'
+
+# Extension of the notebooks in DBC archives, and the language they are in.
+DBC_EXTENSIONS = {
+    '.python': WorkspaceLanguage.PYTHON,
+    '.scala': WorkspaceLanguage.SCALA,
+    '.sql': WorkspaceLanguage.SQL,
+    '.r': WorkspaceLanguage.R,
+}
+COMMENT_PREFIXES = {
+    WorkspaceLanguage.PYTHON: '#',
+    WorkspaceLanguage.SCALA: '//',
+    WorkspaceLanguage.SQL: '--',
+    WorkspaceLanguage.R: '#',
+}
+
+
+def _header(language):
+    return '{} Databricks notebook source'.format(COMMENT_PREFIXES[language])
+
+
+def _separator(language):
+    return '{} COMMAND ----------'.format(COMMENT_PREFIXES[language])
+
+
+def _magic_prefix(language):
+    return '{} MAGIC'.format(COMMENT_PREFIXES[language])
+
+
+def _title_prefix(language):
+    return '{} DBTITLE '.format(COMMENT_PREFIXES[language])
+
+
+def notebook_to_source(notebook):
+    """Renders the notebook JSON document of a DBC archive in the SOURCE format."""
+    language = notebook['language'].upper()
+    cells = []
+    for command in sorted(notebook.get('commands', []), key=lambda c: c.get('position', 0)):
+        text = command.get('command', '')
+        if text.startswith('%'):
+            magic = _magic_prefix(language)
+            text = '\n'.join(magic + (' ' + line if line else '') for line in text.split('\n'))
+        if command.get('commandTitle'):
+            # Cell titles come first, as "DBTITLE <shown>,<title>".
+            text = '{}{},{}\n{}'.format(_title_prefix(language),
+                                        int(bool(command.get('showCommandTitle', True))),
+                                        command['commandTitle'], text)
+        cells.append(text)
+    separator = '\n\n{}\n\n'.format(_separator(language))
+    return _header(language) + '\n' + separator.join(cells) + '\n'
+
+
+def source_to_notebook(name, language, source):
+    """Parses a notebook in the SOURCE format into the JSON document of a DBC archive."""
+    lines = source.split('\n')
+    if lines and lines[0].strip() == _header(language):
+        lines = lines[1:]
+    cells, cell = [], []
+    for line in lines:
+        if line.strip() == _separator(language):
+            cells.append(cell)
+            cell = []
+        else:
+            cell.append(line)
+    cells.append(cell)
+    magic = _magic_prefix(language)
+    commands = []
+    for position, cell in enumerate(cells):
+        text = '\n'.join(cell).strip('\n')
+        cell_lines = text.split('\n')
+        title = None
+        if cell_lines[0].startswith(_title_prefix(language)) and ',' in cell_lines[0]:
+            title = cell_lines[0][len(_title_prefix(language)):].split(',', 1)
+            cell_lines = cell_lines[1:]
+            text = '\n'.join(cell_lines)
+        if all(line == magic or line.startswith(magic + ' ') for line in cell_lines):
+            text = '\n'.join(line[len(magic) + 1:] for line in cell_lines)
+        command = {
+            'version': COMMAND_V1,
+            'origId': 0,
+            'guid': str(uuid.uuid4()),
+            'subtype': 'command',
+            'commandType': 'auto',
+            'position': float(position + 1),
+            'command': text,
+        }
+        if title is not None:
+            command['showCommandTitle'] = title[0].strip() != '0'
+            command['commandTitle'] = title[1]
+        commands.append(command)
+    return {
+        'version': NOTEBOOK_V1,
+        'origId': 0,
+        'name': name,
+        'language': language.lower(),
+        'commands': commands,
+        'dashboards': [],
+        'guid': str(uuid.uuid4()),
+        'globalVars': {},
+        'iPythonMetadata': None,
+        'inputWidgets': {},
+    }
+
+
+def _target_path(target_dir, parts):
+    """
+    Joins the parts of an archive entry name to target_dir, rejecting the names that would land
+    outside of it.
+    """
+    unsafe = ('', os.curdir, os.pardir)
+    if any(part in unsafe or os.sep in part or (os.altsep and os.altsep in part) or
+           os.path.splitdrive(part)[0] for part in parts):
+        raise ValueError('Invalid path in DBC archive: {}'.format('/'.join(parts)))
+    target_path = os.path.join(target_dir, *parts)
+    root = os.path.abspath(target_dir)
+    if os.path.commonpath([root, os.path.abspath(target_path)]) != root:
+        raise ValueError('Invalid path in DBC archive: {}'.format('/'.join(parts)))
+    return target_path
+
+
+def unpack_archive(content, target_dir, overwrite):
+    """
+    Writes the notebooks of the DBC archive content below target_dir in the SOURCE format. The
+    top-level directory of the archive maps to target_dir itself. Existing files are only
+    replaced with ``overwrite``.
+
+    :return: ([str], [str]) the local paths that were written, and those skipped as they exist.
+    """
+    written, skipped = [], []
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        for entry in archive.namelist():
+            stem, ext = posixpath.splitext(entry)
+            if ext not in DBC_EXTENSIONS or entry.endswith('/'):
+                continue
+            notebook = json.loads(archive.read(entry).decode('utf-8'))
+            language = notebook.get('language', '').upper() or DBC_EXTENSIONS[ext]
+            notebook['language'] = language
+            parts = stem.split('/')[1:]
+            if not parts:
+                continue
+            target_path = _target_path(target_dir, parts) + \
+                WorkspaceLanguage.to_extension(language)
+            if os.path.exists(target_path) and not overwrite:
+                skipped.append(target_path)
+                continue
+            target_parent = os.path.dirname(target_path)
+            if not os.path.isdir(target_parent):
+                os.makedirs(target_parent)
+            with open(target_path, 'w', encoding='utf-8') as f:
+                f.write(notebook_to_source(notebook))
+            written.append(target_path)
+    return written, skipped
+
+
+def pack_directory(source_dir, root_name, sources):
+    """
+    Builds a DBC archive of the SOURCE notebooks at the given local paths below source_dir,
+    placed under a top-level directory named root_name.
+
+    :return: bytes the archive.
+    """
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for path in sources:
+            language, _ = WorkspaceLanguage.to_language_and_format(path)
+            relpath = os.path.relpath(path, source_dir)
+            stem = os.path.splitext(relpath)[0]
+            name = os.path.basename(stem)
+            with open(path, 'r', encoding='utf-8') as f:
+                notebook = source_to_notebook(name, language, f.read())
+            dbc_ext = [k for k, v in DBC_EXTENSIONS.items() if v == language][0]
+            entry = '/'.join([root_name] + stem.split(os.sep)) + dbc_ext
+            archive.writestr(entry, json.dumps(notebook))
+    return buf.getvalue()
@@ -0,0 +1,86 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Change detection for ``databricks workspace sync``.
+"""
+
+import json
+from hashlib import sha256
+
+from databricks_cli.utils import write_json_atomically
+
+MANIFEST_VERSION = 1
+# The manifest is kept at the root of the synced directory, so that it travels with the source.
+MANIFEST_FILE_NAME = '.databricks-workspace-sync.json'
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def hash_file(path):
+    """Returns the hex SHA-256 digest of the content of the file at path."""
+    digest = sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class WorkspaceSyncManifest(object):
+    """
+    Remembers the content hash of every notebook as of its last successful import, for each
+    workspace and target path the directory was synced to.
+    """
+    def __init__(self, path, target, targets=None):
+        self.path = path
+        self.target = target
+        self.targets = targets or {}
+        self.entries = self.targets.setdefault(target, {})
+
+    @classmethod
+    def load(cls, path, target):
+        """
+        Loads the entries for target from the manifest at path. A missing or unreadable manifest
+        yields an empty one, which makes the next sync import every notebook.
+        """
+        try:
+            with open(path, 'r') as f:
+                content = json.load(f)
+            if content.get('version') == MANIFEST_VERSION:
+                return cls(path, target, content['targets'])
+        except (IOError, OSError, ValueError, KeyError, AttributeError):
+            pass
+        return cls(path, target)
+
+    def is_unchanged(self, relpath, content_hash):
+        return self.entries.get(relpath) == content_hash
+
+    def record(self, relpath, content_hash):
+        self.entries[relpath] = content_hash
+
+    def retain(self, relpaths):
+        for relpath in [k for k in self.entries if k not in relpaths]:
+            del self.entries[relpath]
+
+    def save(self):
+        write_json_atomically(self.path, {'version': MANIFEST_VERSION, 'targets': self.targets},
+                              indent=2, sort_keys=True)
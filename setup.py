@@ -45,6 +45,10 @@ setup(
         'six>=1.10.0',
         'urllib3>=1.26.7,<3'
     ],
+    extras_require={
+        # Transport of databricks_cli.sdk.async_api_client.AsyncApiClient.
+        'async': ['aiohttp>=3.7'],
+    },
     entry_points='''
         [console_scripts]
         databricks=databricks_cli.cli:main
@@ -24,6 +24,7 @@
 # pylint:disable=protected-access
 import json
 import mock
+import pytest
 import click
 from click.testing import CliRunner
 
@@ -147,3 +148,21 @@ def test_command_headers():
             default_headers = json.loads(result.output)
             assert 'user-agent' in default_headers
             assert "command-subcommand-1234" in default_headers['user-agent']
+
+
+def test_get_api_client_pool_settings():
+    databricks_config = DatabricksConfig.from_token('https://test-host', 'token')
+    databricks_config.pool_maxsize = '64'
+    databricks_config.pool_block = 'True'
+    api_client = config._get_api_client(databricks_config)
+    adapter = api_client.session.get_adapter('https://test-host')
+    assert adapter._pool_maxsize == 64
+    assert adapter._pool_block
+
+
+@pytest.mark.parametrize('value', ['many', '0', '-1', '1.5'])
+def test_get_api_client_invalid_pool_settings(value):
+    databricks_config = DatabricksConfig.from_token('https://test-host', 'token')
+    databricks_config.pool_connections = value
+    with pytest.raises(InvalidConfigurationError, match='pool_connections'):
+        config._get_api_client(databricks_config)
@@ -128,6 +128,28 @@ def test_get_config_if_password_environment_set():
         assert config.password == TEST_PASSWORD
 
 
+
+def test_get_config_pool_settings_from_environment():
+    with patch.dict('os.environ', {'DATABRICKS_HOST': TEST_HOST,
+                                   'DATABRICKS_TOKEN': TEST_TOKEN,
+                                   'DATABRICKS_POOL_MAXSIZE': '64',
+                                   'DATABRICKS_POOL_BLOCK': 'true'}):
+        config = get_config()
+        assert config.pool_maxsize == '64'
+        assert config.pool_block == 'true'
+        assert config.pool_connections is None
+
+
+def test_update_and_persist_config_keeps_pool_settings():
+    config = DatabricksConfig.from_token(TEST_HOST, TEST_TOKEN)
+    config.pool_maxsize = '64'
+    update_and_persist_config(TEST_PROFILE, config)
+
+    # Reconfiguring the profile doesn't drop the hand-edited pool settings.
+    update_and_persist_config(TEST_PROFILE, DatabricksConfig.from_token(TEST_HOST, TEST_TOKEN))
+    config = ProfileConfigProvider(TEST_PROFILE).get_config()
+    assert config.pool_maxsize == '64'
+
 def test_get_config_uses_default_profile():
     config = DatabricksConfig.from_token("hosty", "hello")
     update_and_persist_config(DEFAULT_SECTION, config)
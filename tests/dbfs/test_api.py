@@ -33,6 +33,7 @@ import pytest
 import databricks_cli.dbfs.api as api
 from databricks_cli.dbfs.dbfs_path import DbfsPath
 from databricks_cli.dbfs.exceptions import LocalFileExistsException
+from databricks_cli.dbfs.transfer import ChunkedDownloader, StreamingRelay
 
 TEST_DBFS_PATH = DbfsPath('dbfs:/test')
 DUMMY_TIME = 1613158406000
@@ -219,3 +220,208 @@ class TestDbfsApi(object):
         # Should raise api.ParseException
         with pytest.raises(api.ParseException):
             api.DbfsApi.get_num_files_deleted(e_partial_delete)
+
+    def test_cp_recursive_to_dbfs_parallel(self, dbfs_api, tmpdir):
+        src = tmpdir.mkdir('src')
+        src.join('a').write('a')
+        src.mkdir('sub').mkdir('leaf').join('b').write('b')
+        src.mkdir('empty')
+        dbfs_api.cp(True, False, src.strpath, 'dbfs:/dst', parallelism=4)
+
+        mkdirs = sorted(c[0][0] for c in dbfs_api.client.mkdirs.call_args_list)
+        assert mkdirs == ['dbfs:/dst', 'dbfs:/dst/empty', 'dbfs:/dst/sub/leaf']
+        puts = sorted((c[0][0], c[1]['src_path']) for c in dbfs_api.client.put.call_args_list)
+        assert puts == [('dbfs:/dst/a', os.path.join(src.strpath, 'a')),
+                        ('dbfs:/dst/sub/leaf/b', os.path.join(src.strpath, 'sub', 'leaf', 'b'))]
+
+    def test_cp_recursive_to_dbfs_parallel_summarizes_failures(self, dbfs_api, tmpdir):
+        src = tmpdir.mkdir('src')
+        for name in ['a', 'b', 'c']:
+            src.join(name).write(name)
+
+        def put(path, **kwargs):  # NOQA
+            if path == 'dbfs:/dst/b':
+                raise get_resource_does_not_exist_exception()
+        dbfs_api.client.put.side_effect = put
+        with pytest.raises(RuntimeError, match='1 files failed'):
+            dbfs_api.cp(True, False, src.strpath, 'dbfs:/dst', parallelism=2)
+        assert dbfs_api.client.put.call_count == 3
+
+    def test_cp_recursive_from_dbfs_parallel(self, dbfs_api, tmpdir):
+        listings = {
+            'dbfs:/src': [{'path': '/src/a', 'is_dir': False, 'file_size': 1},
+                          {'path': '/src/sub', 'is_dir': True, 'file_size': 0}],
+            'dbfs:/src/sub': [{'path': '/src/sub/b', 'is_dir': False, 'file_size': 1}],
+        }
+        dbfs_api.client.list.side_effect = \
+            lambda path, headers=None: {'files': listings[path]}
+        dbfs_api.client.get_status.side_effect = lambda path, headers=None: {
+            'path': path[len('dbfs:'):], 'is_dir': path == 'dbfs:/src', 'file_size': 1}
+        dbfs_api.client.read.side_effect = lambda path, offset, length, headers=None: {
+            'bytes_read': 1, 'data': b64encode(path[-1].encode())}
+
+        dst = os.path.join(tmpdir.strpath, 'dst')
+        with mock.patch('databricks_cli.dbfs.api.ChunkedDownloader',
+                        wraps=ChunkedDownloader) as downloader_mock:
+            dbfs_api.cp(True, False, 'dbfs:/src', dst, parallelism=4)
+        # Files are spread over the pool, so each one is downloaded without further threads.
+        assert [ca[0][2] for ca in downloader_mock.call_args_list] == [1, 1]
+
+        with open(os.path.join(dst, 'a')) as f:
+            assert f.read() == 'a'
+        with open(os.path.join(dst, 'sub', 'b')) as f:
+            assert f.read() == 'b'
+
+    def test_cp_within_dbfs(self, dbfs_api):
+        def get_status(path, headers=None):  # NOQA
+            if path == 'dbfs:/dst':
+                return {'path': '/dst', 'is_dir': True, 'file_size': 0}
+            return {'path': '/src/a', 'is_dir': False, 'file_size': 1}
+        dbfs_api.client.get_status.side_effect = get_status
+        dbfs_api.client.read.return_value = {'bytes_read': 1, 'data': 'YQ=='}
+        dbfs_api.client.create.return_value = {'handle': 1}
+        dbfs_api.cp(False, False, 'dbfs:/src/a', 'dbfs:/dst')
+
+        dbfs_api.client.create.assert_called_once_with('dbfs:/dst/a', False, headers=None)
+        dbfs_api.client.add_block.assert_called_once_with(1, 'YQ==', headers=None)
+
+    def test_cp_within_dbfs_recursive(self, dbfs_api):
+        listings = {
+            'dbfs:/src': [{'path': '/src/a', 'is_dir': False, 'file_size': 1},
+                          {'path': '/src/sub', 'is_dir': True, 'file_size': 0}],
+            'dbfs:/src/sub': [{'path': '/src/sub/b', 'is_dir': False, 'file_size': 0}],
+        }
+        dbfs_api.client.get_status.return_value = {'path': '/src', 'is_dir': True,
+                                                   'file_size': 0}
+        dbfs_api.client.list.side_effect = \
+            lambda path, headers=None: {'files': listings[path]}
+        dbfs_api.client.read.return_value = {'bytes_read': 1, 'data': 'YQ=='}
+        dbfs_api.client.create.return_value = {'handle': 1}
+        with mock.patch('databricks_cli.dbfs.api.StreamingRelay',
+                        wraps=StreamingRelay) as relay_mock:
+            dbfs_api.cp(True, False, 'dbfs:/src', 'dbfs:/dst', parallelism=2)
+        assert [ca[0][2] for ca in relay_mock.call_args_list] == [1, 1]
+
+        mkdirs = sorted(c[0][0] for c in dbfs_api.client.mkdirs.call_args_list)
+        assert mkdirs == ['dbfs:/dst', 'dbfs:/dst/sub']
+        created = sorted(c[0][0] for c in dbfs_api.client.create.call_args_list)
+        assert created == ['dbfs:/dst/a', 'dbfs:/dst/sub/b']
+        assert dbfs_api.client.read.call_count == 1
+        assert dbfs_api.client.close.call_count == 2
+
+
+class TestDbfsApiSync(object):
+    @staticmethod
+    def set_remote_tree(dbfs_api, listings):
+        def get_status(path, headers=None):  # NOQA
+            if path not in listings:
+                raise get_resource_does_not_exist_exception()
+            return {'path': path[len('dbfs:'):], 'is_dir': True, 'file_size': 0}
+        dbfs_api.client.get_status.side_effect = get_status
+        dbfs_api.client.list.side_effect = \
+            lambda path, headers=None: {'files': listings[path]}
+
+    @staticmethod
+    def uploaded_paths(dbfs_api):
+        return sorted(c[0][0] for c in dbfs_api.client.put.call_args_list)
+
+    def test_sync_to_missing_destination(self, dbfs_api, tmpdir):
+        src = tmpdir.mkdir('src')
+        src.join('a').write('a')
+        src.mkdir('sub').join('b').write('b')
+        self.set_remote_tree(dbfs_api, {})
+        dbfs_api.sync(src.strpath, DbfsPath('dbfs:/dst'))
+        assert self.uploaded_paths(dbfs_api) == ['dbfs:/dst/a', 'dbfs:/dst/sub/b']
+
+    def test_sync_skips_unchanged_and_deletes_extra(self, dbfs_api, tmpdir):
+        src = tmpdir.mkdir('src')
+        src.join('same').write('s')
+        src.join('changed').write('cc')
+        src.join('new').write('n')
+        mtime = int(os.path.getmtime(src.join('same').strpath) * 1000)
+        self.set_remote_tree(dbfs_api, {
+            'dbfs:/dst': [
+                {'path': '/dst/same', 'is_dir': False, 'file_size': 1,
+                 'modification_time': mtime + 1},
+                {'path': '/dst/changed', 'is_dir': False, 'file_size': 1,
+                 'modification_time': mtime + 1},
+                {'path': '/dst/extra', 'is_dir': False, 'file_size': 1},
+                {'path': '/dst/old', 'is_dir': True, 'file_size': 0},
+            ],
+            'dbfs:/dst/old': [{'path': '/dst/old/x', 'is_dir': False, 'file_size': 1}],
+        })
+        dbfs_api.sync(src.strpath, DbfsPath('dbfs:/dst'), delete=True, parallelism=2)
+
+        assert self.uploaded_paths(dbfs_api) == ['dbfs:/dst/changed', 'dbfs:/dst/new']
+        dbfs_api.client.delete.assert_any_call('dbfs:/dst/extra', recursive=False, headers=None)
+        dbfs_api.client.delete.assert_any_call('dbfs:/dst/old', recursive=True, headers=None)
+        assert dbfs_api.client.delete.call_count == 2
+
+    def test_sync_dry_run(self, dbfs_api, tmpdir):
+        src = tmpdir.mkdir('src')
+        src.join('a').write('a')
+        self.set_remote_tree(dbfs_api, {
+            'dbfs:/dst': [{'path': '/dst/extra', 'is_dir': False, 'file_size': 1}]})
+        dbfs_api.sync(src.strpath, DbfsPath('dbfs:/dst'), delete=True, dry_run=True)
+        assert dbfs_api.client.put.call_count == 0
+        assert dbfs_api.client.delete.call_count == 0
+        assert dbfs_api.client.mkdirs.call_count == 0
+
+    def test_sync_with_manifest_skips_listing(self, dbfs_api, tmpdir):
+        src = tmpdir.mkdir('src')
+        src.join('a').write('a')
+        manifest_path = os.path.join(tmpdir.strpath, 'manifest.json')
+        self.set_remote_tree(dbfs_api, {'dbfs:/dst': []})
+        dbfs_api.sync(src.strpath, DbfsPath('dbfs:/dst'), manifest_path=manifest_path)
+        assert self.uploaded_paths(dbfs_api) == ['dbfs:/dst/a']
+        assert dbfs_api.client.list.call_count == 1
+
+        src.join('b').write('b')
+        dbfs_api.client.reset_mock()
+        dbfs_api.sync(src.strpath, DbfsPath('dbfs:/dst'), manifest_path=manifest_path)
+        assert self.uploaded_paths(dbfs_api) == ['dbfs:/dst/b']
+        assert dbfs_api.client.list.call_count == 0
+        assert dbfs_api.client.get_status.call_count == 0
+
+
+class TestDbfsApiCat(object):
+    CONTENTS = b'line1\nline2\nline3\n'
+
+    @pytest.fixture(autouse=True)
+    def remote_file(self, dbfs_api):
+        dbfs_api.client.get_status.return_value = {
+            'path': '/test', 'is_dir': False, 'file_size': len(self.CONTENTS)}
+
+        def read(path, offset, length, headers=None):  # NOQA
+            data = self.CONTENTS[offset:offset + length]
+            return {'bytes_read': len(data), 'data': b64encode(data)}
+        dbfs_api.client.read.side_effect = read
+
+    @staticmethod
+    def cat(dbfs_api, **kwargs):
+        with mock.patch('databricks_cli.dbfs.api.BUFFER_SIZE_BYTES', 4), \
+                mock.patch('databricks_cli.dbfs.api.click') as click_mock:
+            dbfs_api.cat('dbfs:/test', **kwargs)
+            return ''.join(c[0][0] for c in click_mock.echo.call_args_list)
+
+    def test_cat_streams_chunks(self, dbfs_api):
+        assert self.cat(dbfs_api) == self.CONTENTS.decode()
+        assert dbfs_api.client.read.call_count == 5
+
+    def test_cat_offset_and_length(self, dbfs_api):
+        assert self.cat(dbfs_api, offset=6, length=5) == 'line2'
+        assert self.cat(dbfs_api, offset=12) == 'line3\n'
+
+    @pytest.mark.parametrize('lines, expected', [
+        (0, ''), (1, 'line3\n'), (2, 'line2\nline3\n'), (5, 'line1\nline2\nline3\n')])
+    def test_cat_tail(self, dbfs_api, lines, expected):
+        assert self.cat(dbfs_api, tail_lines=lines) == expected
+
+    def test_cat_tail_reads_only_the_end(self, dbfs_api):
+        self.cat(dbfs_api, tail_lines=1)
+        assert all(c[0][1] >= 8 for c in dbfs_api.client.read.call_args_list)
+
+    def test_cat_multibyte_across_chunks(self, dbfs_api):
+        self.CONTENTS = u'abécd'.encode('utf-8')
+        dbfs_api.client.get_status.return_value['file_size'] = len(self.CONTENTS)
+        assert self.cat(dbfs_api) == u'abécd'
@@ -0,0 +1,74 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from databricks_cli.dbfs.api import FileInfo
+from databricks_cli.dbfs.dbfs_path import DbfsPath
+from databricks_cli.dbfs import sync
+
+
+def test_walk_local_tree(tmpdir):
+    tmpdir.join('a').write('aa')
+    tmpdir.mkdir('sub').mkdir('leaf').join('b').write('b')
+    files, directories = sync.walk_local_tree(tmpdir.strpath)
+    assert sorted(files) == ['a', 'sub/leaf/b']
+    assert files['a'].size == 2
+    assert files['a'].path == os.path.join(tmpdir.strpath, 'a')
+    assert directories == {'sub', 'sub/leaf'}
+
+
+def test_is_newer_than():
+    state = sync.LocalFileState('a', 10, 2000)
+    assert not state.is_newer_than(FileInfo(DbfsPath('dbfs:/a'), False, 10, 3000))
+    assert state.is_newer_than(FileInfo(DbfsPath('dbfs:/a'), False, 10, 1000))
+    assert state.is_newer_than(FileInfo(DbfsPath('dbfs:/a'), False, 11, 3000))
+    assert not state.is_newer_than(FileInfo(DbfsPath('dbfs:/a'), False, 10, None))
+
+
+def test_manifest_round_trip(tmpdir):
+    path = os.path.join(tmpdir.strpath, 'cache', 'manifest.json')
+    manifest = sync.SyncManifest.load(path)
+    assert manifest.entries == {}
+    manifest.record('a', sync.LocalFileState('a', 1, 1000))
+    manifest.record('b', sync.LocalFileState('b', 2, 2000))
+    manifest.retain({'a'})
+    manifest.save()
+    assert os.listdir(os.path.dirname(path)) == ['manifest.json']
+
+    loaded = sync.SyncManifest.load(path)
+    assert loaded.is_unchanged('a', sync.LocalFileState('a', 1, 1000))
+    assert not loaded.is_unchanged('a', sync.LocalFileState('a', 1, 1001))
+    assert not loaded.is_unchanged('b', sync.LocalFileState('b', 2, 2000))
+
+
+def test_manifest_load_corrupt(tmpdir):
+    path = tmpdir.join('manifest.json')
+    path.write('not json')
+    assert sync.SyncManifest.load(path.strpath).entries == {}
+
+
+def test_default_manifest_path_is_per_destination():
+    first = sync.default_manifest_path('https://host/api/', 'src', DbfsPath('dbfs:/a'))
+    second = sync.default_manifest_path('https://host/api/', 'src', DbfsPath('dbfs:/b'))
+    assert first != second
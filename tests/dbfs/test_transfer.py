@@ -0,0 +1,249 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# pylint:disable=redefined-outer-name
+from base64 import b64encode
+
+import os
+import threading
+
+import mock
+import pytest
+import requests
+
+import databricks_cli.dbfs.transfer as transfer
+
+CHUNK_SIZE = 4
+CONTENTS = b'abcdefghijklmnopqrstuvw'
+
+
+def get_http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(response=response)
+
+
+def fake_read(path, offset, length, headers=None):  # NOQA
+    data = CONTENTS[offset:offset + length]
+    return {'bytes_read': len(data), 'data': b64encode(data)}
+
+
+@pytest.fixture()
+def dbfs_service():
+    service = mock.MagicMock()
+    service.read.side_effect = fake_read
+    return service
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay():
+    with mock.patch('databricks_cli.dbfs.transfer.time.sleep'):
+        yield
+
+
+class TestChunkedDownloader(object):
+    @pytest.mark.parametrize('parallelism', [1, 3, 16])
+    def test_download(self, dbfs_service, tmpdir, parallelism):
+        dst = os.path.join(tmpdir.strpath, 'dst')
+        downloader = transfer.ChunkedDownloader(dbfs_service, CHUNK_SIZE, parallelism)
+        downloader.download('/test', len(CONTENTS), dst)
+        with open(dst, 'rb') as f:
+            assert f.read() == CONTENTS
+        assert dbfs_service.read.call_count == 6
+
+    def test_download_overwrites_longer_file(self, dbfs_service, tmpdir):
+        dst = os.path.join(tmpdir.strpath, 'dst')
+        with open(dst, 'wb') as f:
+            f.write(b'x' * 100)
+        transfer.ChunkedDownloader(dbfs_service, CHUNK_SIZE).download('/test', len(CONTENTS), dst)
+        with open(dst, 'rb') as f:
+            assert f.read() == CONTENTS
+
+    def test_download_empty_file(self, dbfs_service, tmpdir):
+        dst = os.path.join(tmpdir.strpath, 'dst')
+        transfer.ChunkedDownloader(dbfs_service, CHUNK_SIZE).download('/test', 0, dst)
+        assert os.path.getsize(dst) == 0
+        assert dbfs_service.read.call_count == 0
+
+    def test_download_short_reads(self, dbfs_service, tmpdir):
+        def short_read(path, offset, length, headers=None):  # NOQA
+            return fake_read(path, offset, 1)
+        dbfs_service.read.side_effect = short_read
+        dst = os.path.join(tmpdir.strpath, 'dst')
+        transfer.ChunkedDownloader(dbfs_service, CHUNK_SIZE).download('/test', len(CONTENTS), dst)
+        with open(dst, 'rb') as f:
+            assert f.read() == CONTENTS
+
+    def test_download_retries_transient_errors(self, dbfs_service, tmpdir):
+        dbfs_service.read.side_effect = [get_http_error(503), fake_read('/test', 0, CHUNK_SIZE)]
+        dst = os.path.join(tmpdir.strpath, 'dst')
+        transfer.ChunkedDownloader(dbfs_service, CHUNK_SIZE).download('/test', CHUNK_SIZE, dst)
+        assert dbfs_service.read.call_count == 2
+        with open(dst, 'rb') as f:
+            assert f.read() == CONTENTS[:CHUNK_SIZE]
+
+    def test_download_does_not_retry_client_errors(self, dbfs_service, tmpdir):
+        dbfs_service.read.side_effect = get_http_error(404)
+        dst = os.path.join(tmpdir.strpath, 'dst')
+        with pytest.raises(requests.exceptions.HTTPError):
+            transfer.ChunkedDownloader(dbfs_service, CHUNK_SIZE, 4).download(
+                '/test', len(CONTENTS), dst)
+
+    def test_download_gives_up_after_max_attempts(self, dbfs_service, tmpdir):
+        dbfs_service.read.side_effect = requests.exceptions.ConnectionError()
+        dst = os.path.join(tmpdir.strpath, 'dst')
+        with pytest.raises(requests.exceptions.ConnectionError):
+            transfer.ChunkedDownloader(dbfs_service, CHUNK_SIZE).download('/test', CHUNK_SIZE, dst)
+        assert dbfs_service.read.call_count == transfer.MAX_CHUNK_ATTEMPTS
+
+    def test_download_reports_ordered_progress(self, dbfs_service, tmpdir):
+        progress = []
+        dst = os.path.join(tmpdir.strpath, 'dst')
+        downloader = transfer.ChunkedDownloader(dbfs_service, CHUNK_SIZE, 4)
+        downloader.download('/test', len(CONTENTS), dst,
+                            progress_callback=lambda done, total: progress.append(done))
+        assert progress == sorted(progress)
+        assert progress[-1] == len(CONTENTS)
+
+    @pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason='requires named pipes')
+    @pytest.mark.parametrize('parallelism', [1, 3])
+    def test_download_to_pipe(self, dbfs_service, tmpdir, parallelism):
+        dst = os.path.join(tmpdir.strpath, 'pipe')
+        os.mkfifo(dst)
+        received = []
+
+        def read_pipe():
+            with open(dst, 'rb') as f:
+                received.append(f.read())
+
+        reader = threading.Thread(target=read_pipe)
+        reader.start()
+        progress = []
+        downloader = transfer.ChunkedDownloader(dbfs_service, CHUNK_SIZE, parallelism)
+        downloader.download('/test', len(CONTENTS), dst,
+                            progress_callback=lambda done, total: progress.append(done))
+        reader.join()
+        # A pipe cannot be preallocated or written at offsets, so chunks are written in order.
+        assert received == [CONTENTS]
+        assert progress[-1] == len(CONTENTS)
+
+
+class TestOrderedProgress(object):
+    def test_complete_out_of_order(self):
+        callback = mock.Mock()
+        progress = transfer.OrderedProgress(12, callback)
+        progress.complete(4, 4)
+        assert callback.call_count == 0
+        progress.complete(8, 4)
+        assert callback.call_count == 0
+        progress.complete(0, 4)
+        callback.assert_called_once_with(12, 12)
+
+
+class TestPipelinedUploader(object):
+    def test_upload(self, dbfs_service, tmpdir):
+        src = os.path.join(tmpdir.strpath, 'src')
+        with open(src, 'wb') as f:
+            f.write(CONTENTS)
+        dbfs_service.create.return_value = {'handle': 7}
+        progress = []
+        uploader = transfer.PipelinedUploader(dbfs_service, CHUNK_SIZE, max_buffered_bytes=1)
+        stats = uploader.upload(src, '/test', True,
+                                progress_callback=lambda done, total: progress.append(done))
+
+        dbfs_service.create.assert_called_once_with('/test', True, headers=None)
+        blocks = [c[0][1] for c in dbfs_service.add_block.call_args_list]
+        assert blocks == [b64encode(CONTENTS[i:i + CHUNK_SIZE]).decode()
+                          for i in range(0, len(CONTENTS), CHUNK_SIZE)]
+        dbfs_service.close.assert_called_once_with(7, headers=None)
+        assert progress[-1] == len(CONTENTS)
+        assert stats.bytes_uploaded == len(CONTENTS)
+
+    def test_upload_add_block_failure(self, dbfs_service, tmpdir):
+        src = os.path.join(tmpdir.strpath, 'src')
+        with open(src, 'wb') as f:
+            f.write(CONTENTS)
+        dbfs_service.create.return_value = {'handle': 7}
+        dbfs_service.add_block.side_effect = get_http_error(400)
+        uploader = transfer.PipelinedUploader(dbfs_service, CHUNK_SIZE, max_buffered_bytes=1)
+        with pytest.raises(requests.exceptions.HTTPError):
+            uploader.upload(src, '/test', True)
+        assert dbfs_service.add_block.call_count == 1
+        assert dbfs_service.close.call_count == 0
+
+    def test_upload_read_failure(self, dbfs_service, tmpdir):
+        src = os.path.join(tmpdir.strpath, 'src')
+        with open(src, 'wb') as f:
+            f.write(CONTENTS)
+        dbfs_service.create.return_value = {'handle': 7}
+        uploader = transfer.PipelinedUploader(dbfs_service, CHUNK_SIZE)
+        with mock.patch('databricks_cli.dbfs.transfer.open', side_effect=IOError('boom'),
+                        create=True):
+            with pytest.raises(IOError):
+                uploader.upload(src, '/test', True)
+        assert dbfs_service.close.call_count == 0
+
+
+class TestUploadStats(object):
+    def test_bytes_per_second(self):
+        assert transfer.UploadStats(100, 4).bytes_per_second == 25
+        assert transfer.UploadStats(100, 0).bytes_per_second == 100
+
+
+class TestStreamingRelay(object):
+    @pytest.mark.parametrize('parallelism', [1, 3])
+    def test_relay(self, dbfs_service, parallelism):
+        dbfs_service.create.return_value = {'handle': 7}
+        relay = transfer.StreamingRelay(dbfs_service, CHUNK_SIZE, parallelism)
+        relay.relay('/src', len(CONTENTS), '/dst', False)
+
+        dbfs_service.create.assert_called_once_with('/dst', False, headers=None)
+        blocks = [c[0][1] for c in dbfs_service.add_block.call_args_list]
+        # The base64 payloads of the reads are forwarded untouched and in order.
+        assert blocks == [b64encode(CONTENTS[i:i + CHUNK_SIZE])
+                          for i in range(0, len(CONTENTS), CHUNK_SIZE)]
+        dbfs_service.close.assert_called_once_with(7, headers=None)
+
+    def test_relay_empty_file(self, dbfs_service):
+        dbfs_service.create.return_value = {'handle': 7}
+        transfer.StreamingRelay(dbfs_service, CHUNK_SIZE).relay('/src', 0, '/dst', False)
+        assert dbfs_service.add_block.call_count == 0
+        assert dbfs_service.close.call_count == 1
+
+    def test_relay_read_failure(self, dbfs_service):
+        dbfs_service.create.return_value = {'handle': 7}
+        dbfs_service.read.side_effect = get_http_error(404)
+        with pytest.raises(requests.exceptions.HTTPError):
+            transfer.StreamingRelay(dbfs_service, CHUNK_SIZE).relay(
+                '/src', len(CONTENTS), '/dst', False)
+        assert dbfs_service.close.call_count == 0
+
+    def test_relay_add_block_failure(self, dbfs_service):
+        dbfs_service.create.return_value = {'handle': 7}
+        dbfs_service.add_block.side_effect = get_http_error(500)
+        with pytest.raises(requests.exceptions.HTTPError):
+            transfer.StreamingRelay(dbfs_service, CHUNK_SIZE).relay(
+                '/src', len(CONTENTS), '/dst', False)
+        assert dbfs_service.add_block.call_count == 1
+        # Closing the handle would publish a truncated file at /dst.
+        assert dbfs_service.close.call_count == 0
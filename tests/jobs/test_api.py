@@ -23,10 +23,14 @@
 
 # pylint:disable=redefined-outer-name
 
+import os
+
 import mock
 import pytest
+from requests.exceptions import HTTPError
 
 from databricks_cli.jobs.api import JobsApi
+from databricks_cli.jobs.index import JobNameIndex
 from tests.utils import provide_conf
 
 
@@ -66,6 +70,41 @@ def test_list_jobs_by_name(jobs_api):
     assert res[1]['settings']['name'] == test_job_name
 
 
+def _paged_list_jobs(pages):
+    def list_jobs(offset=None, limit=None, **kwargs):  # noqa
+        return pages[offset or 0]
+    return mock.Mock(side_effect=list_jobs)
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_iter_jobs(jobs_api, prefetch):
+    jobs_api.list_jobs = _paged_list_jobs({
+        0: {'jobs': [{'job_id': 1}, {'job_id': 2}], 'has_more': True},
+        2: {'jobs': [{'job_id': 3}], 'has_more': True},
+        3: {'jobs': [{'job_id': 4}], 'has_more': False},
+    })
+    jobs = jobs_api.iter_jobs(page_size=5, name='a', version='2.1', prefetch=prefetch)
+    assert [job['job_id'] for job in jobs] == [1, 2, 3, 4]
+    calls = [(c[1]['offset'], c[1]['limit']) for c in jobs_api.list_jobs.call_args_list]
+    assert calls == [(None, None), (2, 5), (3, 5)]
+    assert all(c[1]['name'] == 'a' for c in jobs_api.list_jobs.call_args_list)
+
+
+def test_iter_jobs_stops_without_jobs(jobs_api):
+    jobs_api.list_jobs = _paged_list_jobs({0: {'jobs': [], 'has_more': True}})
+    assert not list(jobs_api.iter_jobs())
+    assert jobs_api.list_jobs.call_count == 1
+
+
+def test_list_jobs_by_name_pages(jobs_api):
+    test_job = {'settings': {'name': 'test job'}}
+    jobs_api.list_jobs = _paged_list_jobs({
+        0: {'jobs': [test_job], 'has_more': True},
+        1: {'jobs': [test_job], 'has_more': False},
+    })
+    assert jobs_api._list_jobs_by_name('test job') == [test_job, test_job]
+
+
 @provide_conf
 def test_delete_job():
     with mock.patch('databricks_cli.sdk.ApiClient') as api_client_mock:
@@ -153,3 +192,91 @@ def test_run_now():
             'POST', '/jobs/run-now', data={'job_id': '1', 'jar_params': ['bla']},
             headers=None, version='3.0'
         )
+
+
+@pytest.mark.parametrize('parallelism', [1, 4])
+def test_run_now_batch(jobs_api, parallelism):
+    jobs_api.run_now = mock.Mock(side_effect=lambda job_id, *args, **kwargs: {'run_id': job_id})
+    run_requests = [{'job_id': 1, 'params': {'python_params': ['a']}, 'idempotency_token': 't'},
+                    {'job_id': 2}]
+    results = list(jobs_api.run_now_batch(run_requests, parallelism=parallelism, version='2.1'))
+    assert sorted(result['run_id'] for _, result, _ in results) == [1, 2]
+    jobs_api.run_now.assert_any_call(1, None, None, ['a'], None, None, 't', headers=None,
+                                     version='2.1')
+    jobs_api.run_now.assert_any_call(2, None, None, None, None, None, None, headers=None,
+                                     version='2.1')
+
+
+@pytest.fixture()
+def indexed_jobs_api(tmpdir):
+    api_client = mock.MagicMock()
+    api_client.url = 'https://databricks.com'
+    api = JobsApi(api_client, use_name_index=True)
+    api.name_index_path = tmpdir.join('index.json').strpath
+    yield api
+
+
+def test_list_jobs_by_name_uses_index(indexed_jobs_api):
+    job = {'job_id': 1, 'created_time': 10, 'creator_user_name': 'user',
+           'settings': {'name': 'a'}}
+    indexed_jobs_api.list_jobs = _paged_list_jobs({0: {'jobs': [job], 'has_more': False}})
+    assert indexed_jobs_api._list_jobs_by_name('a') == [job]
+    assert indexed_jobs_api._list_jobs_by_name('a') == [job]
+    # Only the listing that builds the index is made, with no name filter.
+    assert indexed_jobs_api.list_jobs.call_count == 1
+    assert indexed_jobs_api.list_jobs.call_args[1]['name'] is None
+
+    # Names the index doesn't know are always looked up with a filtered listing, so that jobs
+    # created with them by other clients are found.
+    indexed_jobs_api.list_jobs = _paged_list_jobs({0: {'jobs': [], 'has_more': False}})
+    assert indexed_jobs_api._list_jobs_by_name('b') == []
+    assert indexed_jobs_api._list_jobs_by_name('b') == []
+    assert indexed_jobs_api.list_jobs.call_count == 2
+    assert indexed_jobs_api.list_jobs.call_args[1]['name'] == 'b'
+
+
+def test_list_jobs_by_name_reuses_saved_index(indexed_jobs_api):
+    job = {'job_id': 1, 'created_time': 10, 'settings': {'name': 'a'}}
+    indexed_jobs_api.list_jobs = _paged_list_jobs({0: {'jobs': [job], 'has_more': False}})
+    indexed_jobs_api._list_jobs_by_name('a')
+
+    api = JobsApi(indexed_jobs_api.client.client, use_name_index=True)
+    api.name_index_path = indexed_jobs_api.name_index_path
+    api.list_jobs = mock.Mock()
+    assert [job['job_id'] for job in api._list_jobs_by_name('a')] == [1]
+    assert api.list_jobs.call_count == 0
+
+
+def test_unwritable_index_does_not_fail_job_changes(indexed_jobs_api, tmpdir):
+    not_a_dir = tmpdir.join('file').strpath
+    open(not_a_dir, 'w').close()
+    indexed_jobs_api.name_index_path = os.path.join(not_a_dir, 'index.json')
+    job = {'job_id': 1, 'created_time': 10, 'settings': {'name': 'a'}}
+    indexed_jobs_api.list_jobs = _paged_list_jobs({0: {'jobs': [job], 'has_more': False}})
+    assert [j['job_id'] for j in indexed_jobs_api._list_jobs_by_name('a')] == [1]
+    indexed_jobs_api.create_job({'name': 'a'})
+    indexed_jobs_api.reset_job({'job_id': 1, 'new_settings': {'name': 'a'}})
+
+
+def test_failed_reset_invalidates_index(indexed_jobs_api):
+    job = {'job_id': 1, 'created_time': 10, 'settings': {'name': 'a'}}
+    indexed_jobs_api.list_jobs = _paged_list_jobs({0: {'jobs': [job], 'has_more': False}})
+    indexed_jobs_api._list_jobs_by_name('a')
+    indexed_jobs_api.client.client.perform_query.side_effect = HTTPError('job does not exist')
+    with pytest.raises(HTTPError):
+        indexed_jobs_api.reset_job({'job_id': 1, 'new_settings': {'name': 'a'}})
+    assert indexed_jobs_api._name_index.lookup('a') is None
+
+
+def test_job_changes_invalidate_index(indexed_jobs_api):
+    job = {'job_id': 1, 'created_time': 10, 'settings': {'name': 'a'}}
+    indexed_jobs_api.list_jobs = _paged_list_jobs({0: {'jobs': [job], 'has_more': False}})
+    indexed_jobs_api._list_jobs_by_name('a')
+
+    indexed_jobs_api.create_job({'name': 'a'})
+    indexed_jobs_api.reset_job({'job_id': 1, 'new_settings': {'name': 'b'}})
+    index = indexed_jobs_api._name_index
+    assert index.lookup('a') is None
+    assert index.lookup('b') is None
+    indexed_jobs_api.delete_job('1')
+    assert JobNameIndex.load(indexed_jobs_api.name_index_path).lookup('a') is None
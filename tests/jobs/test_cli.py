@@ -256,6 +256,50 @@ def test_run_now_with_params(jobs_api_mock):
         assert echo_mock.call_args[0][0] == pretty_format(RUN_NOW_RETURN)
 
 
+@provide_conf
+def test_run_now_batch(jobs_api_mock, tmpdir):
+    input_file = tmpdir.join('runs.jsonl').strpath
+    results_file = tmpdir.join('results.jsonl').strpath
+    with open(input_file, 'w') as f:
+        f.write('{"job_id": 1, "params": {"notebook_params": {"a": "b"}}}\n\n'
+                '{"job_id": 2, "idempotency_token": "t"}\n')
+
+    def run_now_batch(run_requests, parallelism, version):  # noqa
+        assert parallelism == 4
+        yield run_requests[1], None, RuntimeError('boom')
+        yield run_requests[0], {'run_id': 10}, None
+    jobs_api_mock.run_now_batch.side_effect = run_now_batch
+
+    result = CliRunner().invoke(cli.run_now_batch_cli, [
+        input_file, '--results-file', results_file, '--parallelism', '4', '--version', '2.1'])
+    assert result.exit_code == 1
+    assert '[2/2] Triggered job 1: run 10.' in result.output
+    assert '1 of 2 jobs failed to trigger.' in result.output
+    with open(results_file) as f:
+        results = [json.loads(line) for line in f]
+    assert results == [
+        {'line': 3, 'input': {'job_id': 2, 'idempotency_token': 't'},
+         'error': 'RuntimeError: boom'},
+        {'line': 1, 'input': {'job_id': 1, 'params': {'notebook_params': {'a': 'b'}}},
+         'run_id': 10},
+    ]
+
+
+@provide_conf
+def test_run_now_batch_invalid_input(jobs_api_mock, tmpdir):
+    input_file = tmpdir.join('runs.jsonl').strpath
+    for content, error in [('{"job_id": 1, "params": {"foo": 1}}', 'unknown params: foo'),
+                           ('{"params": {}}', 'has no job_id'),
+                           ('{', 'is not valid JSON')]:
+        with open(input_file, 'w') as f:
+            f.write(content)
+        result = CliRunner().invoke(cli.run_now_batch_cli, [
+            input_file, '--results-file', tmpdir.join('out').strpath, '--version', '2.1'])
+        assert result.exit_code == 1
+        assert error in result.output
+        assert not jobs_api_mock.run_now_batch.called
+
+
 @provide_conf
 def test_configure():
     runner = CliRunner()
@@ -284,8 +328,8 @@ LIST_RETURN_3 = {
 
 @provide_conf
 def test_list_all(jobs_api_mock):
-    jobs_api_mock.list_jobs.side_effect = iter(
-        [LIST_RETURN_1, LIST_RETURN_2, LIST_RETURN_3])
+    jobs_api_mock.iter_jobs.return_value = iter(
+        LIST_RETURN_3['jobs'] + LIST_RETURN_2['jobs'] + LIST_RETURN_1['jobs'])
     runner = CliRunner()
     result = runner.invoke(cli.list_cli, ['--version=2.1', '--all'])
     rows = [(1, 'a'), (2, 'b'), (3, 'c')]
@@ -294,6 +338,22 @@ def test_list_all(jobs_api_mock):
         tabulate(rows, tablefmt='plain', disable_numparse=True) + '\n'
 
 
+@provide_conf
+def test_list_all_output_json(jobs_api_mock):
+    jobs = LIST_RETURN_1['jobs'] + LIST_RETURN_2['jobs'] + LIST_RETURN_3['jobs']
+    jobs_api_mock.iter_jobs.return_value = iter(jobs)
+    runner = CliRunner()
+    result = runner.invoke(cli.list_cli, ['--version=2.1', '--all', '--output', 'json',
+                                          '--limit', '10'])
+    assert result.exit_code == 0
+    assert result.output == pretty_format({'jobs': jobs}) + '\n'
+    assert jobs_api_mock.iter_jobs.call_args[1]['page_size'] == 10
+
+    jobs_api_mock.iter_jobs.return_value = iter([])
+    result = runner.invoke(cli.list_cli, ['--version=2.1', '--all', '--output', 'json'])
+    assert result.output == pretty_format({'jobs': []}) + '\n'
+
+
 @provide_conf
 def test_list_expand_tasks(jobs_api_mock):
     jobs_api_mock.list_jobs.return_value = LIST_RETURN_1
@@ -0,0 +1,98 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import time
+
+from databricks_cli.jobs.index import JobNameIndex, default_index_path, INDEX_VERSION, \
+    MAX_INDEX_AGE_SECONDS
+
+
+def _job(job_id, name, created_time):
+    return {'job_id': job_id, 'created_time': created_time, 'creator_user_name': 'user',
+            'settings': {'name': name, 'tasks': []}}
+
+
+def test_default_index_path():
+    assert default_index_path('https://a') != default_index_path('https://b')
+    assert default_index_path('https://a').endswith('.json')
+
+
+def test_rebuild_and_lookup():
+    index = JobNameIndex('unused')
+    index.rebuild([_job(1, 'a', 10), _job(2, 'b', 30), _job(3, 'a', 20)])
+    assert [job['job_id'] for job in index.lookup('a')] == [1, 3]
+    assert index.lookup('a')[0] == {'job_id': 1, 'created_time': 10, 'creator_user_name': 'user',
+                                    'settings': {'name': 'a'}}
+    assert index.lookup('c') is None
+    assert not index.is_expired
+
+
+def test_record_does_not_cache_missing_names():
+    index = JobNameIndex('unused')
+    index.record('a', [_job(1, 'a', 10)])
+    assert [job['job_id'] for job in index.lookup('a')] == [1]
+    index.record('a', [])
+    assert index.lookup('a') is None
+
+
+def test_remove_and_forget():
+    index = JobNameIndex('unused')
+    index.rebuild([_job(1, 'a', 10), _job(2, 'a', 20)])
+    index.remove_job(1)
+    assert [job['job_id'] for job in index.lookup('a')] == [2]
+    index.remove_job(2)
+    assert index.lookup('a') is None
+    index.rebuild([_job(1, 'a', 10)])
+    index.forget('a')
+    assert index.lookup('a') is None
+
+
+def test_save_and_load(tmpdir):
+    path = tmpdir.join('index', 'host.json').strpath
+    index = JobNameIndex(path)
+    index.rebuild([_job(1, 'a', 10)])
+    index.save()
+    loaded = JobNameIndex.load(path)
+    assert loaded.lookup('a') == index.lookup('a')
+    assert not loaded.is_expired
+    assert os.listdir(os.path.dirname(path)) == ['host.json']
+
+
+def test_save_failure(tmpdir):
+    not_a_dir = tmpdir.join('file').strpath
+    open(not_a_dir, 'w').close()
+    assert not JobNameIndex(os.path.join(not_a_dir, 'host.json')).save()
+
+
+def test_load_expired_or_invalid(tmpdir):
+    path = tmpdir.join('host.json').strpath
+    assert JobNameIndex.load(path).is_expired
+    with open(path, 'w') as f:
+        f.write('not json')
+    assert JobNameIndex.load(path).lookup('a') is None
+    with open(path, 'w') as f:
+        json.dump({'version': INDEX_VERSION, 'jobs': {},
+                   'built_at': time.time() - MAX_INDEX_AGE_SECONDS - 1}, f)
+    assert JobNameIndex.load(path).is_expired
@@ -30,9 +30,14 @@ import os
 import copy
 import mock
 import pytest
+import requests_mock
+from requests.exceptions import HTTPError
 
 import databricks_cli.pipelines.api as api
 from databricks_cli.pipelines.api import LibraryObject
+from databricks_cli.dbfs.api import FileInfo
+from databricks_cli.dbfs.dbfs_path import DbfsPath
+from databricks_cli.sdk.api_client import ApiClient
 
 PIPELINE_ID = '123456'
 SPEC = {
@@ -57,17 +62,18 @@ def pipelines_api():
     yield _pipelines_api
 
 
-def file_exists_stub(_, dbfs_path):
-    exist_mapping = {
-        'dbfs:/pipelines/code/40bd001563085fc35165329ea1ff5c5ecbdbbeef.jar': True,  # sha1 of 123
-        'dbfs:/pipelines/code/51eac6b471a284d3341d8c0c63d0f1a286262a18.jar': False,  # sha1 of 456
-        'dbfs:/pipelines/code/51eac6b471a284d3341d8c0c63d0f1a286262a18/wheel-name-conv.whl':
-            False  # sha1 456
+def list_files_stub(_, dbfs_path):
+    listings = {
+        'dbfs:/pipelines/code': [
+            'dbfs:/pipelines/code/40bd001563085fc35165329ea1ff5c5ecbdbbeef.jar',  # sha1 of 123
+            'dbfs:/pipelines/code/0123456789abcdef0123456789abcdef01234567.jar',
+        ],
     }
-    return exist_mapping[dbfs_path.absolute_path]
+    return [FileInfo(DbfsPath(path, validate=False), False, 3, None)
+            for path in listings[dbfs_path.absolute_path]]
 
 
-@mock.patch('databricks_cli.dbfs.api.DbfsApi.file_exists', file_exists_stub)
+@mock.patch('databricks_cli.dbfs.api.DbfsApi.list_files', list_files_stub)
 @mock.patch('databricks_cli.dbfs.dbfs_path.DbfsPath.validate')
 @mock.patch('databricks_cli.dbfs.api.DbfsApi.put_file')
 def test_create_pipeline_and_upload_libraries(put_file_mock, dbfs_path_validate, pipelines_api,
@@ -76,7 +82,7 @@ def test_create_pipeline_and_upload_libraries(put_file_mock, dbfs_path_validate,
                           dbfs_path_validate, tmpdir, False)
 
 
-@mock.patch('databricks_cli.dbfs.api.DbfsApi.file_exists', file_exists_stub)
+@mock.patch('databricks_cli.dbfs.api.DbfsApi.list_files', list_files_stub)
 @mock.patch('databricks_cli.dbfs.dbfs_path.DbfsPath.validate')
 @mock.patch('databricks_cli.dbfs.api.DbfsApi.put_file')
 def test_deploy_pipeline_and_upload_libraries(put_file_mock, dbfs_path_validate, pipelines_api,
@@ -156,13 +162,13 @@ def _test_library_uploads(pipelines_api, api_method, settings, put_file_mock, db
     expected_data['allow_duplicate_names'] = allow_duplicate_names
 
     api_method(settings, tmpdir.strpath, allow_duplicate_names)
-    assert dbfs_path_validate.call_count == 5
-    assert put_file_mock.call_count == 4
-    assert put_file_mock.call_args_list[0][0][0] == jar2
-    assert put_file_mock.call_args_list[0][0][1].absolute_path == remote_path_456
-    assert put_file_mock.call_args_list[1][0][0] == jar3abspath
-    assert put_file_mock.call_args_list[2][0][0] == jar4
-    assert put_file_mock.call_args_list[3][0][0] == wheel1
+    # Files with the same content are uploaded once, from the first library that has it.
+    uploads = sorted((c[0][0], c[0][1].absolute_path, c[0][2])
+                     for c in put_file_mock.call_args_list)
+    assert uploads == sorted([
+        (jar2, remote_path_456, False),
+        (wheel1, 'dbfs:/pipelines/code/{}/wheel-name-conv.whl'.format(hash456), False),
+    ])
     client_mock = pipelines_api.client.client.perform_query
     assert client_mock.call_count == 1
     assert client_mock.call_args_list[0][1]['data'] == expected_data
@@ -257,6 +263,45 @@ def test_stop(pipelines_api):
                                    data={}, headers=None)
 
 
+def test_get_hashed_path(tmpdir):
+    empty = tmpdir.join('empty.jar').strpath
+    open(empty, 'w').close()
+    # sha1 of the empty string
+    assert api.PipelinesApi._get_hashed_path(empty) == \
+        'dbfs:/pipelines/code/da39a3ee5e6b4b0d3255bfef95601890afd80709.jar'
+
+
+def test_upload_local_libraries_lists_wheel_dirs(pipelines_api, tmpdir):
+    with open(tmpdir.join('a.whl').strpath, 'w') as f:
+        f.write('456')
+    with open(tmpdir.join('b.whl').strpath, 'w') as f:
+        f.write('123')
+    wheel_dir = 'dbfs:/pipelines/code/51eac6b471a284d3341d8c0c63d0f1a286262a18'
+    listings = {'dbfs:/pipelines/code': [wheel_dir], wheel_dir: [wheel_dir + '/a.whl']}
+    pipelines_api.dbfs_client.list_files = mock.Mock(side_effect=lambda dbfs_path: [
+        FileInfo(DbfsPath(path), False, 3, None) for path in listings[dbfs_path.absolute_path]])
+    pipelines_api.dbfs_client.put_file = mock.Mock()
+    remote = pipelines_api._upload_local_libraries(
+        tmpdir.strpath, [LibraryObject('whl', 'a.whl'), LibraryObject('whl', 'b.whl')])
+    assert [lo.path for lo in remote] == [
+        wheel_dir + '/a.whl',
+        'dbfs:/pipelines/code/40bd001563085fc35165329ea1ff5c5ecbdbbeef/b.whl']
+    assert pipelines_api.dbfs_client.list_files.call_count == 2
+    assert pipelines_api.dbfs_client.put_file.call_count == 1
+    assert pipelines_api.dbfs_client.put_file.call_args[0][0] == tmpdir.join('b.whl').strpath
+
+
+def test_upload_local_libraries_without_code_dir(pipelines_api, tmpdir):
+    with open(tmpdir.join('a.jar').strpath, 'w') as f:
+        f.write('123')
+    response = mock.Mock()
+    response.json.return_value = {'error_code': 'RESOURCE_DOES_NOT_EXIST'}
+    pipelines_api.dbfs_client.list_files = mock.Mock(side_effect=HTTPError(response=response))
+    pipelines_api.dbfs_client.put_file = mock.Mock()
+    pipelines_api._upload_local_libraries(tmpdir.strpath, [LibraryObject('jar', 'a.jar')])
+    assert pipelines_api.dbfs_client.put_file.call_count == 1
+
+
 def test_partition_local_remote(pipelines_api):
     libraries = [
         # local files
@@ -474,3 +519,135 @@ def test_list_without_pagination(pipelines_api):
         ], any_order=False)
 
     assert [status["pipeline_id"] for status in pipelines] == ["1"]
+
+
+def test_upload_local_libraries_with_hash_cache(tmpdir):
+    api_client = mock.MagicMock()
+    api_client.url = 'https://databricks.com'
+    pipelines_api = api.PipelinesApi(api_client, use_hash_cache=True)
+    pipelines_api.hash_cache_path = tmpdir.join('cache.json').strpath
+    jar = tmpdir.join('a.jar').strpath
+    with open(jar, 'w') as f:
+        f.write('456')
+    # Files modified in the last couple of seconds are always hashed again.
+    os.utime(jar, (1000000000, 1000000000))
+    pipelines_api.dbfs_client.list_files = mock.Mock(return_value=[])
+    pipelines_api.dbfs_client.put_file = mock.Mock()
+    libraries = [LibraryObject('jar', 'a.jar')]
+    remote = pipelines_api._upload_local_libraries(tmpdir.strpath, libraries)
+    assert pipelines_api.dbfs_client.put_file.call_count == 1
+
+    # An unchanged redeploy neither hashes the library nor looks it up in DBFS.
+    pipelines_api.dbfs_client.list_files.reset_mock()
+    pipelines_api.dbfs_client.put_file.reset_mock()
+    with mock.patch('databricks_cli.pipelines.api._hash_file') as hash_file_mock:
+        assert pipelines_api._upload_local_libraries(tmpdir.strpath, libraries) == remote
+        assert hash_file_mock.call_count == 0
+    assert pipelines_api.dbfs_client.list_files.call_count == 0
+    assert pipelines_api.dbfs_client.put_file.call_count == 0
+
+
+def test_upload_local_libraries_with_unwritable_hash_cache(tmpdir):
+    api_client = mock.MagicMock()
+    api_client.url = 'https://databricks.com'
+    pipelines_api = api.PipelinesApi(api_client, use_hash_cache=True)
+    not_a_dir = tmpdir.join('file').strpath
+    open(not_a_dir, 'w').close()
+    pipelines_api.hash_cache_path = os.path.join(not_a_dir, 'cache.json')
+    with open(tmpdir.join('a.jar').strpath, 'w') as f:
+        f.write('456')
+    pipelines_api.dbfs_client.list_files = mock.Mock(return_value=[])
+    pipelines_api.dbfs_client.put_file = mock.Mock()
+    remote = pipelines_api._upload_local_libraries(tmpdir.strpath, [LibraryObject('jar', 'a.jar')])
+    assert [lo.path for lo in remote] == [
+        'dbfs:/pipelines/code/51eac6b471a284d3341d8c0c63d0f1a286262a18.jar']
+    assert pipelines_api.dbfs_client.put_file.call_count == 1
+
+
+def test_pipelines_api_without_hash_cache():
+    api_client = mock.MagicMock()
+    api_client.url = 'https://databricks.com'
+    assert api.PipelinesApi(api_client).hash_cache_path is None
+    assert api.PipelinesApi(mock.MagicMock(), use_hash_cache=True).hash_cache_path is None
+
+
+def test_event_timestamp():
+    assert api._event_timestamp(1600000000123) == '2020-09-13T12:26:40.123Z'
+
+
+@mock.patch('databricks_cli.pipelines.api.time.sleep')
+def test_wait_for_update_streams_events(sleep_mock, pipelines_api):
+    updates = iter(['RUNNING', 'RUNNING', 'COMPLETED'])
+    pipelines_api.get_update = mock.Mock(side_effect=lambda *args: {
+        'update': {'update_id': 'u', 'state': next(updates), 'creation_time': 1600000000000}})
+    event_1 = {'id': '1', 'timestamp': 't1', 'origin': {'update_id': 'u'}}
+    event_2 = {'id': '2', 'timestamp': 't2', 'origin': {'update_id': 'u'}}
+    other_update_event = {'id': '3', 'timestamp': 't2', 'origin': {'update_id': 'v'}}
+    pages = iter([[event_1], [event_1, event_2, other_update_event], [event_2]])
+    pipelines_api.iter_events = mock.Mock(side_effect=lambda *args: iter(next(pages)))
+    states, events = [], []
+    update = pipelines_api.wait_for_update(
+        PIPELINE_ID, 'u', on_state_change=lambda u: states.append(u['state']),
+        on_event=lambda e: events.append(e['id']))
+    assert update['state'] == 'COMPLETED'
+    assert states == ['RUNNING', 'COMPLETED']
+    assert events == ['1', '2']
+    # Every poll lists the events from the timestamp of the last event seen.
+    cursors = [c[0][1] for c in pipelines_api.iter_events.call_args_list]
+    assert cursors == ['2020-09-13T12:26:40.000Z', 't1', 't2']
+    assert sleep_mock.call_count == 2
+
+
+@mock.patch('databricks_cli.pipelines.api.time.sleep')
+def test_wait_for_update_timeout(sleep_mock, pipelines_api):
+    pipelines_api.get_update = mock.Mock(return_value={'update': {'state': 'RUNNING'}})
+    assert pipelines_api.wait_for_update(PIPELINE_ID, 'u', timeout=0) is None
+    assert sleep_mock.call_count == 0
+
+
+def test_wait_for_update_polls_at_deadline(pipelines_api):
+    clock = [1000.0]
+    states = iter(['WAITING_FOR_RESOURCES', 'COMPLETED'])
+    pipelines_api.get_update = mock.Mock(side_effect=lambda *args: {
+        'update': {'state': next(states)}})
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    with mock.patch('databricks_cli.pipelines.api.time.time', lambda: clock[0]), \
+            mock.patch('databricks_cli.pipelines.api.time.sleep', sleep):
+        update = pipelines_api.wait_for_update(PIPELINE_ID, 'u', timeout=3)
+    # The first interval is longer than the timeout, so the second poll is made at the deadline.
+    assert update['state'] == 'COMPLETED'
+    assert clock[0] == 1003.0
+
+
+def test_wait_for_update_through_api_client():
+    host = 'https://databricks.com'
+    update_url = host + '/api/2.0/pipelines/{}/updates/u'.format(PIPELINE_ID)
+    events_url = host + '/api/2.0/pipelines/{}/events'.format(PIPELINE_ID)
+    event = {'id': '1', 'timestamp': '2020-09-13T12:26:41.000Z', 'origin': {'update_id': 'u'}}
+    with requests_mock.Mocker(case_sensitive=True) as m:
+        m.get(update_url, json={'update': {'state': 'COMPLETED', 'creation_time': 1600000000000}})
+        m.get(events_url, json={'events': [event]})
+        pipelines_api = api.PipelinesApi(ApiClient(token='token', host=host))
+        events = []
+        update = pipelines_api.wait_for_update(PIPELINE_ID, 'u', on_event=events.append)
+        assert update['state'] == 'COMPLETED'
+        assert events == [event]
+        query = m.request_history[-1].qs
+        assert query['order_by'] == ['timestamp asc']
+        assert query['filter'] == ["timestamp >= '2020-09-13T12:26:40.000Z'"]
+
+
+def test_iter_events(pipelines_api):
+    pipelines_api.list_events = mock.Mock(side_effect=[
+        {'events': [{'id': '1'}], 'next_page_token': 'next'},
+        {'events': [{'id': '2'}]},
+    ])
+    assert [e['id'] for e in pipelines_api.iter_events(PIPELINE_ID, 'ts')] == ['1', '2']
+    assert pipelines_api.list_events.call_args_list == [
+        mock.call(PIPELINE_ID, max_results=api.EVENTS_PAGE_SIZE, order_by='timestamp asc',
+                  event_filter="timestamp >= 'ts'", headers=None),
+        mock.call(PIPELINE_ID, page_token='next', headers=None),
+    ]
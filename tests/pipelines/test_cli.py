@@ -417,3 +417,33 @@ def test_with_missing_settings(pipelines_api_mock):
         assert "ValueError: Settings should be provided" in result.stdout
         assert pipelines_api_mock.create.call_count == 0
         assert pipelines_api_mock.edit.call_count == 0
+
+
+@provide_conf
+def test_start_cli_wait(pipelines_api_mock):
+    pipelines_api_mock.start_update.return_value = {'update_id': 'u'}
+    pipelines_api_mock.wait_for_update.return_value = {'state': 'COMPLETED'}
+    result = CliRunner().invoke(cli.start_cli, ['--pipeline-id', PIPELINE_ID, '--wait'])
+    assert result.exit_code == 0
+    assert pipelines_api_mock.wait_for_update.call_args[0] == (PIPELINE_ID, 'u')
+    assert 'Update u ended with state COMPLETED.' in result.output
+
+
+@provide_conf
+def test_watch_cli(pipelines_api_mock):
+    pipelines_api_mock.get_latest_update_id.return_value = 'u'
+    pipelines_api_mock.wait_for_update.return_value = {'state': 'FAILED'}
+    result = CliRunner().invoke(cli.watch_cli, ['--pipeline-id', PIPELINE_ID])
+    assert result.exit_code == 1
+    assert pipelines_api_mock.wait_for_update.call_args[0] == (PIPELINE_ID, 'u')
+
+    pipelines_api_mock.wait_for_update.return_value = None
+    result = CliRunner().invoke(cli.watch_cli, ['--pipeline-id', PIPELINE_ID, '--update-id', 'v',
+                                                '--timeout', '10'])
+    assert result.exit_code == 1
+    assert 'did not end within 10 seconds' in result.output
+
+    pipelines_api_mock.get_latest_update_id.return_value = None
+    result = CliRunner().invoke(cli.watch_cli, ['--pipeline-id', PIPELINE_ID])
+    assert result.exit_code == 1
+    assert 'has no updates' in result.output
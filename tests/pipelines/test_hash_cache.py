@@ -0,0 +1,121 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# pylint:disable=redefined-outer-name
+
+import os
+import time
+
+import mock
+import pytest
+
+import databricks_cli.pipelines.hash_cache as hash_cache
+from databricks_cli.pipelines.hash_cache import LibraryHashCache
+
+OLD_MTIME = 1000000000
+
+
+@pytest.fixture()
+def cache_path(tmpdir):
+    yield tmpdir.join('cache', 'cache.json').strpath
+
+
+def _write(path, content, mtime=OLD_MTIME):
+    with open(path, 'w') as f:
+        f.write(content)
+    os.utime(path, (mtime, mtime))
+
+
+def test_get_digest_reuses_unchanged_files(cache_path, tmpdir):
+    path = tmpdir.join('a.jar').strpath
+    _write(path, '123')
+    hash_file = mock.Mock(return_value='digest')
+    cache = LibraryHashCache.load(cache_path)
+    assert cache.get_digest(path, hash_file) == 'digest'
+    cache.save()
+
+    cache = LibraryHashCache.load(cache_path)
+    assert cache.get_digest(path, hash_file) == 'digest'
+    assert hash_file.call_count == 1
+
+    _write(path, '456', mtime=OLD_MTIME + 1)
+    hash_file.return_value = 'new digest'
+    assert cache.get_digest(path, hash_file) == 'new digest'
+    assert hash_file.call_count == 2
+
+
+def test_get_digest_skips_recently_modified_files(cache_path, tmpdir):
+    path = tmpdir.join('a.jar').strpath
+    _write(path, '123', mtime=time.time())
+    hash_file = mock.Mock(return_value='digest')
+    cache = LibraryHashCache.load(cache_path)
+    cache.get_digest(path, hash_file)
+    cache.get_digest(path, hash_file)
+    assert hash_file.call_count == 2
+
+
+def test_load_unreadable_cache(cache_path):
+    os.makedirs(os.path.dirname(cache_path))
+    with open(cache_path, 'w') as f:
+        f.write('{not json')
+    cache = LibraryHashCache.load(cache_path)
+    assert not cache.digests
+    assert not cache.uploaded_paths
+    assert not LibraryHashCache.load(cache_path + '.missing').digests
+
+
+def test_uploaded_paths(cache_path):
+    cache = LibraryHashCache.load(cache_path)
+    assert not cache.is_uploaded('dbfs:/a')
+    cache.mark_uploaded(['dbfs:/a'])
+    cache.save()
+    cache = LibraryHashCache.load(cache_path)
+    assert cache.is_uploaded('dbfs:/a')
+    cache.uploaded_paths['dbfs:/a'] -= hash_cache.MAX_UPLOAD_AGE_SECONDS + 1
+    assert not cache.is_uploaded('dbfs:/a')
+
+
+def test_save_evicts_least_recently_used(cache_path, tmpdir):
+    paths = [tmpdir.join('{}.jar'.format(i)).strpath for i in range(3)]
+    for path in paths:
+        _write(path, path)
+    cache = LibraryHashCache.load(cache_path)
+    for path in paths:
+        cache.get_digest(path, lambda p: p)
+    cache.get_digest(paths[0], lambda p: p)
+    cache.mark_uploaded(['dbfs:/a', 'dbfs:/b', 'dbfs:/c'])
+    cache.is_uploaded('dbfs:/a')
+    with mock.patch.object(hash_cache, 'MAX_DIGESTS', 2), \
+            mock.patch.object(hash_cache, 'MAX_UPLOADED_PATHS', 2):
+        cache.save()
+    cache = LibraryHashCache.load(cache_path)
+    assert list(cache.digests) == [os.path.abspath(paths[2]), os.path.abspath(paths[0])]
+    assert list(cache.uploaded_paths) == ['dbfs:/c', 'dbfs:/a']
+
+
+def test_save_failure(tmpdir):
+    not_a_dir = tmpdir.join('file').strpath
+    open(not_a_dir, 'w').close()
+    cache = LibraryHashCache.load(os.path.join(not_a_dir, 'cache.json'))
+    cache.mark_uploaded(['dbfs:/a'])
+    assert not cache.save()
@@ -21,10 +21,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+# pylint:disable=redefined-outer-name
+
 import mock
 import pytest
+import requests
 
-from databricks_cli.runs.api import RunsApi
+from databricks_cli.runs.api import RunsApi, MAX_POLL_RETRIES
 from tests.utils import provide_conf
 
 
@@ -118,3 +121,131 @@ def test_submit_run():
             'POST', '/jobs/runs/submit', data='{"tasks": [], "run_name": "mock"}',
             version='3.0'
         )
+
+
+def _run(run_id, life_cycle_state, result_state=None):
+    state = {'life_cycle_state': life_cycle_state}
+    if result_state:
+        state['result_state'] = result_state
+    return {'run_id': run_id, 'state': state}
+
+
+def test_wait_for_runs(runs_api):
+    polls = {
+        1: [_run(1, 'PENDING'), _run(1, 'RUNNING'), _run(1, 'TERMINATED', 'SUCCESS')],
+        2: [_run(2, 'TERMINATED', 'FAILED')],
+    }
+    runs_api.get_run = mock.Mock(side_effect=lambda run_id, version: polls[run_id].pop(0))
+    state_changes = []
+    with mock.patch('time.sleep') as sleep_mock:
+        runs = list(runs_api.wait_for_runs([1, 2], parallelism=2, on_state_change=lambda run:
+                                           state_changes.append(run['state']['life_cycle_state'])))
+    assert [run_id for run_id, _, _ in runs] == [2, 1]
+    assert [run['run_id'] for _, run, _ in runs] == [2, 1]
+    assert runs_api.get_run.call_count == 4
+    assert sleep_mock.call_count == 2
+    assert sorted(state_changes) == ['PENDING', 'RUNNING', 'TERMINATED', 'TERMINATED']
+
+
+def test_wait_for_runs_timeout(runs_api):
+    runs_api.get_run = mock.Mock(return_value=_run(1, 'PENDING'))
+    with mock.patch('time.sleep'):
+        assert not list(runs_api.wait_for_runs([1], timeout=0))
+    assert runs_api.get_run.call_count == 1
+
+
+def test_wait_for_runs_polls_at_deadline(runs_api):
+    clock = [1000.0]
+    polls = [_run(1, 'PENDING'), _run(1, 'TERMINATED', 'SUCCESS')]
+    runs_api.get_run = mock.Mock(side_effect=lambda run_id, version: polls.pop(0))
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    with mock.patch('time.time', lambda: clock[0]), mock.patch('time.sleep', sleep):
+        runs = list(runs_api.wait_for_runs([1], timeout=3))
+    # The first interval is longer than the timeout, so the second poll is made at the deadline.
+    assert [run_id for run_id, _, _ in runs] == [1]
+    assert clock[0] == 1003.0
+
+
+def _http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(response=response)
+
+
+def test_wait_for_runs_errors(runs_api):
+    polls = {
+        1: [_http_error(503), _run(1, 'TERMINATED', 'SUCCESS')],
+        2: [_http_error(400)],
+        3: [requests.exceptions.ConnectionError()] * (MAX_POLL_RETRIES + 1),
+    }
+
+    def get_run(run_id, version):
+        assert version == '2.1'
+        result = polls[run_id].pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    runs_api.get_run = mock.Mock(side_effect=get_run)
+    with mock.patch('time.sleep'):
+        results = runs_api.wait_for_runs([1, 2, 3], parallelism=1, version='2.1')
+        runs = {run_id: (run, exception) for run_id, run, exception in results}
+    # Transient errors are retried, and errors only affect their own run.
+    assert runs[1][0]['state']['result_state'] == 'SUCCESS'
+    assert runs[2][1].response.status_code == 400
+    assert isinstance(runs[3][1], requests.exceptions.ConnectionError)
+    assert runs_api.get_run.call_count == 2 + 1 + MAX_POLL_RETRIES + 1
+
+
+def test_iter_runs(runs_api):
+    pages = {
+        0: {'runs': [{'run_id': 3, 'start_time': 30}, {'run_id': 2, 'start_time': 20}],
+            'has_more': True},
+        2: {'runs': [{'run_id': 1, 'start_time': 10}], 'has_more': False},
+    }
+    runs_api.client.list_runs = mock.Mock(side_effect=lambda offset, **kwargs: pages[offset])
+    assert [run['run_id'] for run in runs_api.iter_runs(page_size=2)] == [3, 2, 1]
+    assert runs_api.client.list_runs.call_args[1]['limit'] == 2
+
+    runs_api.client.list_runs.reset_mock()
+    assert [run['run_id'] for run in runs_api.iter_runs(since=25)] == [3]
+    assert runs_api.client.list_runs.call_count == 1
+    assert runs_api.client.list_runs.call_args[1]['start_time_from'] == 25
+
+
+@pytest.mark.parametrize('parallelism', [1, 3])
+def test_iter_run_outputs(runs_api, parallelism):
+    runs = [{'run_id': 1, 'tasks': [{'run_id': 11}, {'run_id': 12}]}, {'run_id': 2},
+            {'run_id': 2}]
+    runs_api.get_run_output = mock.Mock(side_effect=lambda run_id, version: {'id': run_id})
+    outputs = runs_api.iter_run_outputs(runs=iter(runs), parallelism=parallelism)
+    assert sorted((run_id, output['id']) for run_id, output, _ in outputs) == \
+        [(2, 2), (11, 11), (12, 12)]
+
+
+def test_iter_run_outputs_by_id(runs_api):
+    runs = {1: {'run_id': 1, 'tasks': [{'run_id': 11}]}, 2: {'run_id': 2}}
+    runs_api.get_run = mock.Mock(side_effect=lambda run_id, version: runs[run_id])
+    runs_api.get_run_output = mock.Mock(side_effect=RuntimeError('boom'))
+    outputs = list(runs_api.iter_run_outputs(run_ids=[1, 2, 1], parallelism=1))
+    assert [run_id for run_id, _, _ in outputs] == [11, 2]
+    assert all(isinstance(exception, RuntimeError) for _, _, exception in outputs)
+    assert runs_api.get_run.call_count == 2
+
+
+def test_iter_run_outputs_by_id_with_missing_runs(runs_api):
+    def get_run(run_id, version):
+        assert version == '2.1'
+        if run_id == 1:
+            raise RuntimeError('no such run')
+        return {'run_id': run_id}
+
+    runs_api.get_run = mock.Mock(side_effect=get_run)
+    runs_api.get_run_output = mock.Mock(side_effect=lambda run_id, version: {'id': run_id})
+    outputs = list(runs_api.iter_run_outputs(run_ids=[1, 2, 3], parallelism=1, version='2.1'))
+    assert [(run_id, output) for run_id, output, _ in outputs] == \
+        [(1, None), (2, {'id': 2}), (3, {'id': 3})]
+    assert str(outputs[0][2]) == 'no such run'
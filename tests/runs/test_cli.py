@@ -145,6 +145,73 @@ def test_list_runs_output_json(runs_api_mock):
         assert echo_mock.call_args[0][0] == pretty_format(LIST_RETURN)
 
 
+@provide_conf
+def test_list_runs_all(runs_api_mock):
+    runs = [dict(LIST_RETURN['runs'][0], run_id=run_id) for run_id in range(3)]
+    runs_api_mock.iter_runs.return_value = iter(runs)
+    result = CliRunner().invoke(cli.list_cli, ['--all', '--limit', '2', '--version', '2.1'])
+    assert result.exit_code == 0
+    rows = [(run_id, 'name', 'RUNNING', 'n/a', RUN_PAGE_URL) for run_id in range(3)]
+    pages = [rows[:2], rows[2:]]
+    assert result.output == ''.join(tabulate(rows, tablefmt='plain') + '\n' for rows in pages)
+    assert runs_api_mock.iter_runs.call_args[1]['page_size'] == 2
+    assert runs_api_mock.iter_runs.call_args[1]['since'] is None
+
+
+@provide_conf
+def test_list_runs_all_output_json_since(runs_api_mock):
+    runs_api_mock.iter_runs.return_value = iter(LIST_RETURN['runs'])
+    result = CliRunner().invoke(cli.list_cli, ['--all', '--since', '2020-01-02', '--output',
+                                               'json', '--version', '2.1'])
+    assert result.exit_code == 0
+    assert [json.loads(line) for line in result.output.splitlines()] == LIST_RETURN['runs']
+    since = runs_api_mock.iter_runs.call_args[1]['since']
+    assert abs(since - 1577923200000) <= 14 * 60 * 60 * 1000
+
+
+@provide_conf
+def test_list_runs_since_requires_all(runs_api_mock):
+    result = CliRunner().invoke(cli.list_cli, ['--since', '2020-01-02', '--version', '2.1'])
+    assert result.exit_code == 1
+    assert not runs_api_mock.iter_runs.called
+
+
+@provide_conf
+def test_get_outputs_cli_job(runs_api_mock):
+    runs_api_mock.iter_runs.return_value = iter(LIST_RETURN['runs'])
+    runs_api_mock.iter_run_outputs.return_value = iter([
+        (1, {'notebook_output': {'result': 'ok'}}, None), (2, None, RuntimeError('boom'))])
+    result = CliRunner().invoke(cli.get_outputs_cli, ['--job-id', '5', '--version', '2.1'])
+    assert result.exit_code == 1
+    lines = result.output.splitlines()
+    assert json.loads(lines[0]) == {'run_id': 1, 'output': {'notebook_output': {'result': 'ok'}}}
+    assert json.loads(lines[1]) == {'run_id': 2, 'error': 'RuntimeError: boom'}
+    assert runs_api_mock.iter_runs.call_args[1]['job_id'] == 5
+    assert runs_api_mock.iter_runs.call_args[1]['expand_tasks']
+    assert runs_api_mock.iter_run_outputs.call_args[1]['runs'] is \
+        runs_api_mock.iter_runs.return_value
+
+
+@provide_conf
+def test_get_outputs_cli_run_ids(runs_api_mock):
+    runs_api_mock.iter_run_outputs.return_value = iter([])
+    result = CliRunner().invoke(cli.get_outputs_cli, ['--run-id', '1', '--run-id', '2',
+                                                      '--parallelism', '2', '--version', '2.1'])
+    assert result.exit_code == 0
+    assert runs_api_mock.iter_run_outputs.call_args == mock.call(
+        run_ids=('1', '2'), parallelism=2, version='2.1')
+
+
+@provide_conf
+def test_get_outputs_cli_requires_one_source(runs_api_mock):
+    for args in [[],
+                 ['--job-id', '1', '--run-id', '2'],
+                 ['--run-id', '2', '--since', '2020-01-01']]:
+        result = CliRunner().invoke(cli.get_outputs_cli, args + ['--version', '2.1'])
+        assert result.exit_code == 1
+    assert not runs_api_mock.iter_run_outputs.called
+
+
 @provide_conf
 def test_get_cli(runs_api_mock):
     with mock.patch('databricks_cli.runs.cli.click.echo') as echo_mock:
@@ -163,3 +230,42 @@ def test_cancel_cli(runs_api_mock):
         runner.invoke(cli.cancel_cli, ['--run-id', 1, "--version", "2.1"])
         assert runs_api_mock.cancel_run.call_args[0][0] == 1
         assert echo_mock.call_args[0][0] == pretty_format({})
+
+
+@provide_conf
+def test_wait_cli(runs_api_mock):
+    def wait_for_runs(run_ids, parallelism, timeout, on_state_change, version):  # noqa
+        assert run_ids == ['1', '2']
+        assert parallelism == 8
+        run = {'run_id': 2, 'state': {'life_cycle_state': 'TERMINATED',
+                                      'result_state': 'SUCCESS'}}
+        on_state_change(run)
+        yield '2', run, None
+    runs_api_mock.wait_for_runs.side_effect = wait_for_runs
+    result = CliRunner().invoke(cli.wait_cli, ['1', '2', '1', '--timeout', '10'])
+    assert result.exit_code == 1
+    assert 'Run 2 is TERMINATED. URL: n/a' in result.output
+    assert '[1/2] Run 2 completed with state SUCCESS.' in result.output
+    assert 'Error: 0 of 2 runs failed and 1 did not complete in time: 1.' in result.output
+
+
+@provide_conf
+def test_wait_cli_success(runs_api_mock):
+    runs_api_mock.wait_for_runs.return_value = iter([
+        ('1', {'run_id': 1, 'state': {'life_cycle_state': 'TERMINATED',
+                                      'result_state': 'SUCCESS'}}, None)])
+    result = CliRunner().invoke(cli.wait_cli, ['1'])
+    assert result.exit_code == 0
+
+
+@provide_conf
+def test_wait_cli_poll_error(runs_api_mock):
+    runs_api_mock.wait_for_runs.return_value = iter([
+        ('1', None, RuntimeError('boom')),
+        ('2', {'run_id': 2, 'state': {'life_cycle_state': 'TERMINATED',
+                                      'result_state': 'SUCCESS'}}, None)])
+    result = CliRunner().invoke(cli.wait_cli, ['1', '2'])
+    assert result.exit_code == 1
+    assert '[1/2] Run 1 could not be polled: RuntimeError: boom' in result.output
+    assert '[2/2] Run 2 completed with state SUCCESS.' in result.output
+    assert 'Error: 1 of 2 runs failed.' in result.output
@@ -28,7 +28,7 @@ import requests
 import requests_mock
 
 from databricks_cli.sdk import ReposService
-from databricks_cli.sdk.api_client import ApiClient
+from databricks_cli.sdk.api_client import ApiClient, ApiClientObserver
 
 
 def test_api_client_constructor():
@@ -172,3 +172,69 @@ def test_api_client_auth_no_netrc(m):
     client = ApiClient(host="https://databricks.com")
     client.perform_query("GET", "/endpoint")
     assert "Authorization" not in m.request_history[0].headers
+
+
+def test_connection_pool_settings():
+    client = ApiClient(host='https://databricks.com', token='token', pool_connections=3,
+                       pool_maxsize=50, pool_block=True)
+    for prefix in ['https://', 'http://']:
+        adapter = client.session.get_adapter(prefix + 'databricks.com')
+        assert adapter._pool_connections == 3
+        assert adapter._pool_maxsize == 50
+        assert adapter._pool_block
+
+
+def test_shared_session():
+    first = ApiClient(host='https://databricks.com', token='token')
+    second = ApiClient(host='https://other.databricks.com', token='token',
+                       session=first.session)
+    assert first.session is second.session
+
+
+def test_get_connection_stats():
+    client = ApiClient(host='https://databricks.com', token='token')
+    poolmanager = client.session.get_adapter('https://databricks.com').poolmanager
+    pool = poolmanager.connection_from_host('databricks.com', 443, scheme='https')
+    pool.num_requests = 5
+    pool.num_connections = 2
+    assert client.get_connection_stats() == {
+        'requests': 5, 'connections_opened': 2, 'connections_reused': 3}
+
+
+class RecordingObserver(ApiClientObserver):
+    def __init__(self):
+        self.before = []
+        self.after = []
+
+    def before_request(self, event):
+        self.before.append((event.method, event.path, event.status))
+
+    def after_request(self, event):
+        self.after.append(event)
+
+
+def test_observers(m):
+    m.post('https://databricks.com/api/2.0/endpoint', text='{"a": 1}')
+    observer = RecordingObserver()
+    client = ApiClient(host='https://databricks.com', token='token', observers=[observer])
+    client.perform_query('POST', '/endpoint', data={'b': 2})
+    assert observer.before == [('POST', '/endpoint', None)]
+    event = observer.after[0]
+    assert event.status == 200
+    assert event.request_bytes == len('{"b": 2}')
+    assert event.response_bytes == len('{"a": 1}')
+    assert event.retries == 0
+    assert event.latency >= 0
+    assert event.error is None
+
+
+def test_observers_on_connection_error(m):
+    m.get('https://databricks.com/api/2.0/endpoint', exc=requests.exceptions.ConnectionError)
+    observer = RecordingObserver()
+    client = ApiClient(host='https://databricks.com', token='token')
+    client.add_observer(observer)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.perform_query('GET', '/endpoint')
+    event = observer.after[0]
+    assert event.status is None
+    assert isinstance(event.error, requests.exceptions.ConnectionError)
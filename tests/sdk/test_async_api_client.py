@@ -0,0 +1,146 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# pylint:disable=protected-access
+import asyncio
+import json
+
+import mock
+import pytest
+import requests
+
+from databricks_cli.sdk import async_api_client
+from databricks_cli.sdk.service import JobsService
+
+aiohttp = pytest.importorskip('aiohttp')
+
+
+class FakeResponse(object):
+    def __init__(self, status, body, headers=None, reason='OK'):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.reason = reason
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def read(self):
+        return self.body
+
+
+def make_client(*responses):
+    client = async_api_client.AsyncApiClient(host='https://test.cloud.databricks.com',
+                                             token='token')
+    session = mock.Mock()
+    session.request.side_effect = list(responses)
+    client._get_session = mock.Mock(return_value=session)
+    return client, session
+
+
+def test_perform_query_get():
+    client, session = make_client(FakeResponse(200, b'{"job_id": 1}'))
+    data = {'job_id': 1, 'expand': True}
+    result = asyncio.run(client.perform_query('GET', '/jobs/get', data=data))
+    assert result == {'job_id': 1}
+    args, kwargs = session.request.call_args
+    assert args == ('GET', 'https://test.cloud.databricks.com/api/2.0/jobs/get')
+    assert kwargs['params'] == {'job_id': 1, 'expand': 'true'}
+    assert kwargs['headers']['Authorization'] == 'Bearer token'
+
+
+def test_perform_query_post_drops_none_headers():
+    client, session = make_client(FakeResponse(200, b'{}'))
+    asyncio.run(client.perform_query('POST', '/jobs/delete', data={'job_id': 1},
+                                     headers={'user-agent': None}))
+    _, kwargs = session.request.call_args
+    assert json.loads(kwargs['data']) == {'job_id': 1}
+    assert 'user-agent' not in kwargs['headers']
+
+
+def test_service_methods_can_be_awaited():
+    client, session = make_client(FakeResponse(200, b'{"run_id": 1}'),
+                                  FakeResponse(200, b'{"run_id": 2}'))
+
+    async def get_runs():
+        jobs = JobsService(client)
+        return await asyncio.gather(jobs.get_run(1), jobs.get_run(2))
+
+    assert asyncio.run(get_runs()) == [{'run_id': 1}, {'run_id': 2}]
+    assert session.request.call_count == 2
+
+
+def test_perform_query_retries_too_many_requests():
+    client, session = make_client(FakeResponse(429, b'', headers={'Retry-After': '7'}),
+                                  FakeResponse(200, b'{}'))
+    with mock.patch('asyncio.sleep') as sleep_mock:
+        sleep_mock.return_value = None
+        asyncio.run(client.perform_query('GET', '/jobs/list'))
+    sleep_mock.assert_called_once_with(7)
+    assert session.request.call_count == 2
+
+
+def test_perform_query_retries_connection_errors():
+    client, session = make_client(aiohttp.ClientConnectionError(), asyncio.TimeoutError(),
+                                  FakeResponse(200, b'{"job_id": 1}'))
+    with mock.patch('asyncio.sleep') as sleep_mock:
+        sleep_mock.return_value = None
+        assert asyncio.run(client.perform_query('GET', '/jobs/get')) == {'job_id': 1}
+    assert [c[0][0] for c in sleep_mock.call_args_list] == [1, 2]
+    assert session.request.call_count == 3
+
+
+def test_perform_query_gives_up_on_connection_errors():
+    errors = [aiohttp.ClientConnectionError()] * (async_api_client.MAX_RETRIES + 1)
+    client, session = make_client(*errors)
+    with mock.patch('asyncio.sleep') as sleep_mock:
+        sleep_mock.return_value = None
+        with pytest.raises(aiohttp.ClientConnectionError):
+            asyncio.run(client.perform_query('GET', '/jobs/get'))
+    assert session.request.call_count == async_api_client.MAX_RETRIES + 1
+
+
+def test_perform_query_raises_http_error():
+    client, _ = make_client(FakeResponse(400, b'{"error_code": "INVALID_PARAMETER_VALUE"}',
+                                         reason='Bad Request'))
+    with pytest.raises(requests.exceptions.HTTPError) as e:
+        asyncio.run(client.perform_query('GET', '/jobs/get'))
+    assert e.value.response.status_code == 400
+    assert e.value.response.json() == {'error_code': 'INVALID_PARAMETER_VALUE'}
+    assert '400 Client Error: Bad Request' in str(e.value)
+
+
+def test_retry_delay():
+    assert async_api_client._retry_delay('3', 0) == 3
+    assert async_api_client._retry_delay(None, 0) == 1
+    assert async_api_client._retry_delay(None, 3) == 8
+    assert async_api_client._retry_delay(None, 10) == async_api_client.BACKOFF_MAX
+
+
+def test_requires_aiohttp():
+    with mock.patch.object(async_api_client, 'aiohttp', None):
+        with pytest.raises(ImportError):
+            async_api_client.AsyncApiClient(host='https://test.cloud.databricks.com')
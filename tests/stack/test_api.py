@@ -34,6 +34,8 @@ import pytest
 
 import databricks_cli.stack.api as api
 import databricks_cli.workspace.api as workspace_api
+from databricks_cli.dbfs.api import FileInfo
+from databricks_cli.dbfs.dbfs_path import DbfsPath
 from databricks_cli.stack.exceptions import StackError
 from databricks_cli.version import version as CLI_VERSION
 
@@ -515,11 +517,11 @@ class TestStackApi(object):
         }
         stack_api._download_resource(resource_badservice)
 
-    def test_deploy_config(self, stack_api, tmpdir):
+    @staticmethod
+    def _prepare_deploy(stack_api, tmpdir):
         """
-            The stack status generated from a correctly set up stack passed through deployment
-            in stack_api should pass the validation assertions within the deployment procedure
-            along with passing some correctness criteria that will be tested here.
+        Mocks the services of stack_api and creates the local files of TEST_STACK in tmpdir.
+        Returns the stack config pointing at them.
         """
         test_deploy_output = {'test': 'test'}
         # Setup mocks for job resource deployment
@@ -539,7 +541,8 @@ class TestStackApi(object):
         # Setup mocks for dbfs resource deployment
         stack_api.dbfs_client.cp = mock.MagicMock()
         stack_api.dbfs_client.client = mock.MagicMock()
-        stack_api.dbfs_client.client.get_status.return_value = test_deploy_output
+        stack_api.dbfs_client.client.get_status.return_value = {
+            'path': '/test', 'is_dir': False, 'file_size': 1, 'modification_time': 100}
 
         # Create files and directories associated with workspace and dbfs resources to ensure
         # that validations within resource-specific services pass.
@@ -566,8 +569,20 @@ class TestStackApi(object):
                 else:
                     with open(resource_properties[api.DBFS_RESOURCE_SOURCE_PATH], 'w') as f:
                         f.write("print('test')\n")
+        return test_stack
 
+    def test_deploy_config(self, stack_api, tmpdir):
+        """
+            The stack status generated from a correctly set up stack passed through deployment
+            in stack_api should pass the validation assertions within the deployment procedure
+            along with passing some correctness criteria that will be tested here.
+        """
+        test_stack = self._prepare_deploy(stack_api, tmpdir)
         new_stack_status_1 = stack_api.deploy(test_stack)
+        fingerprints_1 = [status.pop(api.RESOURCE_FINGERPRINT)
+                          for status in new_stack_status_1[api.STACK_DEPLOYED]]
+        assert fingerprints_1[0][api.FINGERPRINT_REMOTE_STATE] is None
+        assert fingerprints_1[3][api.FINGERPRINT_REMOTE_STATE] == 100
         test_job_status_1 = {
             api.RESOURCE_ID: TEST_RESOURCE_ID,
             api.RESOURCE_SERVICE: api.JOBS_SERVICE,
@@ -588,5 +603,152 @@ class TestStackApi(object):
         # stack_api.deploy should create a valid stack status when given an existing
         # stack_status
         new_stack_status_2 = stack_api.deploy(test_stack, stack_status=TEST_STATUS)
+        fingerprints_2 = [status.pop(api.RESOURCE_FINGERPRINT)
+                          for status in new_stack_status_2[api.STACK_DEPLOYED]]
         test_stack_status_2 = TEST_STATUS
         assert new_stack_status_2 == test_stack_status_2
+        assert fingerprints_2 == fingerprints_1
+
+    def test_deploy_config_skips_unchanged_resources(self, stack_api, tmpdir):
+        test_stack = self._prepare_deploy(stack_api, tmpdir)
+        stack_status = stack_api.deploy(test_stack, stack_status=TEST_STATUS)
+
+        # Resources whose fingerprint didn't change are not deployed again.
+        stack_api._deploy_resource = mock.MagicMock()
+        changes = stack_api.plan(test_stack, stack_status)
+        assert [change['action'] for change in changes] == [api.PLAN_UNCHANGED] * 5 + [
+            api.PLAN_CREATE]
+        assert stack_api.deploy(test_stack, stack_status=stack_status) == stack_status
+        # Only the resource that isn't written to the status is deployed again.
+        assert stack_api._deploy_resource.call_count == 1
+
+        # Local changes are detected.
+        with open(test_stack[api.STACK_RESOURCES][1][api.RESOURCE_PROPERTIES][
+                api.WORKSPACE_RESOURCE_SOURCE_PATH], 'a') as f:
+            f.write("print('changed')\n")
+        changes = stack_api.plan(test_stack, stack_status)
+        assert [change['action'] for change in changes] == [
+            api.PLAN_UNCHANGED, api.PLAN_UPDATE, api.PLAN_UNCHANGED, api.PLAN_UNCHANGED,
+            api.PLAN_UNCHANGED, api.PLAN_CREATE]
+        assert changes[1]['reason'] == 'changed locally'
+
+        # Forced deployments deploy everything without planning.
+        stack_api._plan = mock.MagicMock()
+        stack_api._deploy_resource = mock.MagicMock(side_effect=lambda config, status, **kwargs:
+                                                    dict(status or {}))
+        stack_api.deploy(test_stack, stack_status=stack_status, force=True)
+        assert stack_api._plan.call_count == 0
+        assert stack_api._deploy_resource.call_count == 6
+
+    def test_remote_state_of_directories(self, stack_api):
+        workspace_dir = _resource('ws', api.WORKSPACE_SERVICE, {
+            api.WORKSPACE_RESOURCE_PATH: '/dir'})
+        listings = {
+            '/dir': [{'path': '/dir/sub', 'object_type': 'DIRECTORY', 'object_id': 1}],
+            '/dir/sub': [{'path': '/dir/sub/nb', 'object_type': 'NOTEBOOK', 'object_id': 2,
+                          'modified_at': 10}],
+        }
+        client = stack_api.workspace_client.client
+        client.get_status = mock.Mock(return_value={'object_type': 'DIRECTORY',
+                                                    'modified_at': 1})
+        client.list = mock.Mock(side_effect=lambda path, headers: {'objects': listings[path]})
+        state = stack_api._remote_state(workspace_dir)
+        # A change to a notebook below the directory changes the state of the directory.
+        listings['/dir/sub'][0]['modified_at'] = 20
+        assert stack_api._remote_state(workspace_dir) != state
+
+        dbfs_dir = _resource('dbfs', api.DBFS_SERVICE, {api.DBFS_RESOURCE_PATH: 'dbfs:/dir'})
+        files = {
+            'dbfs:/dir': [FileInfo(DbfsPath('dbfs:/dir/f'), False, 1, 10)],
+        }
+        stack_api.dbfs_client.get_status = mock.Mock(
+            return_value=FileInfo(DbfsPath('dbfs:/dir'), True, 0, 1))
+        stack_api.dbfs_client.list_files = mock.Mock(
+            side_effect=lambda path, headers: files[path.absolute_path])
+        state = stack_api._remote_state(dbfs_dir)
+        files['dbfs:/dir'][0].modification_time = 20
+        assert stack_api._remote_state(dbfs_dir) != state
+
+
+def _resource(resource_id, service, properties, depends_on=None):
+    resource = {api.RESOURCE_ID: resource_id, api.RESOURCE_SERVICE: service,
+                api.RESOURCE_PROPERTIES: properties}
+    if depends_on is not None:
+        resource[api.RESOURCE_DEPENDS_ON] = depends_on
+    return resource
+
+
+def test_resource_dependencies():
+    job_settings = {
+        api.JOBS_RESOURCE_NAME: 'job',
+        'notebook_task': {'notebook_path': '/test/notebook'},
+        'libraries': [{'jar': 'dbfs:/test/dir/lib.jar'}],
+    }
+    resources = [
+        TEST_WORKSPACE_NB_RESOURCE,
+        TEST_WORKSPACE_DIR_RESOURCE,
+        TEST_DBFS_DIR_RESOURCE,
+        _resource('job', api.JOBS_SERVICE, job_settings),
+        _resource('same name', api.JOBS_SERVICE, {api.JOBS_RESOURCE_NAME: 'job'}),
+        _resource('explicit', api.JOBS_SERVICE, {api.JOBS_RESOURCE_NAME: 'other'},
+                  depends_on=[TEST_RESOURCE_DBFS_DIR_ID]),
+    ]
+    assert api.resource_dependencies(resources) == {
+        TEST_RESOURCE_WORKSPACE_NB_ID: set(),
+        TEST_RESOURCE_WORKSPACE_DIR_ID: set(),
+        TEST_RESOURCE_DBFS_DIR_ID: set(),
+        'job': {TEST_RESOURCE_WORKSPACE_NB_ID, TEST_RESOURCE_DBFS_DIR_ID},
+        'same name': {'job'},
+        'explicit': {TEST_RESOURCE_DBFS_DIR_ID},
+    }
+
+
+def test_deploy_in_order():
+    resources = [{api.RESOURCE_ID: resource_id} for resource_id in 'abcd']
+    dependencies = {'a': {'b'}, 'b': set(), 'c': set(), 'd': {'a', 'c'}}
+    deployed = []
+
+    def deploy_resource(resource):
+        deployed.append(resource[api.RESOURCE_ID])
+        return resource[api.RESOURCE_ID].upper()
+
+    results = api.StackApi._deploy_in_order(resources, dependencies, deploy_resource, 1)
+    assert deployed == ['b', 'a', 'c', 'd']
+    assert results == {'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D'}
+    results = api.StackApi._deploy_in_order(resources, dependencies, deploy_resource, 3)
+    assert results == {'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D'}
+
+
+def test_deploy_in_order_failures():
+    resources = [{api.RESOURCE_ID: resource_id} for resource_id in 'abc']
+    dependencies = {'a': set(), 'b': {'a'}, 'c': set()}
+    deployed = []
+
+    def deploy_resource(resource):
+        if resource[api.RESOURCE_ID] == 'a':
+            raise StackError('a is broken')
+        deployed.append(resource[api.RESOURCE_ID])
+
+    with pytest.raises(StackError) as e:
+        api.StackApi._deploy_in_order(resources, dependencies, deploy_resource, 2)
+    assert deployed == ['c']
+    assert '2 of 3 resources failed to deploy' in str(e.value)
+    assert 'b: Not deployed because "a" failed to deploy.' in str(e.value)
+
+    # A single failure is raised as is.
+    with pytest.raises(StackError, match='a is broken'):
+        api.StackApi._deploy_in_order(resources[:1], {'a': set()}, deploy_resource, 2)
+
+    with pytest.raises(StackError, match='depend on each other'):
+        api.StackApi._deploy_in_order(resources[:2], {'a': {'b'}, 'b': {'a'}}, deploy_resource,
+                                      1)
+
+
+def test_validate_config_depends_on(stack_api):
+    stack = {api.STACK_NAME: 'test', api.STACK_RESOURCES: [
+        _resource('job', api.JOBS_SERVICE, TEST_JOB_SETTINGS, depends_on=['missing'])]}
+    with pytest.raises(StackError, match='unknown resource "missing"'):
+        stack_api._validate_config(stack)
+    stack[api.STACK_RESOURCES][0][api.RESOURCE_DEPENDS_ON] = 'job'
+    with pytest.raises(StackError, match='must be a list'):
+        stack_api._validate_config(stack)
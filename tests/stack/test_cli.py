@@ -140,6 +140,36 @@ def test_deploy_relative_paths(stack_api_mock, tmpdir):
     runner.invoke(cli.deploy, [config_path])
 
 
+@provide_conf
+def test_deploy_force(stack_api_mock, tmpdir):
+    config_path = _write_test_stack_config(tmpdir)
+    stack_api_mock.deploy = mock.MagicMock()
+    CliRunner().invoke(cli.deploy, ['--force', '--parallelism', '3', config_path])
+    assert stack_api_mock.deploy.call_args[1]['force'] is True
+    assert stack_api_mock.deploy.call_args[1]['parallelism'] == 3
+
+
+@provide_conf
+def test_plan(stack_api_mock, tmpdir):
+    config_path = _write_test_stack_config(tmpdir)
+    config_working_dir = os.path.dirname(config_path)
+    cli._save_json(cli._generate_stack_status_path(config_path), TEST_STATUS)
+
+    def _plan(stack_config, stack_status):
+        assert os.getcwd() == config_working_dir
+        assert stack_config == TEST_STACK
+        assert stack_status == TEST_STATUS
+        return [{'id': 'a', 'service': 'jobs', 'action': 'update', 'reason': 'changed locally'},
+                {'id': 'b', 'service': 'dbfs', 'action': 'unchanged', 'reason': 'unchanged'}]
+
+    stack_api_mock.plan = mock.Mock(wraps=_plan)
+    result = CliRunner().invoke(cli.plan, [config_path])
+    assert result.exit_code == 0
+    assert stack_api_mock.plan.called
+    assert 'update     a  jobs  changed locally' in result.output
+    assert '1 of 2 resources would be deployed.' in result.output
+
+
 @provide_conf
 def test_download_relative_paths(stack_api_mock, tmpdir):
     """
@@ -0,0 +1,65 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import sys
+
+import click
+from click.testing import CliRunner
+
+from databricks_cli import cli
+from databricks_cli.click_types import LazyGroup
+from databricks_cli.dbfs.cli import dbfs_group
+
+# Modules that must not be imported to start the CLI. Each command group imports its own.
+SLOW_MODULES = ['IPython', 'jwt', 'oauthlib', 'tabulate'] + \
+    [location.split(':')[0] for location in cli.COMMAND_GROUPS.values()]
+
+
+def test_lazy_group_resolves_subcommands():
+    ctx = click.Context(cli.cli)
+    assert cli.cli.list_commands(ctx) == sorted(cli.COMMAND_GROUPS)
+    assert cli.cli.get_command(ctx, 'fs') is dbfs_group
+    assert cli.cli.get_command(ctx, 'no-such-group') is None
+
+
+@click.command()
+def hello_command():
+    click.echo('hello')
+
+
+def test_lazy_group_invokes_subcommand():
+    group = LazyGroup(lazy_subcommands={'hello': '{}:hello_command'.format(__name__)})
+    result = CliRunner().invoke(group, ['hello'])
+    assert result.exit_code == 0
+    assert result.output == 'hello\n'
+
+
+def test_cli_import_time():
+    """
+    Guards the startup time of the CLI by importing it in a fresh interpreter and listing which
+    of the slow modules it pulled in.
+    """
+    script = 'import sys, databricks_cli.cli; print(",".join(m for m in {} if m in sys.modules))'
+    output = subprocess.check_output([sys.executable, '-c', script.format(SLOW_MODULES)])
+    assert output.decode('utf-8').strip() == ''
@@ -0,0 +1,105 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import click
+from click.testing import CliRunner
+import mock
+
+from databricks_cli.configure.config import provide_api_client, profile_option, \
+    trace_http_option
+from databricks_cli.sdk.api_client import RequestEvent
+from databricks_cli.tracing import HttpTracer, EndpointStats
+from tests.utils import provide_conf
+
+
+def make_event(method, path, latency, status=200, retries=0):
+    event = RequestEvent(method, path, 'https://databricks.com/api/2.0' + path)
+    event.latency = latency
+    event.status = status
+    event.retries = retries
+    event.request_bytes = 10
+    event.response_bytes = 100
+    return event
+
+
+def test_endpoint_stats():
+    stats = EndpointStats()
+    for latency in [0.01, 0.02, 0.3, 20]:
+        stats.add(make_event('GET', '/jobs/get', latency))
+    stats.add(make_event('GET', '/jobs/get', 0.04, status=429, retries=6))
+    assert stats.errors == 1
+    assert stats.retries == 6
+    assert stats.response_bytes == 500
+    assert stats.percentile(0.5) == 0.04
+    assert stats.percentile(0.99) == 20
+    assert stats.histogram() == [3, 0, 0, 1, 0, 0, 0, 0, 1]
+
+
+def test_format_summary_orders_by_total_latency():
+    tracer = HttpTracer()
+    tracer.after_request(make_event('GET', '/jobs/get', 0.1))
+    tracer.after_request(make_event('GET', '/jobs/get', 0.1))
+    tracer.after_request(make_event('POST', '/dbfs/put', 1))
+    lines = tracer.format_summary().splitlines()
+    assert lines[0].startswith('Endpoint')
+    assert lines[1].startswith('POST /dbfs/put')
+    assert lines[2].startswith('GET /jobs/get')
+    assert lines[3].startswith('Histogram buckets: <0.05s')
+
+
+def _trace_test_command():
+    @click.group()
+    @trace_http_option
+    def test_group():
+        pass
+
+    @test_group.command('test-command')
+    @profile_option
+    @provide_api_client
+    def test_command(api_client):  # noqa
+        for observer in api_client.observers:
+            observer.after_request(make_event('GET', '/clusters/list', 0.2))
+
+    return test_group
+
+
+@provide_conf
+def test_trace_http_option():
+    result = CliRunner().invoke(_trace_test_command(), ['--trace-http', 'test-command'])
+    assert result.exit_code == 0
+    assert 'GET /clusters/list' in result.output
+
+
+@provide_conf
+def test_trace_http_environment_variable():
+    with mock.patch.dict('os.environ', {'DATABRICKS_CLI_TRACE': '1'}):
+        result = CliRunner().invoke(_trace_test_command(), ['test-command'])
+    assert result.exit_code == 0
+    assert 'GET /clusters/list' in result.output
+
+
+@provide_conf
+def test_trace_http_disabled():
+    result = CliRunner().invoke(_trace_test_command(), ['test-command'])
+    assert result.exit_code == 0
+    assert result.output == ''
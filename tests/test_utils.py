@@ -137,6 +137,76 @@ def test_backoff_with_jitter():
     assert 15 <= utils.backoff_with_jitter(1000) <= 30
 
 
+def test_poll_interval():
+    assert 7.5 <= utils.poll_interval((10, 60), 0) <= 10
+    assert 45 <= utils.poll_interval((10, 60), 5) <= 60
+    assert utils.poll_interval((1, 5), 5) <= 5
+
+
 def test_truncate_string():
     assert utils.truncate_string('apple', 3) == 'app...'
     assert utils.truncate_string('apple') == 'apple'
+
+
+@pytest.mark.parametrize('parallelism', [1, 4])
+def test_run_concurrently(parallelism):
+    def square(x):
+        if x == 3:
+            raise ValueError('bad item')
+        return x * x
+
+    results = {item: (result, exception) for item, result, exception in
+               utils.run_concurrently(square, range(5), parallelism)}
+    assert sorted(results) == [0, 1, 2, 3, 4]
+    assert results[2] == (4, None)
+    assert results[3][0] is None
+    assert isinstance(results[3][1], ValueError)
+
+
+def test_run_with_progress():
+    def copy(src, dst):
+        if src == 'b':
+            raise ValueError('bad item')
+        return '{} -> {}'.format(src, dst)
+
+    with mock.patch('click.echo') as echo_mock:
+        with pytest.raises(RuntimeError, match='1 files failed to copy.'):
+            utils.run_with_progress(copy, [('a', 'x'), ('b', 'y')], 1, 'copy')
+    messages = [call[0][0] for call in echo_mock.call_args_list]
+    assert messages == ['[1/2] a -> x', '[2/2] Failed to copy b.', '1 of 2 files failed to copy:',
+                        '  b: ValueError: bad item']
+
+
+def test_summarize_failures():
+    utils.summarize_failures([], 'export')
+    with mock.patch('click.echo') as echo_mock:
+        with pytest.raises(RuntimeError, match='1 objects failed to export.'):
+            utils.summarize_failures([('a', ValueError('bad'))], 'export', noun='objects')
+    assert echo_mock.call_args_list[0][0][0] == '1 objects failed to export:'
+
+
+def test_create_directory_tree():
+    mkdirs = mock.Mock()
+    utils.create_directory_tree(mkdirs, ['a', 'a/b', 'c', 'a/b/d'], 2)
+    assert sorted(ca[0][0] for ca in mkdirs.call_args_list) == ['a/b/d', 'c']
+
+    mkdirs = mock.Mock(side_effect=ValueError('bad path'))
+    with pytest.raises(ValueError):
+        utils.create_directory_tree(mkdirs, ['a'], 2)
+
+
+def test_outermost_paths():
+    assert utils.outermost_paths(['a', 'a/b', 'a-b', 'a-b/c', 'd/e']) == ['a', 'a-b', 'd/e']
+
+
+def test_innermost_paths():
+    assert utils.innermost_paths(['a', 'a/b', 'a-b', 'c']) == ['a-b', 'a/b', 'c']
+
+
+def test_write_json_atomically(tmpdir):
+    path = tmpdir.join('cache', 'content.json').strpath
+    utils.write_json_atomically(path, {'b': 1, 'a': 2}, sort_keys=True)
+    utils.write_json_atomically(path, {'b': 2, 'a': 1}, sort_keys=True)
+    with open(path) as f:
+        assert f.read() == '{"a": 1, "b": 2}'
+    assert tmpdir.join('cache').listdir() == [tmpdir.join('cache', 'content.json')]
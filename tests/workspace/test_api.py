@@ -21,13 +21,19 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import io
+import json
 import os
+import threading
+import zipfile
 import mock
-from base64 import b64encode
+from base64 import b64encode, b64decode
 
 import pytest
+import requests
 
 import databricks_cli.workspace.api as api
+from databricks_cli.workspace import dbc
 from databricks_cli.workspace.api import WorkspaceFileInfo
 from databricks_cli.workspace.types import WorkspaceLanguage
 
@@ -198,6 +204,58 @@ class TestWorkspaceApi(object):
         # Verify that we only called list 4 times.
         assert workspace_api.list_objects.call_count == 4
 
+    def test_export_workspace_dir_parallel(self, workspace_api, tmpdir):
+        tree = {
+            '/': [WorkspaceFileInfo('/a', api.DIRECTORY, TEST_WORKSPACE_OBJECT_ID),
+                  WorkspaceFileInfo('/lib', api.LIBRARY, TEST_WORKSPACE_OBJECT_ID),
+                  WorkspaceFileInfo('/top', api.NOTEBOOK, TEST_WORKSPACE_OBJECT_ID,
+                                    WorkspaceLanguage.PYTHON)],
+            '/a': [WorkspaceFileInfo('/a/b', api.DIRECTORY, TEST_WORKSPACE_OBJECT_ID),
+                   WorkspaceFileInfo('/a/c', api.NOTEBOOK, TEST_WORKSPACE_OBJECT_ID,
+                                     WorkspaceLanguage.SCALA),
+                   WorkspaceFileInfo('/a/bad', api.NOTEBOOK, TEST_WORKSPACE_OBJECT_ID,
+                                     WorkspaceLanguage.SCALA)],
+            '/a/b': [WorkspaceFileInfo('/a/b/d', api.NOTEBOOK, TEST_WORKSPACE_OBJECT_ID,
+                                       WorkspaceLanguage.SQL)],
+        }
+        workspace_api.list_objects = mock.Mock(side_effect=lambda path, headers=None: tree[path])
+
+        def _export_mock(path, fmt, headers=None):
+            if path == '/a/bad':
+                raise RuntimeError('export failed')
+            return {'content': b64encode(path.encode())}
+
+        workspace_api.client.export_workspace.side_effect = _export_mock
+        with open(os.path.join(tmpdir.strpath, 'top.py'), 'w') as f:
+            f.write('local')
+
+        with mock.patch('click.echo') as echo_mock:
+            with pytest.raises(RuntimeError):
+                workspace_api.export_workspace_dir('/', tmpdir.strpath, False, parallelism=4)
+        with open(os.path.join(tmpdir.strpath, 'a', 'c.scala')) as f:
+            assert f.read() == '/a/c'
+        with open(os.path.join(tmpdir.strpath, 'a', 'b', 'd.sql')) as f:
+            assert f.read() == '/a/b/d'
+        # Existing files are not overwritten.
+        with open(os.path.join(tmpdir.strpath, 'top.py')) as f:
+            assert f.read() == 'local'
+        messages = [call[0][0] for call in echo_mock.call_args_list]
+        assert 'Exported 2 notebooks from / to {}.'.format(tmpdir.strpath) in messages
+        assert 'Skipped 1 notebooks that already exist locally.' in messages
+        assert 'Skipped 1 objects that are neither a dir or a notebook.' in messages
+        assert '  /a/bad: RuntimeError: export failed' in messages
+
+    def test_export_workspace_decodes_in_chunks(self, workspace_api, tmpdir):
+        test_file_path = os.path.join(tmpdir.strpath, 'test')
+        content = os.urandom(1000)
+        workspace_api.client.export_workspace.return_value = {
+            'content': b64encode(content).decode()}
+        with mock.patch('databricks_cli.workspace.api.DECODE_CHUNK_CHARS', 16):
+            workspace_api.export_workspace(TEST_WORKSPACE_PATH, test_file_path, TEST_FMT,
+                                           is_overwrite=False)
+        with open(test_file_path, 'rb') as f:
+            assert f.read() == content
+
     def test_import_workspace_dir(self, workspace_api, tmpdir):
         """
         Copy from directory ``tmpdir`` with structure as follows
@@ -253,6 +311,77 @@ class TestWorkspaceApi(object):
         assert any([ca[0][2] == WorkspaceLanguage.SQL
                     for ca in workspace_api.import_workspace.call_args_list])
 
+    def test_import_workspace_dir_parallel(self, workspace_api, tmpdir):
+        workspace_api.import_workspace = mock.MagicMock()
+        workspace_api.mkdirs = mock.MagicMock()
+        os.makedirs(os.path.join(tmpdir.strpath, 'a', 'b'))
+        os.makedirs(os.path.join(tmpdir.strpath, '.hidden'))
+        os.makedirs(os.path.join(tmpdir.strpath, 'f', 'g'))
+        for path in [('a', 'c.py'), ('a', 'b', 'd.scala'), ('.hidden', 'e.py'), ('a', 'readme')]:
+            with open(os.path.join(tmpdir.strpath, *path), 'wt') as f:
+                f.write('1 + 1')
+        with mock.patch('click.echo'):
+            workspace_api.import_workspace_dir(tmpdir.strpath, '/target/', False, True,
+                                               parallelism=4)
+        # Only the leaves of the skeleton are created.
+        assert sorted(ca[0][0] for ca in workspace_api.mkdirs.call_args_list) == \
+            ['/target/a/b', '/target/f/g']
+        assert sorted(ca[0][1] for ca in workspace_api.import_workspace.call_args_list) == \
+            ['/target/a/b/d', '/target/a/c']
+
+    def test_import_workspace_dir_parallel_skips_non_files(self, workspace_api, tmpdir):
+        workspace_api.import_workspace = mock.MagicMock()
+        workspace_api.mkdirs = mock.MagicMock()
+        with open(os.path.join(tmpdir.strpath, 'a.py'), 'wt') as f:
+            f.write('1 + 1')
+        os.symlink(os.path.join(tmpdir.strpath, 'missing.py'),
+                   os.path.join(tmpdir.strpath, 'broken.py'))
+        with mock.patch('click.echo'):
+            workspace_api.import_workspace_dir(tmpdir.strpath, '/', False, False, parallelism=2)
+        assert [ca[0][0] for ca in workspace_api.import_workspace.call_args_list] == \
+            [os.path.join(tmpdir.strpath, 'a.py')]
+
+    def test_import_workspace_dir_parallel_failures(self, workspace_api, tmpdir):
+        def _import_mock(src, *args, **kwargs):  # noqa
+            if src.endswith('bad.py'):
+                raise ValueError('import failed')
+
+        workspace_api.mkdirs = mock.MagicMock()
+        workspace_api.import_workspace = mock.MagicMock(side_effect=_import_mock)
+        for filename in ['bad.py', 'good.py']:
+            with open(os.path.join(tmpdir.strpath, filename), 'wt') as f:
+                f.write('1 + 1')
+        with mock.patch('click.echo') as echo_mock:
+            with pytest.raises(RuntimeError):
+                workspace_api.import_workspace_dir(tmpdir.strpath, '/', False, False,
+                                                   parallelism=2)
+        assert workspace_api.import_workspace.call_count == 2
+        messages = [call[0][0] for call in echo_mock.call_args_list]
+        assert '1 of 2 files failed to import:' in messages
+        assert '  {}: ValueError: import failed'.format(
+            os.path.join(tmpdir.strpath, 'bad.py')) in messages
+
+    def test_byte_budget(self):
+        budget = api._ByteBudget(10)
+        budget.acquire(6)
+        acquired = threading.Event()
+
+        def acquire():
+            budget.acquire(6)
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        assert not acquired.wait(0.1)
+        budget.release(6)
+        assert acquired.wait(5)
+        thread.join()
+        # A reservation larger than the budget goes through once nothing else is reserved.
+        budget.release(6)
+        with budget.reserve(100):
+            assert budget.reserved_bytes == 100
+        assert budget.reserved_bytes == 0
+
     def test_import_dir_rstrip(self, workspace_api, tmpdir):
         """
         Copy from directory ``tmpdir`` with structure as follows
@@ -305,3 +434,203 @@ class TestWorkspaceApi(object):
                     for ca in workspace_api.import_workspace.call_args_list])
         assert any([ca[0][1] == '/a/test-py'
                     for ca in workspace_api.import_workspace.call_args_list])
+
+
+class TestWorkspaceApiSync(object):
+    @pytest.fixture()
+    def local_tree(self, tmpdir):
+        src = os.path.join(tmpdir.strpath, 'src')
+        os.makedirs(os.path.join(src, 'a'))
+        for path, content in [(('a', 'b.py'), 'b'), (('c.scala', ), 'c')]:
+            with open(os.path.join(src, *path), 'wt') as f:
+                f.write(content)
+        return src
+
+    @staticmethod
+    def _mock_remote(workspace_api, tree):
+        workspace_api.client.client.url = 'https://test-host/api/'
+        workspace_api.list_objects = mock.Mock(side_effect=lambda path, headers=None: tree[path])
+        workspace_api.import_workspace = mock.MagicMock()
+        workspace_api.mkdirs = mock.MagicMock()
+        workspace_api.delete = mock.MagicMock()
+
+    def test_sync_imports_changed_and_missing(self, workspace_api, local_tree):
+        self._mock_remote(workspace_api, {'/t': []})
+        with mock.patch('click.echo'):
+            workspace_api.sync(local_tree, '/t')
+        assert sorted(c[0][1] for c in workspace_api.import_workspace.call_args_list) == \
+            ['/t/a/b', '/t/c']
+        assert os.path.isfile(os.path.join(local_tree, '.databricks-workspace-sync.json'))
+
+        # Nothing changed and everything exists remotely.
+        self._mock_remote(workspace_api, {
+            '/t': [WorkspaceFileInfo('/t/a', api.DIRECTORY, TEST_WORKSPACE_OBJECT_ID),
+                   WorkspaceFileInfo('/t/c', api.NOTEBOOK, TEST_WORKSPACE_OBJECT_ID)],
+            '/t/a': [WorkspaceFileInfo('/t/a/b', api.NOTEBOOK, TEST_WORKSPACE_OBJECT_ID)],
+        })
+        with mock.patch('click.echo'):
+            workspace_api.sync(local_tree, '/t')
+        assert workspace_api.import_workspace.call_count == 0
+
+        # Changed locally, and deleted remotely.
+        with open(os.path.join(local_tree, 'a', 'b.py'), 'wt') as f:
+            f.write('changed')
+        self._mock_remote(workspace_api, {
+            '/t': [WorkspaceFileInfo('/t/a', api.DIRECTORY, TEST_WORKSPACE_OBJECT_ID)],
+            '/t/a': [WorkspaceFileInfo('/t/a/b', api.NOTEBOOK, TEST_WORKSPACE_OBJECT_ID)],
+        })
+        with mock.patch('click.echo'):
+            workspace_api.sync(local_tree, '/t')
+        assert sorted(c[0][1] for c in workspace_api.import_workspace.call_args_list) == \
+            ['/t/a/b', '/t/c']
+        assert all(c[0][4] for c in workspace_api.import_workspace.call_args_list)
+
+    def test_sync_delete(self, workspace_api, local_tree):
+        self._mock_remote(workspace_api, {
+            '/t': [WorkspaceFileInfo('/t/a', api.DIRECTORY, TEST_WORKSPACE_OBJECT_ID),
+                   WorkspaceFileInfo('/t/gone', api.DIRECTORY, TEST_WORKSPACE_OBJECT_ID),
+                   WorkspaceFileInfo('/t/lib', api.LIBRARY, TEST_WORKSPACE_OBJECT_ID)],
+            '/t/a': [WorkspaceFileInfo('/t/a/old', api.NOTEBOOK, TEST_WORKSPACE_OBJECT_ID)],
+            '/t/gone': [WorkspaceFileInfo('/t/gone/x', api.NOTEBOOK, TEST_WORKSPACE_OBJECT_ID)],
+        })
+        with mock.patch('click.echo'):
+            workspace_api.sync(local_tree, '/t', delete=True, parallelism=3)
+        assert sorted(c[0] for c in workspace_api.delete.call_args_list) == \
+            [('/t/a/old', False), ('/t/gone', True)]
+
+    def test_sync_dry_run(self, workspace_api, local_tree):
+        self._mock_remote(workspace_api, {'/t': []})
+        with mock.patch('click.echo') as echo_mock:
+            workspace_api.sync(local_tree, '/t', dry_run=True)
+        assert workspace_api.import_workspace.call_count == 0
+        assert workspace_api.mkdirs.call_count == 0
+        assert echo_mock.call_args[0][0] == '2 to import, 0 to delete, 0 unchanged.'
+        assert not os.path.exists(os.path.join(local_tree, '.databricks-workspace-sync.json'))
+
+    def test_sync_missing_target(self, workspace_api, local_tree):
+        self._mock_remote(workspace_api, {})
+        response = requests.Response()
+        response.status_code = 404
+        workspace_api.list_objects.side_effect = requests.exceptions.HTTPError(response=response)
+        with mock.patch('click.echo'):
+            workspace_api.sync(local_tree, '/t')
+        assert workspace_api.import_workspace.call_count == 2
+
+
+def _http_error(error_code):
+    response = requests.Response()
+    response.status_code = 400
+    response._content = json.dumps({'error_code': error_code}).encode()
+    return requests.exceptions.HTTPError(response=response)
+
+
+class TestWorkspaceApiBulk(object):
+    def test_export_workspace_dir_bulk(self, workspace_api, tmpdir):
+        notebook = dbc.source_to_notebook('b', WorkspaceLanguage.PYTHON, 'print(1)')
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w') as archive:
+            archive.writestr('a/sub/b.python', json.dumps(notebook))
+        workspace_api.client.export_workspace.return_value = {
+            'content': b64encode(buf.getvalue()).decode()}
+        with mock.patch('click.echo'):
+            workspace_api.export_workspace_dir('/a', tmpdir.strpath, False, bulk=True)
+        assert workspace_api.client.export_workspace.call_args[0][:2] == ('/a', 'DBC')
+        with open(os.path.join(tmpdir.strpath, 'sub', 'b.py')) as f:
+            assert 'print(1)' in f.read()
+
+    def test_export_workspace_dir_bulk_falls_back(self, workspace_api, tmpdir):
+        notebook = dbc.source_to_notebook('c', WorkspaceLanguage.SCALA, 'println(1)')
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w') as archive:
+            archive.writestr('sub/c.scala', json.dumps(notebook))
+
+        def _export_mock(path, fmt, headers=None):
+            if path == '/a':
+                raise _http_error('MAX_NOTEBOOK_SIZE_EXCEEDED')
+            if fmt == 'DBC':
+                return {'content': b64encode(buf.getvalue()).decode()}
+            return {'content': b64encode(b'print(1)').decode()}
+
+        workspace_api.client.export_workspace.side_effect = _export_mock
+        workspace_api.list_objects = mock.Mock(return_value=[
+            WorkspaceFileInfo('/a/b', api.NOTEBOOK, TEST_WORKSPACE_OBJECT_ID,
+                              WorkspaceLanguage.PYTHON),
+            WorkspaceFileInfo('/a/sub', api.DIRECTORY, TEST_WORKSPACE_OBJECT_ID)])
+        with mock.patch('click.echo'):
+            workspace_api.export_workspace_dir('/a', tmpdir.strpath, False, bulk=True)
+        with open(os.path.join(tmpdir.strpath, 'b.py')) as f:
+            assert f.read() == 'print(1)'
+        with open(os.path.join(tmpdir.strpath, 'sub', 'c.scala')) as f:
+            assert 'println(1)' in f.read()
+
+    @pytest.fixture()
+    def local_tree(self, tmpdir):
+        os.makedirs(os.path.join(tmpdir.strpath, 'sub'))
+        os.makedirs(os.path.join(tmpdir.strpath, 'empty'))
+        for path in [('a.py', ), ('sub', 'b.sql'), ('sub', 'c.ipynb')]:
+            with open(os.path.join(tmpdir.strpath, *path), 'wt') as f:
+                f.write('1')
+        return tmpdir.strpath
+
+    def test_import_workspace_dir_bulk(self, workspace_api, local_tree):
+        workspace_api.client.get_status.side_effect = _http_error('RESOURCE_DOES_NOT_EXIST')
+        workspace_api.import_workspace = mock.MagicMock()
+        workspace_api.mkdirs = mock.MagicMock()
+        with mock.patch('click.echo'):
+            workspace_api.import_workspace_dir(local_tree, '/t/dir', False, False, bulk=True)
+        args = workspace_api.client.import_workspace.call_args[0]
+        assert args[:2] == ('/t/dir', 'DBC')
+        with zipfile.ZipFile(io.BytesIO(b64decode(args[3]))) as archive:
+            assert sorted(archive.namelist()) == ['dir/a.python', 'dir/sub/b.sql']
+        # The notebook that can't be packed is imported on its own.
+        assert [c[0][1] for c in workspace_api.import_workspace.call_args_list] == \
+            ['/t/dir/sub/c']
+        assert sorted(c[0][0] for c in workspace_api.mkdirs.call_args_list) == \
+            ['/t', '/t/dir/empty']
+
+    def test_import_workspace_dir_bulk_falls_back(self, workspace_api, local_tree):
+        workspace_api.client.get_status.side_effect = _http_error('RESOURCE_DOES_NOT_EXIST')
+        workspace_api.import_workspace = mock.MagicMock()
+        workspace_api.mkdirs = mock.MagicMock()
+
+        def _import_mock(path, *args, **kwargs):
+            if path == '/t/dir':
+                raise _http_error('MAX_NOTEBOOK_SIZE_EXCEEDED')
+
+        workspace_api.client.import_workspace.side_effect = _import_mock
+        with mock.patch('click.echo'):
+            workspace_api.import_workspace_dir(local_tree, '/t/dir', False, False, bulk=True)
+        # The root is imported file by file, and its subdirectories in bulk again.
+        assert sorted(c[0][0] for c in workspace_api.client.import_workspace.call_args_list) \
+            == ['/t/dir', '/t/dir/sub']
+        assert sorted(c[0][1] for c in workspace_api.import_workspace.call_args_list) == \
+            ['/t/dir/a', '/t/dir/sub/c']
+
+    def test_import_workspace_dir_bulk_existing_target(self, workspace_api, local_tree):
+        workspace_api.import_workspace = mock.MagicMock()
+        workspace_api.mkdirs = mock.MagicMock()
+        with mock.patch('click.echo'), \
+                mock.patch('databricks_cli.workspace.api.pack_directory') as pack_mock:
+            workspace_api.import_workspace_dir(local_tree, '/t/dir', False, False, bulk=True)
+        # An existing target is imported file by file, without packing any archive.
+        assert pack_mock.call_count == 0
+        assert workspace_api.client.import_workspace.call_count == 0
+        assert sorted(c[0][1] for c in workspace_api.import_workspace.call_args_list) == \
+            ['/t/dir/a', '/t/dir/sub/b', '/t/dir/sub/c']
+
+    def test_import_workspace_dir_bulk_packs_once(self, workspace_api, local_tree):
+        workspace_api.client.get_status.side_effect = _http_error('RESOURCE_DOES_NOT_EXIST')
+        workspace_api.import_workspace = mock.MagicMock()
+        workspace_api.mkdirs = mock.MagicMock()
+        with open(os.path.join(local_tree, 'a.py'), 'wt') as f:
+            f.write('123')
+        # The notebooks of the root are too large for one archive, but not those of sub.
+        with mock.patch('click.echo'), mock.patch.object(api, 'MAX_IMPORT_BYTES', 4), \
+                mock.patch('databricks_cli.workspace.api.pack_directory',
+                           wraps=dbc.pack_directory) as pack_mock:
+            workspace_api.import_workspace_dir(local_tree, '/t/dir', False, False, bulk=True)
+        assert [c[0][1] for c in pack_mock.call_args_list] == ['sub']
+        assert [c[0][0] for c in workspace_api.client.import_workspace.call_args_list] == \
+            ['/t/dir/sub']
+        assert sorted(c[0][1] for c in workspace_api.import_workspace.call_args_list) == \
+            ['/t/dir/a', '/t/dir/sub/c']
@@ -0,0 +1,135 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+from databricks_cli.workspace import dbc
+from databricks_cli.workspace.types import WorkspaceLanguage
+
+PYTHON_SOURCE = '''# Databricks notebook source
+print(1)
+
+# COMMAND ----------
+
+# MAGIC %md
+# MAGIC # Title
+# MAGIC
+# MAGIC text
+'''
+
+SQL_SOURCE = '''-- Databricks notebook source
+select 1
+'''
+
+
+def _make_archive(entries):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as archive:
+        for name, notebook in entries.items():
+            archive.writestr(name, json.dumps(notebook))
+    return buf.getvalue()
+
+
+def test_source_round_trip():
+    notebook = dbc.source_to_notebook('nb', WorkspaceLanguage.PYTHON, PYTHON_SOURCE)
+    assert [c['command'] for c in notebook['commands']] == ['print(1)', '%md\n# Title\n\ntext']
+    assert notebook['language'] == 'python'
+    assert dbc.notebook_to_source(notebook) == PYTHON_SOURCE
+
+
+def test_source_round_trip_with_titles():
+    source = '''# Databricks notebook source
+# DBTITLE 1,Load data
+print(1)
+
+# COMMAND ----------
+
+# DBTITLE 0,Notes
+# MAGIC %md
+# MAGIC text
+'''
+    notebook = dbc.source_to_notebook('nb', WorkspaceLanguage.PYTHON, source)
+    commands = notebook['commands']
+    assert [c['command'] for c in commands] == ['print(1)', '%md\ntext']
+    assert [c['commandTitle'] for c in commands] == ['Load data', 'Notes']
+    assert [c['showCommandTitle'] for c in commands] == [True, False]
+    assert dbc.notebook_to_source(notebook) == source
+
+
+@pytest.mark.parametrize('name', ['root/../evil.python', 'root/sub/../../evil.python',
+                                  'root//evil.python', 'root/a\\..\\..\\evil.python'])
+def test_unpack_archive_rejects_paths_outside_target(tmpdir, name):
+    target = os.path.join(tmpdir.strpath, 'target')
+    content = _make_archive({
+        name: dbc.source_to_notebook('evil', WorkspaceLanguage.PYTHON, PYTHON_SOURCE)})
+    if os.sep == '/' and '\\' in name:
+        # Backslashes are plain characters in POSIX file names.
+        dbc.unpack_archive(content, target, overwrite=False)
+        assert os.listdir(tmpdir.strpath) == ['target']
+        return
+    with pytest.raises(ValueError):
+        dbc.unpack_archive(content, target, overwrite=False)
+    assert os.listdir(tmpdir.strpath) == []
+
+
+def test_unpack_archive(tmpdir):
+    content = _make_archive({
+        'root/a.python': dbc.source_to_notebook('a', WorkspaceLanguage.PYTHON, PYTHON_SOURCE),
+        'root/sub/b.sql': dbc.source_to_notebook('b', WorkspaceLanguage.SQL, SQL_SOURCE),
+        'root/ignored.txt': {},
+    })
+    with open(os.path.join(tmpdir.strpath, 'a.py'), 'w') as f:
+        f.write('local')
+    written, skipped = dbc.unpack_archive(content, tmpdir.strpath, overwrite=False)
+    assert written == [os.path.join(tmpdir.strpath, 'sub', 'b.sql')]
+    assert skipped == [os.path.join(tmpdir.strpath, 'a.py')]
+    with open(os.path.join(tmpdir.strpath, 'sub', 'b.sql')) as f:
+        assert f.read() == SQL_SOURCE
+
+    dbc.unpack_archive(content, tmpdir.strpath, overwrite=True)
+    with open(os.path.join(tmpdir.strpath, 'a.py')) as f:
+        assert f.read() == PYTHON_SOURCE
+
+
+def test_pack_directory(tmpdir):
+    os.makedirs(os.path.join(tmpdir.strpath, 'sub'))
+    paths = [os.path.join(tmpdir.strpath, 'a.py'), os.path.join(tmpdir.strpath, 'sub', 'b.sql')]
+    for path, source in zip(paths, [PYTHON_SOURCE, SQL_SOURCE]):
+        with open(path, 'w') as f:
+            f.write(source)
+    content = dbc.pack_directory(tmpdir.strpath, 'target', paths)
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        assert sorted(archive.namelist()) == ['target/a.python', 'target/sub/b.sql']
+        notebook = json.loads(archive.read('target/sub/b.sql').decode('utf-8'))
+    assert notebook['name'] == 'b'
+    assert notebook['commands'][0]['command'] == 'select 1'
+    # Unpacking gives back the original layout.
+    out = os.path.join(tmpdir.strpath, 'out')
+    dbc.unpack_archive(content, out, overwrite=False)
+    with open(os.path.join(out, 'a.py')) as f:
+        assert f.read() == PYTHON_SOURCE
@@ -0,0 +1,61 @@
+# Databricks CLI
+# Copyright 2017 Databricks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"), except
+# that the use of services to which certain application programming
+# interfaces (each, an "API") connect requires that the user first obtain
+# a license for the use of the APIs from Databricks, Inc. ("Databricks"),
+# by creating an account at www.databricks.com and agreeing to either (a)
+# the Community Edition Terms of Service, (b) the Databricks Terms of
+# Service, or (c) another written agreement between Licensee and Databricks
+# for the use of the APIs.
+#
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from hashlib import sha256
+
+from databricks_cli.workspace.sync import WorkspaceSyncManifest, hash_file
+
+
+def test_hash_file(tmpdir):
+    path = os.path.join(tmpdir.strpath, 'a.py')
+    with open(path, 'wb') as f:
+        f.write(b'print(1)')
+    assert hash_file(path) == sha256(b'print(1)').hexdigest()
+
+
+def test_manifest_round_trip(tmpdir):
+    path = os.path.join(tmpdir.strpath, 'manifest.json')
+    manifest = WorkspaceSyncManifest.load(path, 'host/a')
+    manifest.record('x.py', 'hash-x')
+    manifest.record('y.py', 'hash-y')
+    manifest.retain({'x.py'})
+    manifest.save()
+    assert os.listdir(tmpdir.strpath) == ['manifest.json']
+    # Targets are tracked independently.
+    other = WorkspaceSyncManifest.load(path, 'host/b')
+    assert not other.is_unchanged('x.py', 'hash-x')
+    other.record('x.py', 'hash-other')
+    other.save()
+    manifest = WorkspaceSyncManifest.load(path, 'host/a')
+    assert manifest.is_unchanged('x.py', 'hash-x')
+    assert not manifest.is_unchanged('y.py', 'hash-y')
+    assert WorkspaceSyncManifest.load(path, 'host/b').is_unchanged('x.py', 'hash-other')
+
+
+def test_manifest_load_invalid(tmpdir):
+    path = os.path.join(tmpdir.strpath, 'manifest.json')
+    with open(path, 'w') as f:
+        f.write('not json')
+    assert WorkspaceSyncManifest.load(path, 'host/a').entries == {}
+    assert WorkspaceSyncManifest.load(path + '.missing', 'host/a').entries == {}